@@ -0,0 +1,47 @@
+"""
+İki benchmark sonuç dosyasını çalışma bazında karşılaştırır.
+
+Kullanım:
+    python -m benchmarks.compare benchmarks/results/onceki.json benchmarks/results/sonraki.json
+"""
+import argparse
+import json
+
+
+def _load(path):
+    with open(path, encoding="utf-8") as result_file:
+        return json.load(result_file)
+
+
+def _change(before, after):
+    if not before:
+        return "   n/a"
+    return f"{(after - before) / before * 100:+6.1f}%"
+
+
+def compare(baseline: dict, candidate: dict) -> str:
+    lines = [f"{baseline.get('revision')} ({baseline.get('label') or '-'}) -> {candidate.get('revision')} ({candidate.get('label') or '-'})"]
+    if baseline.get("config") != candidate.get("config"):
+        lines.append("Uyarı: iki ölçümün yapılandırması farklı.")
+    for before, after in zip(baseline["runs"], candidate["runs"]):
+        lines.append(f"Çalışma #{after['run']}")
+        for key, label in (("elapsed_seconds", "süre (sn)"), ("rows_per_sec", "kayıt/sn"), ("peak_rss_mb", "tepe RSS (MB)")):
+            lines.append(f"  {label:<22} {before[key]:>10} -> {after[key]:>10}  {_change(before[key], after[key])}")
+        stages = sorted(set(before["stages"]) | set(after["stages"]))
+        for stage in stages:
+            before_seconds = before["stages"].get(stage, {}).get("seconds", 0.0)
+            after_seconds = after["stages"].get(stage, {}).get("seconds", 0.0)
+            lines.append(f"  {stage:<22} {before_seconds:>10.3f} -> {after_seconds:>10.3f}  {_change(before_seconds, after_seconds)}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="İki benchmark sonucunu karşılaştırır.")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args(argv)
+    print(compare(_load(args.baseline), _load(args.candidate)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+Kamp alanı arama API'sinin yerel, sentetik veriyle çalışan taklidi.
+
+Gerçek API gibi `filter[search][bbox]`, `page[number]`, `page[size]` ve `sort` (yalnızca
+`availability-updated-at` / `-availability-updated-at`; diğer değerler eklenme sırasını korur) parametrelerini anlar,
+JSON:API biçiminde (`data[]` + `meta.total_count`) ve Campground modelindeki alias'larla yanıt verir,
+ETag/If-None-Match destekler. Gecikme ve hata oranı ayarlanabilir.
+
+`serve_photos` açıkken kayıtların fotoğraf adresleri aynı sunucudaki `/images/<kayıt>/<sıra>.jpg` yollarına
+çevrilir ve bu yollar küçük PNG'ler döndürür. Görüntüler PHOTO_VARIANTS renkten biridir; farklı
+URL'lerin aynı içeriği paylaşması içerik özetiyle tekilleştirmeyi sınamaya yarar.
+"""
+import argparse
+import bisect
+import datetime
+import hashlib
+import json
+import random
+import struct
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+DEFAULT_BBOX = (-125.0, 24.5, -66.9, 49.5)
+
+CAMPER_TYPES = ["tent", "rv", "trailer", "van", "car"]
+ACCOMMODATION_TYPES = ["campsite", "cabin", "yurt", "glamping", "lodging"]
+REGIONS = ["Pacific", "Mountain", "Midwest", "Northeast", "South"]
+# Sahte fotoğraf sunucusunun üretebildiği farklı görüntü sayısı
+PHOTO_VARIANTS = 64
+
+
+def synthetic_png(variant: int, size: int = 16) -> bytes:
+    """
+    `variant` numarasına göre renklendirilmiş, tek renkli `size`x`size` RGB PNG.
+    """
+    color = bytes(((variant * 37) % 256, (variant * 91) % 256, (variant * 53) % 256))
+    raw = b"".join(b"\x00" + color * size for _ in range(size))
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b"")
+
+
+class SyntheticCampgrounds:
+    """
+    Tohum değeri sabit, tekrarlanabilir sentetik kamp alanı kümesi. `mutate` ile kayıtların bir
+    kısmı değiştirilerek artımlı çalışmalar (güncellenen kayıtlar) taklit edilir.
+    """
+    def __init__(self, rows: int, seed: int = 42, bbox=DEFAULT_BBOX):
+        self._random = random.Random(seed)
+        self.bbox = bbox
+        self.version = 0
+        self.records = [self._make(index) for index in range(rows)]
+        # bbox filtrelemesi için boylama göre sıralı dizin
+        self.records.sort(key=lambda record: record["attributes"]["longitude"])
+        self._longitudes = [record["attributes"]["longitude"] for record in self.records]
+        self._bbox_cache = {}
+        self._lock = threading.Lock()
+
+    def _make(self, index: int) -> dict:
+        rnd = self._random
+        min_lon, min_lat, max_lon, max_lat = self.bbox
+        price_low = round(rnd.uniform(0, 80), 2) if rnd.random() < 0.8 else None
+        photo_count = rnd.randint(0, 5)
+        return {
+            "id": str(100000 + index),
+            "type": "location-search-results",
+            "links": {"self": f"https://thedyrt.com/api/v6/locations/{100000 + index}"},
+            "attributes": {
+                "name": f"Synthetic Campground {index}",
+                "latitude": rnd.uniform(min_lat, max_lat),
+                "longitude": rnd.uniform(min_lon, max_lon),
+                "region-name": rnd.choice(REGIONS),
+                "administrative-area": f"State {index % 50}",
+                "nearest-city-name": f"City {index % 997}",
+                "accommodation-type-names": rnd.sample(ACCOMMODATION_TYPES, rnd.randint(1, 3)),
+                "bookable": rnd.random() < 0.4,
+                "camper-types": rnd.sample(CAMPER_TYPES, rnd.randint(1, 4)),
+                "operator": rnd.choice([None, "National Park Service", "State Parks", "Private"]),
+                "photo-url": f"https://images.example.com/{index}/0.jpg" if photo_count else None,
+                "photo-urls": [f"https://images.example.com/{index}/{photo}.jpg" for photo in range(photo_count)],
+                "photos-count": photo_count,
+                "rating": round(rnd.uniform(1, 5), 1) if rnd.random() < 0.7 else None,
+                "reviews-count": rnd.randint(0, 500),
+                "slug": f"synthetic-campground-{index}",
+                "price-low": price_low,
+                "price-high": round(price_low + rnd.uniform(0, 60), 2) if price_low is not None else None,
+                "availability-updated-at": "2024-01-01T00:00:00Z",
+            },
+        }
+
+    def mutate(self, fraction: float, bbox=None):
+        """
+        Kayıtların (`bbox` verilirse yalnızca o alandakilerin) `fraction` kadarının fiyat ve
+        availability-updated-at alanlarını değiştirir ve değiştirilen kayıt sayısını döndürür.
+        """
+        with self._lock:
+            self.version += 1
+            records = self.records
+            if bbox is not None:
+                min_lon, min_lat, max_lon, max_lat = bbox
+                records = [record for record in records if min_lon <= record["attributes"]["longitude"] <= max_lon and min_lat <= record["attributes"]["latitude"] <= max_lat]
+            count = int(len(records) * fraction)
+            # Her sürüm bir öncekinden yeni bir zaman damgası alır; artımlı taramanın watermark'ı geride kalmaz.
+            updated_at = (datetime.datetime(2024, 1, 1) + datetime.timedelta(minutes=self.version)).strftime("%Y-%m-%dT%H:%M:%SZ")
+            for record in self._random.sample(records, count):
+                attributes = record["attributes"]
+                attributes["price-low"] = round(self._random.uniform(0, 80), 2)
+                attributes["availability-updated-at"] = updated_at
+            self._bbox_cache.clear()
+        return count
+
+    def set_photo_base_url(self, base_url: str):
+        """
+        Fotoğraf adreslerini `base_url/<kayıt>/<sıra>.jpg` biçimine çevirir.
+        """
+        with self._lock:
+            for record in self.records:
+                attributes = record["attributes"]
+                index = int(record["id"]) - 100000
+                attributes["photo-urls"] = [f"{base_url}/{index}/{photo}.jpg" for photo in range(attributes["photos-count"])]
+                attributes["photo-url"] = attributes["photo-urls"][0] if attributes["photo-urls"] else None
+            self._bbox_cache.clear()
+
+    def in_bbox(self, min_lon, min_lat, max_lon, max_lat, sort: str = ""):
+        key = (min_lon, min_lat, max_lon, max_lat, sort)
+        with self._lock:
+            cached = self._bbox_cache.get(key)
+            if cached is not None:
+                return cached
+            start = bisect.bisect_left(self._longitudes, min_lon)
+            end = bisect.bisect_right(self._longitudes, max_lon)
+            inside = [record for record in self.records[start:end] if min_lat <= record["attributes"]["latitude"] <= max_lat]
+            if sort.lstrip("-") == "availability-updated-at":
+                # Zaman damgaları aynı ISO biçiminde olduğundan metin karşılaştırması yeterli; sıralama kararlıdır.
+                inside.sort(key=lambda record: record["attributes"]["availability-updated-at"], reverse=sort.startswith("-"))
+            self._bbox_cache[key] = inside
+            return inside
+
+
+class FakeUpstream:
+    """
+    SyntheticCampgrounds'u arka planda bir HTTP sunucusu üzerinden sunar.
+
+    latency: her yanıttan önce beklenen süre (saniye)
+    error_rate: 503 dönen isteklerin oranı (0-1)
+    serve_photos: fotoğraf adreslerini bu sunucuya yönlendir ve /images altından PNG döndür
+    """
+    def __init__(self, dataset: SyntheticCampgrounds, latency: float = 0.0, error_rate: float = 0.0, host: str = "127.0.0.1", port: int = 0, seed: int = 7, serve_photos: bool = False):
+        self.dataset = dataset
+        self.latency = latency
+        self.error_rate = error_rate
+        self.stats = {"requests": 0, "errors": 0, "not_modified": 0, "bytes": 0, "images": 0}
+        self._random = random.Random(seed)
+        self._stats_lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+        if serve_photos:
+            dataset.set_photo_base_url(f"http://127.0.0.1:{self.port}/images")
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def search_url(self, page_size: int = 500) -> str:
+        bbox = ",".join(str(value) for value in self.dataset.bbox)
+        return f"http://127.0.0.1:{self.port}/api/v6/location-search-results?sort=recommended&filter%5Bsearch%5D%5Bbbox%5D={bbox}&page%5Bnumber%5D=1&page%5Bsize%5D={page_size}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-upstream", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def _should_fail(self) -> bool:
+        with self._stats_lock:
+            return self.error_rate > 0 and self._random.random() < self.error_rate
+
+    def _handler_class(self):
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Başlık ve gövde ayrı yazıldığından Nagle + gecikmeli ACK küçük yanıtlara ~40 ms ekler.
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: bytes = b"", headers=None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if body:
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                upstream._count("requests")
+                if upstream.latency:
+                    time.sleep(upstream.latency)
+                if upstream._should_fail():
+                    upstream._count("errors")
+                    self._send(503, b'{"errors": [{"status": "503"}]}', {"Content-Type": "application/json"})
+                    return
+                if self.path.startswith("/images/"):
+                    self._send_image()
+                    return
+                query = parse_qs(urlsplit(self.path).query)
+                try:
+                    bbox = tuple(float(value) for value in query["filter[search][bbox]"][0].split(","))
+                    page_number = int(query.get("page[number]", ["1"])[0])
+                    page_size = int(query.get("page[size]", ["20"])[0])
+                    sort = query.get("sort", [""])[0]
+                except (KeyError, ValueError):
+                    self._send(400, b'{"errors": [{"status": "400"}]}', {"Content-Type": "application/json"})
+                    return
+                inside = upstream.dataset.in_bbox(*bbox, sort=sort)
+                page = inside[(page_number - 1) * page_size: page_number * page_size]
+                body = json.dumps({"data": page, "meta": {"total_count": len(inside)}}).encode("utf-8")
+                etag = '"%s"' % hashlib.md5(body).hexdigest()
+                if self.headers.get("If-None-Match") == etag:
+                    upstream._count("not_modified")
+                    self._send(304, headers={"ETag": etag})
+                    return
+                upstream._count("bytes", len(body))
+                self._send(200, body, {"Content-Type": "application/json", "ETag": etag})
+
+            def _send_image(self):
+                try:
+                    record_index, photo = urlsplit(self.path).path[len("/images/"):].removesuffix(".jpg").split("/")
+                    variant = (int(record_index) * 7 + int(photo)) % PHOTO_VARIANTS
+                except ValueError:
+                    self._send(404)
+                    return
+                body = synthetic_png(variant)
+                upstream._count("images")
+                upstream._count("bytes", len(body))
+                self._send(200, body, {"Content-Type": "image/png"})
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentetik kamp alanı arama API'sini yerelde çalıştırır.")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--serve-photos", action="store_true", help="Fotoğraf adreslerini bu sunucudaki /images yollarına yönlendir")
+    args = parser.parse_args()
+    upstream = FakeUpstream(SyntheticCampgrounds(args.rows, args.seed), args.latency_ms / 1000, args.error_rate, port=args.port, serve_photos=args.serve_photos)
+    print(f"API_URL={upstream.search_url()}")
+    try:
+        upstream.serve_forever()
+    except KeyboardInterrupt:
+        upstream.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+JSON serileştirme sıcak yollarının kayıt başına maliyetini önceki ve güncel uygulamayla karşılaştırır.
+
+Kullanım (case_study dizininden):
+    python -m benchmarks.serialization --records 5000 --repeat 5
+
+Ölçülen yollar:
+    log_format   JsonFormatter.format (json.dumps -> src.serialization / orjson)
+    db_prepare   CampgroundORM.prepare_data_for_db (.dict() + özyinelemeli dönüştürme -> model_dump(mode="json"))
+    api_response 100 kayıtlık sayfa yanıtı (jsonable_encoder + json.dumps -> FastJSONResponse.render)
+"""
+import argparse
+import datetime
+import json
+import logging
+import os
+import sys
+import time
+import warnings
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# API yanıtı ölçümünde bir sayfadaki kayıt sayısı (/campgrounds varsayılan limit)
+PAGE_SIZE = 100
+
+
+def _legacy_prepare(validated_campground):
+    """
+    Önceki CampgroundORM.prepare_data_for_db: .dict() ve ardından özyinelemeli dönüştürme.
+    """
+    from pydantic import HttpUrl
+
+    data = validated_campground.dict()
+
+    def convert_to_serializable(obj):
+        if isinstance(obj, HttpUrl):
+            return str(obj)
+        elif isinstance(obj, datetime.datetime):
+            return obj.isoformat()
+        elif isinstance(obj, dict):
+            return {k: convert_to_serializable(v) for k, v in obj.items()}
+        elif isinstance(obj, list):
+            return [convert_to_serializable(item) for item in obj]
+        return obj
+    return convert_to_serializable(data)
+
+
+def _legacy_log_format(formatter, record):
+    """
+    Önceki JsonFormatter.format: aynı sözlük, json.dumps(ensure_ascii=False) ile.
+    """
+    log_record = {
+        "timestamp": formatter.formatTime(record, formatter.datefmt),
+        "level": record.levelname,
+        "logger": record.name,
+        "env": getattr(record, "env", "dev"),
+        "module": record.module,
+        "component": getattr(record, "component", record.module),
+        "function": getattr(record, "function", record.funcName),
+        "errtype": getattr(record, "errtype", "GENERIC"),
+        "message": record.getMessage(),
+    }
+    return json.dumps(log_record, ensure_ascii=False)
+
+
+def _best_per_record(func, items, repeat: int) -> float:
+    """
+    `func`'ı tüm kayıtlar üzerinde `repeat` kez çalıştırır; en iyi turun kayıt başına süresini (µs) döndürür.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - start)
+    return best / len(items) * 1e6
+
+
+def run_benchmark(args) -> dict:
+    sys.path.insert(0, PROJECT_ROOT)
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    from benchmarks.fake_upstream import SyntheticCampgrounds
+    from src import serialization
+    from src.api.responses import FastJSONResponse
+    from src.db.db import campground_to_row
+    from src.db.models import CampgroundORM
+    from src.logger import JsonFormatter
+    from src.models.campground import Campground
+
+    dataset = SyntheticCampgrounds(args.records, seed=args.seed)
+    raw_items = [{"id": record["id"], "type": record["type"], "links": record["links"], **record["attributes"]} for record in dataset.records]
+    validated = [Campground.validate_api_data(dict(item)) for item in raw_items]
+
+    # API'nin döndürdüğü satır biçimi (CampgroundORM.to_dict): tarihler ISO metin
+    api_rows = []
+    for campground in validated:
+        row = campground_to_row(campground)
+        row.pop("content_hash", None)
+        row.pop("geo_cell", None)
+        row["availability_updated_at"] = row["availability_updated_at"].isoformat() if row["availability_updated_at"] else None
+        api_rows.append(row)
+    pages = [{"items": api_rows[start:start + PAGE_SIZE], "next_cursor": None} for start in range(0, len(api_rows), PAGE_SIZE)]
+
+    formatter = JsonFormatter(datefmt="%Y-%m-%d %H:%M:%S")
+    log_records = [
+        logging.LogRecord("case_study", logging.INFO, __file__, 1, f"Kamp alanı işlendi: {item['name']} ({item['id']})", None, None, func="run_scraper_job")
+        for item in raw_items
+    ]
+    for record in log_records:
+        record.component = "scraper_module"
+
+    results = {}
+    with warnings.catch_warnings():
+        # Önceki yoldaki .dict() pydantic 2'de her çağrıda uyarı üretir; bu maliyet de ölçüme dahildir.
+        warnings.simplefilter("ignore")
+        results["log_format"] = {
+            "before": _best_per_record(lambda record: _legacy_log_format(formatter, record), log_records, args.repeat),
+            "after": _best_per_record(formatter.format, log_records, args.repeat),
+        }
+        results["db_prepare"] = {
+            "before": _best_per_record(_legacy_prepare, validated, args.repeat),
+            "after": _best_per_record(CampgroundORM.prepare_data_for_db, validated, args.repeat),
+        }
+    legacy_response = JSONResponse(None)
+    fast_response = FastJSONResponse(None)
+    api_before = _best_per_record(lambda page: legacy_response.render(jsonable_encoder(page)), pages, args.repeat)
+    api_after = _best_per_record(fast_response.render, pages, args.repeat)
+    # Sayfa başına süre kayıt başına süreye çevrilir.
+    results["api_response"] = {"before": api_before / PAGE_SIZE, "after": api_after / PAGE_SIZE}
+
+    for name, timing in results.items():
+        timing["before"] = round(timing["before"], 3)
+        timing["after"] = round(timing["after"], 3)
+        timing["speedup"] = round(timing["before"] / timing["after"], 2) if timing["after"] else None
+    return {
+        "backend": serialization.backend_name(),
+        "records": args.records,
+        "repeat": args.repeat,
+        "python": sys.version.split()[0],
+        "us_per_record": results,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="JSON serileştirme yollarının kayıt başına maliyeti (önce/sonra).")
+    parser.add_argument("--records", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5, help="Her ölçüm bu kadar tekrarlanır, en iyi tur alınır")
+    parser.add_argument("--output", default=None, help="Sonuçların yazılacağı JSON dosyası")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    result = run_benchmark(args)
+    print(f"Arka uç: {result['backend']}, {result['records']} kayıt, en iyi {result['repeat']} tur (µs/kayıt)")
+    for name, timing in result["us_per_record"].items():
+        print(f"  {name:<14} {timing['before']:>9.3f} -> {timing['after']:>9.3f}  x{timing['speedup']}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as result_file:
+            json.dump(result, result_file, ensure_ascii=False, indent=2)
+        print(f"Sonuçlar kaydedildi: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
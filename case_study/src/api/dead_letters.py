@@ -0,0 +1,65 @@
+import threading
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from src.api.responses import FastJSONResponse
+from src.config import DEAD_LETTER_REPLAY_BATCH_SIZE
+from src.db.base import get_db
+from src.db.dead_letters import DEAD_LETTER_STAGE_VALIDATE, DEAD_LETTER_STAGE_WRITE, get_dead_letter, list_dead_letters
+from src.scraper.dead_letters import replay_dead_letters
+
+router = APIRouter(prefix="/scrape/dead-letters", tags=["dead-letters"])
+
+STAGE_PATTERN = f"^({DEAD_LETTER_STAGE_VALIDATE}|{DEAD_LETTER_STAGE_WRITE})$"
+
+# Bu süreçte aynı anda tek yeniden oynatma çalışır; aynı kayıtların iki kez doğrulanıp yazılmasını önler.
+_replay_lock = threading.Lock()
+
+
+@router.get("")
+def get_dead_letters(
+    stage: Optional[str] = Query(None, pattern=STAGE_PATTERN),
+    error_type: Optional[str] = None,
+    model_version: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="Önceki yanıttaki next_cursor değeri"),
+    limit: int = Query(50, ge=1, le=500),
+    session: Session = Depends(get_db),
+):
+    """
+    Reddedilen kayıtları (ham veri olmadan) ve aşama / hata türü / model sürümüne göre gruplanmış sayıları listeler.
+    """
+    return FastJSONResponse(list_dead_letters(session, cursor=cursor, limit=limit, stage=stage, error_type=error_type, model_version=model_version))
+
+
+@router.post("/replay")
+def replay(
+    stage: Optional[str] = Query(None, pattern=STAGE_PATTERN),
+    error_type: Optional[str] = None,
+    model_version: Optional[str] = Query(None, description="Yalnızca bu model sürümüyle reddedilmiş kayıtlar"),
+    limit: Optional[int] = Query(None, ge=1, description="İşlenecek azami kayıt sayısı"),
+    batch_size: int = Query(DEAD_LETTER_REPLAY_BATCH_SIZE, ge=1, le=5000),
+    session: Session = Depends(get_db),
+):
+    """
+    Reddedilen kayıtları güncel modelle yeniden doğrular ve partiler halinde yazar. Yazılan kayıtlar
+    dead-letter tablosundan silinir; sayaçları ve hâlâ bekleyen kayıt sayısını (`remaining`) döndürür.
+    """
+    if not _replay_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="Yeniden oynatma zaten çalışıyor.")
+    try:
+        return replay_dead_letters(session, batch_size=batch_size, limit=limit, stage=stage, error_type=error_type, model_version=model_version)
+    finally:
+        _replay_lock.release()
+
+
+@router.get("/{campground_id}")
+def get_dead_letter_detail(campground_id: str, session: Session = Depends(get_db)):
+    """
+    Tek bir reddedilmiş kaydı açılmış ham API verisiyle (`payload`) döndürür.
+    """
+    dead_letter = get_dead_letter(session, campground_id)
+    if dead_letter is None:
+        raise HTTPException(status_code=404, detail=f"Dead-letter kaydı bulunamadı: {campground_id}")
+    return FastJSONResponse(dead_letter)
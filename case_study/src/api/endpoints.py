@@ -0,0 +1,264 @@
+import datetime
+import json
+import os
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+from sqlalchemy import String, and_, cast, func, select
+from sqlalchemy.orm import Session
+
+from src.api.responses import FastJSONResponse
+from src.api.snapshot import SnapshotNotReady, campground_snapshot
+from src.config import GEO_MAX_QUERY_CELLS, GEO_MAX_RADIUS_KM
+from src.db.base import get_db
+from src.db.export import EXPORT_FORMATS, get_cached_export
+from src.db.models import CampgroundORM
+from src.db.observations import campground_history, region_trends
+from src.db.photos import campground_photos
+from src.scraper.photos import photo_store
+from src.utils.geo import bbox_around, geo_cells_for_bbox, haversine_km
+
+router = APIRouter(prefix="/campgrounds", tags=["campgrounds"])
+
+# Geçmiş/trend sorgularında `since` verilmezse bakılan gün sayısı
+HISTORY_DEFAULT_DAYS = 30
+
+
+def parse_bbox(bbox: str):
+    """
+    "min_lon,min_lat,max_lon,max_lat" metnini sayılara çevirir; geçersizse ValueError.
+    """
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(part) for part in bbox.split(","))
+    except ValueError:
+        raise ValueError(f"Geçersiz bbox: {bbox} (beklenen: min_lon,min_lat,max_lon,max_lat)")
+    if not (-180 <= min_lon <= max_lon <= 180 and -90 <= min_lat <= max_lat <= 90):
+        raise ValueError(f"Geçersiz bbox sınırları: {bbox}")
+    return min_lon, min_lat, max_lon, max_lat
+
+
+def _bbox_conditions(min_lon, min_lat, max_lon, max_lat):
+    conditions = [
+        CampgroundORM.latitude.between(min_lat, max_lat),
+        CampgroundORM.longitude.between(min_lon, max_lon),
+    ]
+    # Küçük bbox'larda (geo_cell, id) indeksi taranır; büyüklerde lat/lon indeksi yeterlidir.
+    cells = geo_cells_for_bbox(min_lon, min_lat, max_lon, max_lat, GEO_MAX_QUERY_CELLS)
+    if cells is not None:
+        conditions.append(CampgroundORM.geo_cell.in_(cells))
+    return conditions
+
+
+def _camper_type_condition(session: Session, camper_type: str):
+    if session.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import JSONB
+        return cast(CampgroundORM.camper_types, JSONB).contains([camper_type])
+    # JSON kolonu metin olarak saklanır; öğe JSON kodlamasıyla (tırnaklarıyla) aranır. Değerdeki LIKE joker
+    # karakterleri (%, _) ve kaçış karakteri düz metin olarak eşleşsin diye kaçırılır.
+    token = json.dumps(camper_type).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return cast(CampgroundORM.camper_types, String).like(f"%{token}%", escape="\\")
+
+
+def search_campgrounds(
+    session: Session,
+    bbox=None,
+    center=None,
+    radius_km=None,
+    bookable=None,
+    min_rating=None,
+    min_price=None,
+    max_price=None,
+    camper_types=(),
+    cursor=None,
+    limit: int = 100,
+) -> dict:
+    """
+    Kamp alanlarını id sırasıyla, keyset sayfalama ile döndürür.
+
+    bbox: (min_lon, min_lat, max_lon, max_lat)
+    center + radius_km: (lat, lon) etrafında yarıçap araması. Veritabanında dairenin bbox'ı taranır,
+        kesin mesafe burada hesaplanır; her öğeye distance_km eklenir.
+    min_price/max_price: fiyat aralığı [price_low, price_high] bu aralıkla kesişen kayıtlar.
+    """
+    conditions = []
+    if bbox is not None:
+        conditions.extend(_bbox_conditions(*bbox))
+    if center is not None:
+        conditions.extend(_bbox_conditions(*bbox_around(center[0], center[1], radius_km)))
+    if bookable is not None:
+        conditions.append(CampgroundORM.bookable == bookable)
+    if min_rating is not None:
+        conditions.append(CampgroundORM.rating >= min_rating)
+    if min_price is not None:
+        conditions.append(func.coalesce(CampgroundORM.price_high, CampgroundORM.price_low) >= min_price)
+    if max_price is not None:
+        conditions.append(CampgroundORM.price_low <= max_price)
+    for camper_type in camper_types:
+        conditions.append(_camper_type_condition(session, camper_type))
+
+    items = []
+    last_id = cursor
+    while len(items) <= limit:
+        query = select(CampgroundORM).where(and_(*conditions)) if conditions else select(CampgroundORM)
+        if last_id is not None:
+            query = query.where(CampgroundORM.id > last_id)
+        records = session.execute(query.order_by(CampgroundORM.id).limit(limit + 1)).scalars().all()
+        for record in records:
+            item = record.to_dict()
+            if center is not None:
+                distance = haversine_km(center[0], center[1], record.latitude, record.longitude)
+                if distance > radius_km:
+                    continue
+                item["distance_km"] = round(distance, 3)
+            items.append(item)
+        if len(records) <= limit:
+            break
+        last_id = records[-1].id
+    has_more = len(items) > limit
+    items = items[:limit]
+    return {"items": items, "next_cursor": items[-1]["id"] if has_more else None}
+
+
+@router.get("")
+def list_campgrounds(
+    bbox: Optional[str] = Query(None, description="min_lon,min_lat,max_lon,max_lat"),
+    lat: Optional[float] = Query(None, ge=-90, le=90, description="Yarıçap araması merkezi (enlem)"),
+    lon: Optional[float] = Query(None, ge=-180, le=180, description="Yarıçap araması merkezi (boylam)"),
+    radius_km: Optional[float] = Query(None, gt=0, le=GEO_MAX_RADIUS_KM),
+    bookable: Optional[bool] = None,
+    min_rating: Optional[float] = Query(None, ge=0, le=5),
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    camper_type: List[str] = Query([], description="Tekrarlanabilir; kayıt tüm tipleri desteklemeli"),
+    cursor: Optional[str] = Query(None, description="Önceki yanıttaki next_cursor değeri"),
+    limit: int = Query(100, ge=1, le=500),
+    session: Session = Depends(get_db),
+):
+    """
+    Kayıtlı kamp alanlarını bbox veya yarıçap içinde, filtrelerle ve keyset sayfalama ile listeler.
+    """
+    try:
+        parsed_bbox = parse_bbox(bbox) if bbox else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    center = None
+    if lat is not None or lon is not None or radius_km is not None:
+        if lat is None or lon is None or radius_km is None:
+            raise HTTPException(status_code=400, detail="Yarıçap araması için lat, lon ve radius_km birlikte verilmelidir.")
+        center = (lat, lon)
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise HTTPException(status_code=400, detail="min_price, max_price'tan büyük olamaz.")
+    return FastJSONResponse(search_campgrounds(
+        session,
+        bbox=parsed_bbox,
+        center=center,
+        radius_km=radius_km,
+        bookable=bookable,
+        min_rating=min_rating,
+        min_price=min_price,
+        max_price=max_price,
+        camper_types=camper_type,
+        cursor=cursor,
+        limit=limit,
+    ))
+
+
+@router.get("/nearest")
+def nearest_campgrounds(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    k: int = Query(10, ge=1, le=500, description="Döndürülecek en fazla kayıt sayısı"),
+    radius_km: Optional[float] = Query(None, gt=0, le=GEO_MAX_RADIUS_KM, description="Verilirse yalnızca bu yarıçap içindeki kayıtlar"),
+    bookable: Optional[bool] = None,
+    min_rating: Optional[float] = Query(None, ge=0, le=5),
+    max_price: Optional[float] = Query(None, ge=0),
+):
+    """
+    Merkeze en yakın kamp alanlarını bellekteki snapshot üzerinden (veritabanına gitmeden) döndürür.
+    Snapshot her başarılı scraper işinden sonra arka planda yenilenir.
+    """
+    try:
+        return FastJSONResponse(campground_snapshot.nearest(lat, lon, k, radius_km, bookable, min_rating, max_price))
+    except SnapshotNotReady as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.get("/export")
+def export_campgrounds_file(format: str = Query("parquet", pattern="^(parquet|arrow)$", description="parquet veya arrow (Arrow IPC dosyası)")):
+    """
+    campgrounds tablosunun kolon tabanlı anlık görüntüsünü dosya olarak döndürür. Son dışa aktarım
+    EXPORT_MAX_AGE saniyeden yeniyse veritabanına gidilmez.
+    """
+    path = get_cached_export(format)
+    media_type = EXPORT_FORMATS[format]["media_type"]
+    return FileResponse(path, media_type=media_type, filename=os.path.basename(path))
+
+
+def _time_range(since, until):
+    """
+    Verilmeyen uçları tamamlar (until: şimdi, since: until - HISTORY_DEFAULT_DAYS) ve UTC'ye çevirir.
+    Aralık her zaman sınırlı olduğundan PostgreSQL yalnızca ilgili aylık bölümleri tarar.
+    """
+    def to_utc(value):
+        return value.replace(tzinfo=datetime.timezone.utc) if value.tzinfo is None else value.astimezone(datetime.timezone.utc)
+    until = to_utc(until) if until is not None else datetime.datetime.now(datetime.timezone.utc)
+    since = to_utc(since) if since is not None else until - datetime.timedelta(days=HISTORY_DEFAULT_DAYS)
+    if since >= until:
+        raise HTTPException(status_code=400, detail="since, until'den önce olmalıdır.")
+    return since, until
+
+
+@router.get("/trends")
+def campground_trends(
+    since: Optional[datetime.datetime] = Query(None, description="Varsayılan: until'den 30 gün önce"),
+    until: Optional[datetime.datetime] = Query(None, description="Varsayılan: şimdi"),
+    bucket: str = Query("day", pattern="^(day|week|month)$"),
+    region: Optional[str] = Query(None, description="Yalnızca bu region_name"),
+    session: Session = Depends(get_db),
+):
+    """
+    Fiyat/puan gözlemlerini bölge ve gün/hafta/ay dilimine göre toplar.
+    """
+    since, until = _time_range(since, until)
+    items = region_trends(session, since, until, bucket, region)
+    return {"since": since.isoformat(), "until": until.isoformat(), "bucket": bucket, "items": items}
+
+
+@router.get("/{campground_id}/history")
+def get_campground_history(
+    campground_id: str,
+    since: Optional[datetime.datetime] = Query(None, description="Varsayılan: until'den 30 gün önce"),
+    until: Optional[datetime.datetime] = Query(None, description="Varsayılan: şimdi"),
+    limit: int = Query(500, ge=1, le=5000),
+    session: Session = Depends(get_db),
+):
+    """
+    Bir kamp alanının fiyat, puan, yorum sayısı ve rezervasyon değerlerinin değişim geçmişi (eskiden yeniye).
+    """
+    since, until = _time_range(since, until)
+    return {"campground_id": campground_id, "items": campground_history(session, campground_id, since, until, limit)}
+
+
+@router.get("/{campground_id}/photos")
+def get_campground_photos(campground_id: str, session: Session = Depends(get_db)):
+    """
+    Kamp alanının yerel depoda bulunan fotoğrafları; `photo` ve `thumbnail` /photos altındaki yollardır.
+    Depo sınırı nedeniyle silinmiş (yeniden indirilmeyi bekleyen) dosyalar listelenmez.
+    """
+    items = []
+    for photo in campground_photos(session, campground_id):
+        if not photo_store.has(photo["file_name"]):
+            continue
+        photo["photo"] = f"/photos/{photo['file_name']}"
+        photo["thumbnail"] = f"/photos/thumbs/{photo['content_hash']}.jpg" if photo["has_thumbnail"] else None
+        items.append(photo)
+    return {"campground_id": campground_id, "items": items}
+
+
+@router.get("/{campground_id}")
+def get_campground(campground_id: str, session: Session = Depends(get_db)):
+    record = session.get(CampgroundORM, campground_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Kamp alanı bulunamadı: {campground_id}")
+    return record.to_dict()
@@ -0,0 +1,44 @@
+import os
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+
+from src.scraper.photos import MEDIA_TYPES, PHOTO_CACHE_CONTROL, PHOTO_NAME_PATTERN, THUMBNAIL_NAME_PATTERN, photo_store
+
+router = APIRouter(prefix="/photos", tags=["photos"])
+
+
+def _photo_response(request: Request, path: str, digest: str, media_type: str):
+    """
+    Depodaki dosyayı uzun süreli önbellek başlıklarıyla döndürür. İçerik adresli olduğundan ETag içerik özetidir;
+    eşleşen If-None-Match isteklerine gövdesiz 304 döner. Okunan dosyanın erişim zamanı (LRU) güncellenir.
+    """
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Fotoğraf bulunamadı.")
+    photo_store.touch(path)
+    headers = {"Cache-Control": PHOTO_CACHE_CONTROL, "ETag": f'"{digest}"'}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+
+@router.get("/thumbs/{name}")
+def get_photo_thumbnail(name: str, request: Request):
+    """
+    Fotoğrafın küçük resmi (JPEG, en uzun kenar PHOTO_THUMB_SIZE). Ad: `<sha256>.jpg`.
+    """
+    match = THUMBNAIL_NAME_PATTERN.match(name)
+    if match is None:
+        raise HTTPException(status_code=404, detail="Fotoğraf bulunamadı.")
+    return _photo_response(request, photo_store.thumbnail_path(match.group(1)), match.group(1), "image/jpeg")
+
+
+@router.get("/{name}")
+def get_photo(name: str, request: Request):
+    """
+    İndirilmiş orijinal fotoğraf. Ad: `<sha256>.<uzantı>` (campground_photos.file_name).
+    """
+    match = PHOTO_NAME_PATTERN.match(name)
+    if match is None:
+        raise HTTPException(status_code=404, detail="Fotoğraf bulunamadı.")
+    return _photo_response(request, photo_store.original_path(name), match.group(1), MEDIA_TYPES[match.group(2)])
@@ -0,0 +1,15 @@
+from fastapi.responses import JSONResponse
+
+from src.serialization import dumps_bytes
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    İçeriği src/serialization (varsayılan orjson) ile serileştiren JSON yanıtı; uygulamanın varsayılan yanıt sınıfıdır.
+
+    Endpoint'ler sözlük döndürdüğünde FastAPI önce jsonable_encoder ile tüm içeriği dolaşır. Yalnızca
+    JSON uyumlu değerler (str, sayı, bool, None, list, dict) döndüren sık çağrılan endpoint'ler bu
+    sınıfın örneğini doğrudan döndürerek o ek geçişi atlar.
+    """
+    def render(self, content) -> bytes:
+        return dumps_bytes(content)
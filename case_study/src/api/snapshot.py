@@ -0,0 +1,262 @@
+import datetime
+import itertools
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from sqlalchemy import select
+
+from src.config import SNAPSHOT_CACHE_SIZE
+from src.db.base import SessionLocal, get_engine
+from src.db.models import CampgroundORM
+from src.logger import logger
+from src.metrics import registry
+from src.utils.geo import EARTH_RADIUS_KM, GEO_CELL_COLUMNS, bbox_around, geo_cell
+
+snapshot_rows = registry.gauge("campground_snapshot_rows", "Bellekteki kamp alanı snapshot'ındaki kayıt sayısı.")
+snapshot_build_seconds = registry.histogram("campground_snapshot_build_seconds", "Snapshot'ın veritabanından yeniden oluşturulma süresi.")
+snapshot_queries_total = registry.counter("campground_snapshot_queries_total", "Snapshot sorguları.", ("cache",))
+
+# k-en yakın aramasında başlangıç yarıçapı (km); yeterli aday bulunamazsa iki katına çıkarılır
+_INITIAL_SEARCH_RADIUS_KM = 25.0
+# Bu yarıçapın üstünde ızgara yerine tüm kayıtlar taranır
+_FULL_SCAN_RADIUS_KM = 2500.0
+
+_SNAPSHOT_COLUMNS = (
+    CampgroundORM.id,
+    CampgroundORM.name,
+    CampgroundORM.latitude,
+    CampgroundORM.longitude,
+    CampgroundORM.rating,
+    CampgroundORM.price_low,
+    CampgroundORM.price_high,
+    CampgroundORM.bookable,
+)
+
+
+class SnapshotNotReady(Exception):
+    pass
+
+
+def _readonly(array):
+    array.flags.writeable = False
+    return array
+
+
+class CampgroundSnapshot:
+    """
+    campgrounds tablosunun değişmez, dizi tabanlı kopyası.
+
+    Kayıtlar geo_cell'e göre sıralı tutulur; bir ızgara satırındaki hücreler ardışık numaralı
+    olduğundan bir bbox, ızgara satırı başına tek bir searchsorted aralığına karşılık gelir.
+    Mesafeler aday kümesi üzerinde vektörel haversine ile hesaplanır.
+    """
+    _versions = itertools.count(1)
+
+    def __init__(self, ids, names, latitudes, longitudes, ratings, price_low, price_high, bookable):
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        cells = np.fromiter((geo_cell(lat, lon) for lat, lon in zip(latitudes, longitudes)), dtype=np.int64, count=len(latitudes))
+        order = np.argsort(cells, kind="stable")
+        self.cells = _readonly(cells[order])
+        self.ids = _readonly(np.asarray(ids, dtype=object)[order])
+        self.names = _readonly(np.asarray(names, dtype=object)[order])
+        self.latitudes = _readonly(latitudes[order])
+        self.longitudes = _readonly(longitudes[order])
+        self._lat_radians = _readonly(np.radians(self.latitudes))
+        self._lon_radians = _readonly(np.radians(self.longitudes))
+        self._cos_lat = _readonly(np.cos(self._lat_radians))
+        self.ratings = _readonly(np.asarray(ratings, dtype=np.float32)[order])
+        self.price_low = _readonly(np.asarray(price_low, dtype=np.float32)[order])
+        self.price_high = _readonly(np.asarray(price_high, dtype=np.float32)[order])
+        self.bookable = _readonly(np.asarray(bookable, dtype=bool)[order])
+        self.version = next(self._versions)
+        self.built_at = datetime.datetime.now(datetime.timezone.utc)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        (id, name, latitude, longitude, rating, price_low, price_high, bookable) satırlarından oluşturur.
+        Eksik sayısal değerler NaN olarak saklanır.
+        """
+        columns = list(zip(*rows)) or [()] * len(_SNAPSHOT_COLUMNS)
+        ids, names, latitudes, longitudes, ratings, price_low, price_high, bookable = columns
+        as_float = lambda values: [np.nan if value is None else value for value in values]
+        return cls(ids, names, latitudes, longitudes, as_float(ratings), as_float(price_low), as_float(price_high), [bool(value) for value in bookable])
+
+    @classmethod
+    def load(cls, session):
+        rows = session.execute(select(*_SNAPSHOT_COLUMNS).execution_options(yield_per=10000))
+        return cls.from_rows(rows)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _candidates(self, min_lon, min_lat, max_lon, max_lat):
+        first_cell = geo_cell(min_lat, min_lon)
+        last_cell = geo_cell(max_lat, max_lon)
+        first_row, first_column = divmod(first_cell, GEO_CELL_COLUMNS)
+        last_row, last_column = divmod(last_cell, GEO_CELL_COLUMNS)
+        row_starts = np.arange(first_row, last_row + 1, dtype=np.int64) * GEO_CELL_COLUMNS
+        starts = np.searchsorted(self.cells, row_starts + first_column, side="left")
+        ends = np.searchsorted(self.cells, row_starts + last_column, side="right")
+        ranges = [np.arange(start, end) for start, end in zip(starts, ends) if end > start]
+        return np.concatenate(ranges) if ranges else np.empty(0, dtype=np.int64)
+
+    def _distances_km(self, indexes, latitude, longitude):
+        lat = np.radians(latitude)
+        d_phi = self._lat_radians[indexes] - lat
+        d_lambda = self._lon_radians[indexes] - np.radians(longitude)
+        a = np.sin(d_phi / 2) ** 2 + np.cos(lat) * self._cos_lat[indexes] * np.sin(d_lambda / 2) ** 2
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+    def _filter(self, indexes, bookable, min_rating, max_price):
+        mask = np.ones(len(indexes), dtype=bool)
+        if bookable is not None:
+            mask &= self.bookable[indexes] == bookable
+        if min_rating is not None:
+            mask &= self.ratings[indexes] >= min_rating
+        if max_price is not None:
+            mask &= self.price_low[indexes] <= max_price
+        return indexes[mask]
+
+    def _within(self, latitude, longitude, radius_km, bookable, min_rating, max_price):
+        if radius_km >= _FULL_SCAN_RADIUS_KM:
+            indexes = np.arange(len(self))
+        else:
+            indexes = self._candidates(*bbox_around(latitude, longitude, radius_km))
+        indexes = self._filter(indexes, bookable, min_rating, max_price)
+        distances = self._distances_km(indexes, latitude, longitude)
+        inside = distances <= radius_km
+        return indexes[inside], distances[inside]
+
+    def nearest(self, latitude, longitude, k=10, radius_km=None, bookable=None, min_rating=None, max_price=None):
+        """
+        Merkeze en yakın `k` kaydı (isteğe bağlı olarak `radius_km` içinde) yakından uzağa döndürür.
+        Yarıçap verilmezse arama yarıçapı k kayıt bulunana kadar genişletilir.
+        """
+        if radius_km is not None:
+            indexes, distances = self._within(latitude, longitude, radius_km, bookable, min_rating, max_price)
+        else:
+            search_radius = _INITIAL_SEARCH_RADIUS_KM
+            while True:
+                indexes, distances = self._within(latitude, longitude, search_radius, bookable, min_rating, max_price)
+                if len(indexes) >= k or search_radius >= _FULL_SCAN_RADIUS_KM * 8:
+                    break
+                search_radius *= 2
+        if len(indexes) > k:
+            top = np.argpartition(distances, k - 1)[:k]
+            indexes, distances = indexes[top], distances[top]
+        order = np.argsort(distances, kind="stable")
+        return [self._item(index, distance) for index, distance in zip(indexes[order], distances[order])]
+
+    def _item(self, index, distance):
+        def optional(value):
+            return None if np.isnan(value) else round(float(value), 2)
+        return {
+            "id": self.ids[index],
+            "name": self.names[index],
+            "latitude": float(self.latitudes[index]),
+            "longitude": float(self.longitudes[index]),
+            "rating": optional(self.ratings[index]),
+            "price_low": optional(self.price_low[index]),
+            "price_high": optional(self.price_high[index]),
+            "bookable": bool(self.bookable[index]),
+            "distance_km": round(float(distance), 3),
+        }
+
+
+class SnapshotManager:
+    """
+    Güncel snapshot'ı ve son sorgu sonuçlarının LRU ön belleğini tutar.
+
+    Yeniden oluşturma ayrı bir thread'de yapılır; yeni snapshot hazır olduğunda tek bir atama ile
+    değiştirilir. Sorgular snapshot referansını bir kez okuduğundan, değişim sırasında bile tutarlı
+    bir kopya üzerinde çalışır ve veritabanına gitmez. Önbellek anahtarı snapshot sürümünü içerir.
+    """
+    def __init__(self, cache_size: int = SNAPSHOT_CACHE_SIZE, session_factory=None):
+        self.cache_size = cache_size
+        self._session_factory = session_factory
+        self._snapshot = None
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self._rebuild_thread = None
+        self._rebuild_pending = False
+
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    def _session(self):
+        if self._session_factory is not None:
+            return self._session_factory()
+        get_engine()
+        return SessionLocal.session_factory()
+
+    def rebuild(self):
+        """
+        Snapshot'ı veritabanından senkron olarak yeniden oluşturur ve değiştirir.
+        """
+        session = self._session()
+        try:
+            with snapshot_build_seconds.time():
+                snapshot = CampgroundSnapshot.load(session)
+        finally:
+            session.close()
+        self._snapshot = snapshot
+        with self._cache_lock:
+            self._cache.clear()
+        snapshot_rows.set(len(snapshot))
+        logger.info(f"Kamp alanı snapshot'ı yenilendi: {len(snapshot)} kayıt (sürüm {snapshot.version}).", extra={"component": "campground_snapshot"})
+        return snapshot
+
+    def schedule_rebuild(self):
+        """
+        Arka planda yeniden oluşturmayı başlatır. Zaten çalışan bir yeniden oluşturma varsa
+        bittiğinde bir kez daha çalışması işaretlenir; böylece istekler birleştirilir.
+        """
+        with self._rebuild_lock:
+            self._rebuild_pending = True
+            if self._rebuild_thread is not None and self._rebuild_thread.is_alive():
+                return
+            self._rebuild_thread = threading.Thread(target=self._rebuild_loop, name="campground-snapshot", daemon=True)
+            self._rebuild_thread.start()
+
+    def _rebuild_loop(self):
+        while True:
+            with self._rebuild_lock:
+                if not self._rebuild_pending:
+                    self._rebuild_thread = None
+                    return
+                self._rebuild_pending = False
+            try:
+                self.rebuild()
+            except Exception as e:
+                logger.error(f"Kamp alanı snapshot'ı yenilenemedi, önceki snapshot kullanılmaya devam ediyor: {e}", extra={"component": "campground_snapshot", "errtype": "DATABASE_ERROR"})
+
+    def nearest(self, latitude, longitude, k=10, radius_km=None, bookable=None, min_rating=None, max_price=None) -> dict:
+        snapshot = self._snapshot
+        if snapshot is None:
+            raise SnapshotNotReady("Kamp alanı snapshot'ı henüz hazır değil.")
+        key = (snapshot.version, latitude, longitude, k, radius_km, bookable, min_rating, max_price)
+        with self._cache_lock:
+            items = self._cache.get(key)
+            if items is not None:
+                self._cache.move_to_end(key)
+        if items is None:
+            snapshot_queries_total.inc(cache="miss")
+            items = snapshot.nearest(latitude, longitude, k, radius_km, bookable, min_rating, max_price)
+            with self._cache_lock:
+                self._cache[key] = items
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        else:
+            snapshot_queries_total.inc(cache="hit")
+        return {
+            "items": items,
+            "snapshot": {"version": snapshot.version, "rows": len(snapshot), "built_at": snapshot.built_at.isoformat()},
+        }
+
+
+campground_snapshot = SnapshotManager()
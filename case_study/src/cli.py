@@ -0,0 +1,371 @@
+"""
+FastAPI uygulamasını başlatmadan scraper'ı çalıştırmak için komut satırı arayüzü.
+
+Kullanım (case_study dizininden):
+    python main.py run                                      # yapılandırılan alanı bir kez tara
+    python main.py run --bbox=-125,24.5,-100,49.5 --bbox=-100,24.5,-66.9,49.5   # eksi ile başlayan değerlerde "=" gerekir
+    python main.py run --workers 4                          # alanı 4 şeride bölüp 4 işlemde tara
+    python main.py run --dry-run --profile profiles/        # veritabanı olmadan indir + doğrula, profil çıkar
+    python main.py run --from-file saved_responses/         # kaydedilmiş API yanıtlarını oynat
+    python main.py submit --shards 8 --wait                 # parçalı işi scrape_shards kuyruğuna ekle
+    python main.py worker --processes 4                     # kuyruktaki parçaları 4 işlemle çalıştır
+    python main.py photos --limit 1000                      # kayıtlı kamp alanlarının eksik fotoğraflarını indir
+    python main.py logs <job_id> --level WARNING            # bir işin loglarını (arşivler dahil) yazdır
+    python main.py logs --reindex                           # eski sıkıştırılmamış arşivleri sıkıştırıp dizine ekle
+    python main.py dead-letters                             # reddedilen kayıtların özetini yazdır
+    python main.py dead-letters --replay --error-type ValidationError   # model/ayrıştırıcı düzeltmesinden sonra yeniden oynat
+    python main.py schedule --interval-minutes 2            # eski davranış: aralıklı zamanlanmış çalışma
+"""
+import argparse
+import contextlib
+import cProfile
+import json
+import logging
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+from src.logger import ProcessLogForwarder, console_handler, logger
+from src.metrics import StageTimings
+from src.scraper.crawler import CrawlEngine, shard_bboxes
+
+# --profile raporunda listelenen fonksiyon ve bellek ayırma satırı sayısı
+PROFILE_TOP_FUNCTIONS = 40
+PROFILE_TOP_ALLOCATIONS = 25
+
+
+@contextlib.contextmanager
+def profiled(directory, label: str):
+    """
+    `directory` verilirse bloğu cProfile ve tracemalloc ile izler; `<label>.pstats` (snakeviz vb. ile
+    açılabilir) ve `<label>.txt` (en pahalı fonksiyonlar + bellek ayırmaları) dosyalarını yazar.
+    cProfile yalnızca çağıran thread'i izler; tarama thread'inin süresi aşama süreleri içinde `crawl_wait` olarak görünür.
+    """
+    if directory is None:
+        yield
+        return
+    os.makedirs(directory, exist_ok=True)
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        profiler.dump_stats(os.path.join(directory, f"{label}.pstats"))
+        report_path = os.path.join(directory, f"{label}.txt")
+        with open(report_path, "w", encoding="utf-8") as report:
+            pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+            report.write(f"\ntracemalloc: güncel {current / 1e6:.1f} MB, tepe {peak / 1e6:.1f} MB\n")
+            for statistic in snapshot.statistics("lineno")[:PROFILE_TOP_ALLOCATIONS]:
+                report.write(f"{statistic}\n")
+        logger.info(f"Profil yazıldı: {report_path}", extra={"component": "cli", "function": "profiled"})
+
+
+def dry_run_job(progress_callback=None, timings=None, bbox=None, crawl_engine=None):
+    """
+    run_scraper_job'ın veritabanına dokunmayan karşılığı: indirir (veya oynatır), ayrıştırır,
+    özet çıkarır ve doğrular; hiçbir şey yazmaz. HTTP önbelleği kullanılmaz, her sayfa işlenir.
+    """
+    from src.scraper.scraper import detect_changes, parse_locations, validate_rows
+
+    start_time = time.time()
+    timings = timings if timings is not None else StageTimings()
+    counts = {"processed": 0, "unchanged": 0, "valid": 0, "rejected": 0}
+    if crawl_engine is None:
+        engine_options = {"bbox": bbox} if bbox is not None else {}
+        crawl_engine = CrawlEngine(timings=timings, cache=None, **engine_options)
+    rows = parse_locations(timings.track(crawl_engine.iter_locations_sync(), "crawl_wait"), counts)
+    rows = detect_changes(rows, {}, counts, timings)
+    for _ in validate_rows(rows, counts, timings):
+        counts["valid"] += 1
+    if progress_callback is not None:
+        progress_callback(dict(counts, pages=crawl_engine.stats["pages"], failed_pages=crawl_engine.stats["failed_pages"]))
+    return f"[dry-run] {counts['processed']} kamp alanı {time.time() - start_time:.2f} saniyede işlendi ({counts['valid']} geçerli, {counts['rejected']} doğrulanamadı, {crawl_engine.stats['pages']} sayfa, {crawl_engine.stats['failed_pages']} başarısız sayfa)."
+
+
+def run_shard(task: dict) -> list:
+    """
+    Bir işlemin payına düşen bbox'ları sırayla çalıştırır. Süreç havuzunda çalıştırılabilmesi için
+    modül seviyesindedir; her bbox için {"bbox", "summary", "counts", "stages", "elapsed_seconds"} döndürür.
+    """
+    from src.scraper.replay import ResponseReplay
+    from src.scraper.scraper import run_scraper_job
+
+    job = dry_run_job if task["dry_run"] else run_scraper_job
+    results = []
+    with profiled(task["profile_dir"], task["label"]):
+        for bbox in task["bboxes"]:
+            timings = StageTimings()
+            progress = {}
+            options = {"bbox": bbox}
+            if task["from_file"]:
+                options["crawl_engine"] = ResponseReplay(task["from_file"])
+            if not task["dry_run"] and task["full_reconcile"]:
+                options["full_reconcile"] = True
+            start = time.perf_counter()
+            summary = job(progress.update, timings, **options)
+            results.append({
+                "bbox": bbox,
+                "summary": summary,
+                "counts": progress,
+                "stages": timings.as_dict(),
+                "elapsed_seconds": round(time.perf_counter() - start, 3),
+            })
+    return results
+
+
+def _run_command(args) -> int:
+    if args.from_file and (args.bbox or args.workers > 1):
+        raise SystemExit("--from-file, --bbox ve --workers ile birlikte kullanılamaz.")
+    if args.workers > 1:
+        bboxes = shard_bboxes(args.bbox or [CrawlEngine(cache=None).root_tile.to_param()], args.workers)
+    else:
+        # bbox verilmezse yapılandırılan alan kapsamsız olarak (uygulamadaki gibi) taranır.
+        bboxes = args.bbox or [None]
+    workers = min(args.workers, len(bboxes))
+    tasks = [
+        {
+            "bboxes": bboxes[worker::workers],
+            "dry_run": args.dry_run,
+            "from_file": args.from_file,
+            "full_reconcile": args.full_reconcile,
+            "profile_dir": args.profile,
+            "label": f"worker-{worker}" if workers > 1 else "run",
+        }
+        for worker in range(workers)
+    ]
+    if not args.dry_run and workers > 1:
+        # Şema, işlemler aynı anda CREATE TABLE denemesin diye bir kez burada hazırlanır.
+        from src.db.db import init_db
+        init_db()
+    start = time.perf_counter()
+    if workers == 1:
+        results = run_shard(tasks[0])
+    else:
+        # Scraper thread kullandığı için işlemler fork yerine spawn ile açılır; logları bu işlem yazar.
+        with ProcessLogForwarder() as log_forwarder, ProcessPoolExecutor(max_workers=workers, **log_forwarder.executor_options()) as executor:
+            results = [result for shard_results in executor.map(run_shard, tasks) for result in shard_results]
+    elapsed = time.perf_counter() - start
+    totals = {}
+    for result in results:
+        print(f"{result['bbox'] or 'yapılandırılan alan'}: {result['summary']}")
+        for key, value in result["counts"].items():
+            if isinstance(value, (int, float)) and key not in ("elapsed", "rows_per_sec"):
+                totals[key] = totals.get(key, 0) + value
+    print(f"Toplam ({len(results)} alan, {workers} işlem, {elapsed:.2f} sn): {json.dumps(totals, ensure_ascii=False)}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump({"elapsed_seconds": round(elapsed, 3), "workers": workers, "totals": totals, "runs": results}, output_file, ensure_ascii=False, indent=2)
+    return 0
+
+
+def _worker_loop(worker_index: int, exit_when_idle: bool) -> int:
+    """
+    Bir worker işleminin gövdesi: kuyruktan parça alıp çalıştırır. Süreç havuzu için modül seviyesindedir.
+    """
+    import threading
+    from src.db.db import init_db
+    from src.jobs.shards import ShardWorker, default_worker_id
+
+    init_db()
+    worker = ShardWorker(worker_id=default_worker_id(worker_index))
+    if not exit_when_idle:
+        worker.run_forever(threading.Event())
+        return 0
+    processed = 0
+    while worker.run_once():
+        processed += 1
+    return processed
+
+
+def _worker_command(args) -> int:
+    from src.db.db import init_db
+
+    init_db()
+    if args.processes == 1:
+        try:
+            processed = _worker_loop(0, args.exit_when_idle)
+        except KeyboardInterrupt:
+            return 0
+    else:
+        with ProcessLogForwarder() as log_forwarder, ProcessPoolExecutor(max_workers=args.processes, **log_forwarder.executor_options()) as executor:
+            processed = sum(executor.map(_worker_loop, range(args.processes), [args.exit_when_idle] * args.processes))
+    if args.exit_when_idle:
+        print(f"Kuyrukta parça kalmadı; {processed} parça çalıştırıldı.")
+    return 0
+
+
+def _submit_command(args) -> int:
+    import uuid
+    from src.db.db import init_db
+    from src.jobs import JOB_STATUS_RUNNING, job_store, plan_shards, shard_queue
+    from src.jobs.store import TERMINAL_STATUSES, utcnow
+    from src.scraper.scraper import full_reconcile_due
+
+    init_db()
+    job_id = f"cli_scraper_{uuid.uuid4()}"
+    now = utcnow()
+    job_store.save(job_id, job_name="CLI Parçalı Scraper", type="manual", status=JOB_STATUS_RUNNING, created_at=now, triggered_at=now, started_at=now, details="İş parçalara bölündü, worker'lar bekleniyor.")
+    # Yalnızca yapılandırılan alanın tamamı taranırken silme uzlaştırması yapılabilir.
+    full_reconcile = args.bbox is None and full_reconcile_due()
+    shard_count = shard_queue.enqueue(job_id, plan_shards(args.shards, args.bbox), full_reconcile)
+    print(f"İş {shard_count} parçayla kuyruğa eklendi{' (tam uzlaştırma)' if full_reconcile else ''}: {job_id}")
+    if not args.wait:
+        return 0
+    while True:
+        job = job_store.get(job_id)
+        if job and job.get("status") in TERMINAL_STATUSES:
+            break
+        time.sleep(args.poll_interval)
+    print(json.dumps(job, ensure_ascii=False, indent=2))
+    return 0 if job["status"] == "COMPLETED" else 1
+
+
+def _photos_command(args) -> int:
+    from src.db.base import get_session, remove_session
+    from src.db.db import init_db
+    from src.scraper.photos import backfill_photos
+
+    init_db()
+    session = get_session()
+    try:
+        stats = backfill_photos(session, limit=args.limit)
+    finally:
+        session.close()
+        remove_session()
+    print(json.dumps(stats, ensure_ascii=False, indent=2))
+    return 1 if stats["failed"] and not (stats["fetched"] or stats["deduplicated"]) else 0
+
+
+def _logs_command(args) -> int:
+    from src.logger import log_archive
+
+    if args.reindex:
+        counts = log_archive.reindex(on_file=lambda name: print(f"İşlendi: {name}", file=sys.stderr))
+        print(json.dumps(counts, ensure_ascii=False, indent=2))
+        return 0
+    if not args.job_id:
+        print("job_id veya --reindex verilmelidir.", file=sys.stderr)
+        return 2
+    for line in log_archive.iter_job_lines(args.job_id, min_level=args.level):
+        print(line)
+    return 0
+
+
+def _dead_letters_command(args) -> int:
+    from src.config import DEAD_LETTER_REPLAY_BATCH_SIZE
+    from src.db.base import get_session, remove_session
+    from src.db.db import init_db
+    from src.db.dead_letters import list_dead_letters
+    from src.scraper.dead_letters import replay_dead_letters
+
+    filters = {"stage": args.stage, "error_type": args.error_type, "model_version": args.model_version}
+    init_db()
+    session = get_session()
+    try:
+        if args.replay:
+            result = replay_dead_letters(
+                session,
+                batch_size=args.batch_size or DEAD_LETTER_REPLAY_BATCH_SIZE,
+                limit=args.limit,
+                progress_callback=lambda stats: print(f"{stats['replayed']} kayıt işlendi, {stats['written']} yazıldı", file=sys.stderr),
+                **filters,
+            )
+        else:
+            result = list_dead_letters(session, limit=args.limit or 20, **filters)
+    finally:
+        session.close()
+        remove_session()
+    print(json.dumps(result, ensure_ascii=False, indent=2, default=str))
+    return 1 if args.replay and result["replayed"] and not result["written"] else 0
+
+
+def _schedule_command(args) -> int:
+    from src.config import RUN_ON_STARTUP
+    from src.db.db import init_db
+    from src.scraper.scheduler import run_scheduled_job, start_scheduler
+
+    init_db()
+    scheduler = start_scheduler(minutes=args.interval_minutes)
+    logger.info(f"APScheduler başlatıldı. Scraper her {args.interval_minutes} dakikada bir çalışacak.", extra={"component": "main_app", "function": "main_runtime"})
+    if RUN_ON_STARTUP:
+        logger.info("RUN_ON_STARTUP=true, scraper hemen başlatılıyor.", extra={"component": "main_app", "function": "initial_run"})
+        # Zamanlayıcının ilk çalışmasıyla çakışmaması için aynı kilitle çalışır.
+        run_scheduled_job()
+    try:
+        while True:
+            time.sleep(60)
+    except (KeyboardInterrupt, SystemExit):
+        scheduler.shutdown()
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Kamp alanı scraper'ı (FastAPI uygulaması olmadan).")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"], help="Konsola yazılan en düşük log seviyesi")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Scraper'ı bir kez çalıştırır")
+    run_parser.add_argument("--bbox", action="append", default=[], metavar="MIN_LON,MIN_LAT,MAX_LON,MAX_LAT", help="Taranacak alan (tekrarlanabilir). Verilmezse CRAWL_BBOX / API_URL'deki alan")
+    run_parser.add_argument("--workers", type=int, default=1, help="Alanı bu kadar şeride bölüp ayrı işlemlerde tarar")
+    run_parser.add_argument("--dry-run", action="store_true", help="İndir ve doğrula, veritabanına bağlanma ve yazma")
+    run_parser.add_argument("--profile", metavar="DIR", default=None, help="cProfile (.pstats) ve tracemalloc raporlarını bu dizine yazar (çalışmayı belirgin şekilde yavaşlatır)")
+    run_parser.add_argument("--from-file", metavar="PATH", default=None, help="HTTP yerine kaydedilmiş yanıtları (.json / .jsonl dosyası veya dizini) oynatır")
+    run_parser.add_argument("--full-reconcile", action="store_true", help="HTTP önbelleği ve watermark'lar olmadan tam tarama")
+    run_parser.add_argument("--output", metavar="FILE", default=None, help="Sonuçları (sayaçlar, aşama süreleri) JSON olarak bu dosyaya yazar")
+    run_parser.set_defaults(handler=_run_command)
+
+    worker_parser = subparsers.add_parser("worker", help="scrape_shards kuyruğundaki parçaları çalıştırır")
+    worker_parser.add_argument("--processes", type=int, default=1, help="Aynı makinede çalıştırılacak worker işlemi sayısı")
+    worker_parser.add_argument("--exit-when-idle", action="store_true", help="Kuyrukta alınacak parça kalmayınca çık")
+    worker_parser.set_defaults(handler=_worker_command)
+
+    submit_parser = subparsers.add_parser("submit", help="Parçalı bir scraper işini kuyruğa ekler")
+    submit_parser.add_argument("--shards", type=int, default=4, help="İşin bölüneceği bbox parçası sayısı")
+    submit_parser.add_argument("--bbox", default=None, metavar="MIN_LON,MIN_LAT,MAX_LON,MAX_LAT", help="Bölünecek alan. Verilmezse CRAWL_BBOX / API_URL'deki alan")
+    submit_parser.add_argument("--wait", action="store_true", help="İş sonuçlanana kadar bekle ve sonucu yazdır")
+    submit_parser.add_argument("--poll-interval", type=float, default=2)
+    submit_parser.set_defaults(handler=_submit_command)
+
+    photos_parser = subparsers.add_parser("photos", help="Kayıtlı kamp alanlarının eksik fotoğraflarını indirir")
+    photos_parser.add_argument("--limit", type=int, default=None, help="Yalnızca ilk N kamp alanına bak")
+    photos_parser.set_defaults(handler=_photos_command)
+
+    logs_parser = subparsers.add_parser("logs", help="Bir işin log kayıtlarını job_id dizini üzerinden yazdırır")
+    logs_parser.add_argument("job_id", nargs="?", default=None)
+    logs_parser.add_argument("--level", default=None, choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"], help="Bu seviyenin altındaki kayıtları atla")
+    logs_parser.add_argument("--reindex", action="store_true", help="Dizinde olmayan arşivleri (eski .json dosyaları dahil) sıkıştırıp dizine ekler")
+    logs_parser.set_defaults(handler=_logs_command)
+
+    dead_letters_parser = subparsers.add_parser("dead-letters", help="Reddedilen kayıtları listeler veya yeniden doğrulayıp yazar")
+    dead_letters_parser.add_argument("--replay", action="store_true", help="Kayıtları güncel modelle yeniden doğrula ve partiler halinde yaz")
+    dead_letters_parser.add_argument("--stage", default=None, choices=["validate", "write"])
+    dead_letters_parser.add_argument("--error-type", default=None, help="Yalnızca bu hata türü (ör. ValidationError)")
+    dead_letters_parser.add_argument("--model-version", default=None, help="Yalnızca bu model sürümüyle reddedilmiş kayıtlar")
+    dead_letters_parser.add_argument("--limit", type=int, default=None, help="Listelenecek / yeniden oynatılacak azami kayıt sayısı")
+    dead_letters_parser.add_argument("--batch-size", type=int, default=None, help="Yeniden oynatma partisi (varsayılan DEAD_LETTER_REPLAY_BATCH_SIZE)")
+    dead_letters_parser.set_defaults(handler=_dead_letters_command)
+
+    schedule_parser = subparsers.add_parser("schedule", help="Scraper'ı belirli aralıklarla çalıştırır")
+    schedule_parser.add_argument("--interval-minutes", type=float, default=2)
+    schedule_parser.set_defaults(handler=_schedule_command)
+
+    # Argümansız çağrı eski main.py davranışını (zamanlanmış çalışma) korur.
+    argv = sys.argv[1:] if argv is None else argv
+    args = parser.parse_args(argv or ["schedule"])
+    if getattr(args, "workers", 1) < 1 or getattr(args, "processes", 1) < 1 or getattr(args, "shards", 1) < 1:
+        parser.error("--workers, --processes ve --shards en az 1 olmalıdır.")
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    console_handler.setLevel(getattr(logging, args.log_level))
+    return args.handler(args)
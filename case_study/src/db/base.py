@@ -1,14 +1,69 @@
+import threading
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from src.config import DATABASE_URL
+from sqlalchemy.orm import sessionmaker, scoped_session
+from src.config import (
+    DATABASE_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+)
 
 Base = declarative_base()
 
+# Süreç genelinde tek engine; ilk kullanımda oluşturulur.
+_engine = None
+_engine_lock = threading.Lock()
+
+# Scraper ve FastAPI uygulamasının paylaştığı session fabrikası. Scraper iş parçacıkları
+# thread-local oturumu (SessionLocal()) kullanır, API istekleri ise her istek için
+# SessionLocal.session_factory() ile yeni bir oturum açar.
+SessionLocal = scoped_session(sessionmaker(expire_on_commit=False))
+
+def _engine_options():
+    if DATABASE_URL.startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
 def get_engine():
-    return create_engine(DATABASE_URL)
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine(DATABASE_URL, **_engine_options())
+                SessionLocal.configure(bind=_engine)
+    return _engine
 
 def get_session():
-    engine = get_engine()
-    Session = sessionmaker(bind=engine)
-    return Session()
+    get_engine()
+    return SessionLocal()
+
+def remove_session():
+    SessionLocal.remove()
+
+def dispose_engine():
+    global _engine
+    with _engine_lock:
+        SessionLocal.remove()
+        if _engine is not None:
+            _engine.dispose()
+            _engine = None
+
+def get_db():
+    """
+    FastAPI bağımlılığı: istek başına paylaşılan fabrikadan bir oturum açar ve istek sonunda kapatır.
+    """
+    get_engine()
+    session = SessionLocal.session_factory()
+    try:
+        yield session
+    finally:
+        session.close()
@@ -1,51 +1,250 @@
-from sqlalchemy import create_engine, inspect
+from datetime import datetime, timezone
+from sqlalchemy import create_engine, inspect, select, text, DateTime
+from sqlalchemy.exc import InterfaceError, OperationalError, SQLAlchemyError
 from sqlalchemy.orm import sessionmaker
 from src.db.base import Base, get_engine, get_session
-from src.db.models import CampgroundORM
+from src.db.models import CampgroundORM, CampgroundObservationORM, CampgroundPhotoORM, CrawlStateORM
 from src.logger import logger, DatabaseException, handle_exception
-from src.config import DATABASE_URL
+from src.config import DATABASE_URL, DB_CONNECT_DEADLINE, UPSERT_CHUNK_SIZE
+from src.utils.geo import geo_cell
+from src.metrics import db_rows_written_total, db_write_seconds, timed
+
+# Şema süreç başına bir kez hazırlanır; sonraki init_db çağrıları veritabanına gitmez.
+_schema_ready = False
 
 def init_db():
+    global _schema_ready
+    if _schema_ready:
+        return
     def op():
         engine = get_engine()
         inspector = inspect(engine)
-        if not inspector.has_table("campgrounds"):
+        missing_tables = [table.name for table in Base.metadata.sorted_tables if not inspector.has_table(table.name)]
+        if missing_tables:
             Base.metadata.create_all(engine)
-            logger.info("Veritabanı başlatıldı ve tablolar oluşturuldu.")
+            logger.info(f"Veritabanı başlatıldı ve tablolar oluşturuldu: {', '.join(missing_tables)}")
         else:
             logger.info("Veritabanı zaten başlatılmış. Tablo oluşturma atlanıyor.")
+        if CampgroundObservationORM.__tablename__ in missing_tables:
+            from src.db.observations import seed_observations
+            seed_observations(engine)
+        _migrate_photo_primary_key(engine, inspector, missing_tables)
+        _add_missing_columns(engine, inspector, missing_tables)
+        _add_missing_indexes(engine, inspector, missing_tables)
+        _backfill_geo_cells(engine)
         return True
     from src.utils import retry_operation
     try:
+        # Yalnızca bağlantı hataları yeniden denenir; şema/SQL hataları ilk denemede yüzeye çıkar.
         retry_operation(
             op,
-            max_retries=5,
-            initial_wait=3,
+            max_retries=8,
+            initial_wait=1,
             backoff_factor=2,
-            exception_types=(Exception,),
-            context="init_db"
+            exception_types=(OperationalError, InterfaceError),
+            context="init_db",
+            max_wait=10,
+            deadline=DB_CONNECT_DEADLINE
         )
     except Exception:
         raise DatabaseException("Birden fazla denemeden sonra veritabanına bağlanılamadı.")
+    _schema_ready = True
+
+def _migrate_photo_primary_key(engine, inspector, skip_tables):
+    """
+    campground_photos eskiden yalnızca url ile anahtarlanıyordu; aynı URL'yi paylaşan kamp alanlarından biri
+    fotoğrafı kaybediyordu. Tablo (campground_id, url) anahtarıyla yeniden oluşturulur ve satırlar taşınır.
+    """
+    table = CampgroundPhotoORM.__table__
+    if table.name in skip_tables:
+        return
+    primary_key = inspector.get_pk_constraint(table.name)
+    if primary_key["constrained_columns"] != ["url"]:
+        return
+    old_name = f"{table.name}_url_pk"
+    columns = ", ".join(column["name"] for column in inspector.get_columns(table.name) if column["name"] in table.columns)
+    with engine.begin() as connection:
+        # İndeks ve (PostgreSQL'de) anahtar kısıtı adları yeni tabloyla çakışmasın diye önce kaldırılır.
+        for index in inspector.get_indexes(table.name):
+            connection.execute(text(f"DROP INDEX {index['name']}"))
+        if engine.dialect.name != "sqlite" and primary_key.get("name"):
+            connection.execute(text(f"ALTER TABLE {table.name} DROP CONSTRAINT {primary_key['name']}"))
+        connection.execute(text(f"ALTER TABLE {table.name} RENAME TO {old_name}"))
+        table.create(connection)
+        connection.execute(text(f"INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {old_name}"))
+        connection.execute(text(f"DROP TABLE {old_name}"))
+    inspector.clear_cache()
+    logger.info(f"{table.name} tablosu (campground_id, url) anahtarıyla yeniden oluşturuldu.")
+
+def _add_missing_columns(engine, inspector, skip_tables):
+    """
+    Mevcut tablolara modele sonradan eklenen (nullable) kolonları ekler.
+    """
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if table.name in skip_tables:
+                continue
+            existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                logger.info(f"Kolon eklendi: {table.name}.{column.name}")
+
+def _add_missing_indexes(engine, inspector, skip_tables):
+    """
+    Mevcut tablolara modelde tanımlı ama veritabanında olmayan indeksleri ekler.
+    """
+    for table in Base.metadata.sorted_tables:
+        if table.name in skip_tables:
+            continue
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing_indexes:
+                continue
+            index.create(engine)
+            logger.info(f"İndeks eklendi: {table.name}.{index.name}")
+
+def _backfill_geo_cells(engine):
+    """
+    geo_cell kolonu eklenmeden önce yazılmış kayıtların hücre numaralarını hesaplar
+    (src/utils/geo.py ile aynı formül). Koordinatlar pozitife kaydırıldığından SQLite'ta CAST taban alır;
+    PostgreSQL ise CAST'te yuvarladığı için FLOOR kullanılır.
+    """
+    from src.utils.geo import GEO_CELL_COLUMNS, GEO_CELL_SIZE
+    floor = "CAST({} AS INTEGER)" if engine.dialect.name == "sqlite" else "CAST(FLOOR({}) AS INTEGER)"
+    cell_row = floor.format("(latitude + 90) / :cell_size")
+    cell_column = floor.format("(longitude + 180) / :cell_size")
+    with engine.begin() as connection:
+        result = connection.execute(text(
+            f"UPDATE campgrounds SET geo_cell = {cell_row} * :columns + {cell_column} WHERE geo_cell IS NULL"
+        ), {"cell_size": GEO_CELL_SIZE, "columns": GEO_CELL_COLUMNS})
+        if result.rowcount:
+            logger.info(f"{result.rowcount} kamp alanının geo_cell değeri hesaplandı.")
+
+def load_campground_hashes(session):
+    """
+    Kayıtlı tüm kamp alanlarının id -> content_hash eşlemesini tek sorguda yükler.
+    """
+    return dict(session.execute(select(CampgroundORM.id, CampgroundORM.content_hash)).all())
 
-def insert_campground_to_db(session, validated_campground):
+def load_crawl_state(session):
+    """
+    crawl_state tablosunu anahtar -> UTC zaman eşlemesi olarak yükler.
+    """
+    state = {}
+    for key, value in session.execute(select(CrawlStateORM.key, CrawlStateORM.value)).all():
+        # SQLite zaman dilimini saklamaz; değerler UTC olarak yazılır.
+        if value is not None and value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        state[key] = value
+    return state
+
+def save_crawl_state(session, values):
+    """
+    Verilen anahtar -> zaman değerlerini crawl_state tablosuna yazar (varsa günceller).
+    """
+    now = datetime.now(timezone.utc)
+    try:
+        for key, value in values.items():
+            session.merge(CrawlStateORM(key=key, value=value, updated_at=now))
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        handle_exception(DatabaseException(str(e)), context="save_crawl_state")
+
+def delete_campgrounds(session, ids, chunk_size=UPSERT_CHUNK_SIZE):
+    """
+    Verilen id'lere sahip kamp alanlarını parçalar halinde tek transaction içinde siler; silinen satır sayısını döndürür.
+    """
+    ids = list(ids)
+    deleted = 0
+    try:
+        for start in range(0, len(ids), chunk_size):
+            result = session.execute(CampgroundORM.__table__.delete().where(CampgroundORM.id.in_(ids[start:start + chunk_size])))
+            deleted += result.rowcount
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        handle_exception(DatabaseException(str(e)), context="delete_campgrounds")
+        return 0
+    return deleted
+
+def campground_to_row(validated_campground, content_hash=None):
+    """
+    Doğrulanmış Campground nesnesini campgrounds tablosuna yazılmaya hazır bir sözlüğe çevirir.
+    """
     from src.utils import sanitize_data
+    db_data = CampgroundORM.prepare_data_for_db(validated_campground)
+    db_data = sanitize_data(db_data)
+    row = {}
+    for column in CampgroundORM.__table__.columns:
+        if column.name not in db_data:
+            continue
+        value = db_data[column.name]
+        # prepare_data_for_db tarihleri ISO metne çeviriyor; Core insert ise datetime bekler.
+        if isinstance(column.type, DateTime) and isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        row[column.name] = value
+    if content_hash is not None:
+        row["content_hash"] = content_hash
+    row["geo_cell"] = geo_cell(row["latitude"], row["longitude"])
+    return row
+
+def _upsert_statement(session, rows):
+    if session.get_bind().dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    table = CampgroundORM.__table__
+    stmt = insert(table).values(rows)
+    update_columns = {column.name: stmt.excluded[column.name] for column in table.columns if column.name != "id"}
+    return stmt.on_conflict_do_update(index_elements=["id"], set_=update_columns)
+
+@timed(db_write_seconds, operation="bulk_upsert")
+def bulk_upsert_rows(session, rows, chunk_size=UPSERT_CHUNK_SIZE):
+    """
+    campground_to_row ile hazırlanmış satırları INSERT ... ON CONFLICT (id) DO UPDATE ile parçalar
+    halinde ve tek bir transaction içinde yazar. Hata veren bir parça savepoint ile geri alınır ve
+    satır satır yeniden denenir; böylece yalnızca bozuk satırlar atlanır. Transaction'ın kendisi başarısız
+    olursa (ör. commit hatası) hiçbir satır yazılmamış sayılır ve tüm satırlar hatayla birlikte başarısız döner.
+
+    Dönüş: {"written": int, "failed": int, "failed_ids": list, "errors": {id: {"error_type", "error"}}}
+    """
+    # Aynı id tek bir ON CONFLICT ifadesinde iki kez yer alamaz; son gelen kayıt geçerli.
+    rows = list({row["id"]: row for row in rows}.values())
+    written = 0
+    failed_ids = []
+    errors = {}
     try:
-        db_data = CampgroundORM.prepare_data_for_db(validated_campground)
-        db_data = sanitize_data(db_data)
-        existing_campground = session.query(CampgroundORM).filter_by(id=db_data["id"]).first()
-        if existing_campground:
-            logger.info(f"Kamp alanı zaten mevcut. Kayıt güncelleniyor: {validated_campground.name}")
-            for key, value in db_data.items():
-                if hasattr(existing_campground, key):
-                    setattr(existing_campground, key, value)
-            logger.info(f"Kamp alanı başarıyla güncellendi: {validated_campground.name}")
-        else:
-            logger.info(f"Kamp alanı mevcut değil. Yeni kayıt ekleniyor: {validated_campground.name}")
-            new_campground = CampgroundORM(**db_data)
-            session.add(new_campground)
-            logger.info(f"Yeni kamp alanı başarıyla eklendi: {validated_campground.name}")
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            try:
+                with session.begin_nested():
+                    session.execute(_upsert_statement(session, chunk))
+                written += len(chunk)
+            except SQLAlchemyError as chunk_error:
+                logger.warning(f"{len(chunk)} satırlık parça yazılamadı, satırlar tek tek deneniyor: {chunk_error}", extra={"component": "bulk_upsert_rows", "errtype": "DATABASE_ERROR"})
+                for row in chunk:
+                    try:
+                        with session.begin_nested():
+                            session.execute(_upsert_statement(session, [row]))
+                        written += 1
+                    except SQLAlchemyError as row_error:
+                        failed_ids.append(row["id"])
+                        errors[row["id"]] = {"error_type": type(row_error).__name__, "error": str(getattr(row_error, "orig", None) or row_error)}
+                        logger.error(f"Kamp alanı yazılamadı, atlanıyor: {row['id']} | {row_error}", extra={"component": "bulk_upsert_rows", "errtype": "DATABASE_ERROR"})
         session.commit()
+        db_rows_written_total.inc(written, operation="bulk_upsert")
+        logger.info(f"Toplu upsert tamamlandı: {written} yazıldı, {len(failed_ids)} başarısız.", extra={"component": "bulk_upsert_rows"})
     except Exception as e:
         session.rollback()
-        handle_exception(DatabaseException(str(e)), context=f"insert_campground_to_db: {validated_campground.name}")
+        # Hata yükseltilmez: parti başarısız sayılır, çağıran satırları dead-letter olarak saklayıp devam eder.
+        logger.critical(f"Toplu upsert transaction'ı başarısız, {len(rows)} satır yazılmadı: {e}", extra={"component": "bulk_upsert_rows", "errtype": "DATABASE_ERROR"})
+        # Rollback parça parça yazılanları da geri aldı; commit edilmemiş her satır başarısızdır.
+        written = 0
+        error = {"error_type": type(e).__name__, "error": str(getattr(e, "orig", None) or e)}
+        errors = {row["id"]: errors.get(row["id"], error) for row in rows}
+        failed_ids = [row["id"] for row in rows]
+    return {"written": written, "failed": len(failed_ids), "failed_ids": failed_ids, "errors": errors}
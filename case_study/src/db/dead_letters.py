@@ -0,0 +1,195 @@
+"""
+dead_letters tablosu: scraper'ın reddettiği kamp alanlarının sıkıştırılmış ham verisi.
+
+Doğrulamada (Campground.validate_api_data) veya yazmada (bulk_upsert_rows) reddedilen kayıtların ham API verisi
+zlib ile sıkıştırılmış JSON olarak hata türü, iş kimliği ve model sürümüyle birlikte saklanır. Kayıtlar
+src/scraper/dead_letters.py'deki replay_dead_letters ile yeniden doğrulanıp toplu olarak yazılır.
+"""
+import datetime
+import zlib
+from collections import Counter
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.config import DEAD_LETTER_COMPRESSION_LEVEL, UPSERT_CHUNK_SIZE
+from src.db.models import DeadLetterORM
+from src.logger import DatabaseException, handle_exception
+from src.metrics import registry
+from src.models.campground import CAMPGROUND_MODEL_VERSION
+from src.serialization import dumps_bytes, loads
+from src.utils.utils import content_hash
+
+DEAD_LETTER_STAGE_VALIDATE = "validate"
+DEAD_LETTER_STAGE_WRITE = "write"
+
+_TABLE = DeadLetterORM.__table__
+
+dead_letters_total = registry.counter("scraper_dead_letters_total", "dead_letters tablosuna yazılan reddedilmiş kayıtlar.", ("stage",))
+
+
+def decompress_payload(payload: bytes) -> dict:
+    return loads(zlib.decompress(payload))
+
+
+def dead_letter_row(raw_data: dict, stage: str, error_type: str, error: str, job_id=None, row_hash=None, now=None) -> dict:
+    """
+    Reddedilen ham kaydı dead_letters satırına çevirir. parse_locations'ın eklediği `index` alanı saklanmaz.
+    """
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    payload = {key: value for key, value in raw_data.items() if key != "index"}
+    encoded = dumps_bytes(payload)
+    key = payload.get("id")
+    return {
+        "campground_id": str(key) if key is not None else f"hash:{row_hash or content_hash(payload)}",
+        "job_id": job_id,
+        "stage": stage,
+        "error_type": error_type,
+        "error": error,
+        "model_version": CAMPGROUND_MODEL_VERSION,
+        "payload": zlib.compress(encoded, DEAD_LETTER_COMPRESSION_LEVEL),
+        "payload_bytes": len(encoded),
+        "attempts": 1,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def _upsert_statement(session, rows):
+    if session.get_bind().dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    stmt = insert(_TABLE).values(rows)
+    # İlk reddedilme zamanı korunur; satırda olmayan kolonlar (ör. yeniden oynatmada job_id) değişmez.
+    update_columns = {name: stmt.excluded[name] for name in rows[0] if name not in ("campground_id", "created_at", "attempts")}
+    update_columns["attempts"] = _TABLE.c.attempts + 1
+    return stmt.on_conflict_do_update(index_elements=["campground_id"], set_=update_columns)
+
+
+def save_dead_letters(session, rows, chunk_size=UPSERT_CHUNK_SIZE) -> int:
+    """
+    dead_letter_row satırlarını yazar; kamp alanının kaydı varsa günceller ve `attempts`'i artırır.
+    Yazılan satır sayısını döndürür. Satırlar aynı kolonlara sahip olmalıdır.
+    """
+    rows = list({row["campground_id"]: row for row in rows}.values())
+    if not rows:
+        return 0
+    try:
+        for start in range(0, len(rows), chunk_size):
+            session.execute(_upsert_statement(session, rows[start:start + chunk_size]))
+        session.commit()
+    except SQLAlchemyError as e:
+        session.rollback()
+        handle_exception(DatabaseException(str(e)), context="save_dead_letters")
+        return 0
+    for stage, count in Counter(row["stage"] for row in rows).items():
+        dead_letters_total.inc(count, stage=stage)
+    return len(rows)
+
+
+def load_dead_letter_ids(session) -> set:
+    """
+    Bekleyen tüm dead-letter kayıtlarının kamp alanı id'leri.
+    """
+    return set(session.execute(select(DeadLetterORM.campground_id)).scalars())
+
+
+def resolve_dead_letters(session, ids, chunk_size=UPSERT_CHUNK_SIZE) -> int:
+    """
+    Başarıyla yazılan kamp alanlarının dead-letter kayıtlarını siler; silinen satır sayısını döndürür.
+    """
+    ids = list(ids)
+    resolved = 0
+    try:
+        for start in range(0, len(ids), chunk_size):
+            result = session.execute(delete(DeadLetterORM).where(DeadLetterORM.campground_id.in_(ids[start:start + chunk_size])))
+            resolved += result.rowcount
+        session.commit()
+    except SQLAlchemyError as e:
+        session.rollback()
+        handle_exception(DatabaseException(str(e)), context="resolve_dead_letters")
+        return 0
+    return resolved
+
+
+def _filtered(query, stage=None, error_type=None, model_version=None):
+    if stage is not None:
+        query = query.where(DeadLetterORM.stage == stage)
+    if error_type is not None:
+        query = query.where(DeadLetterORM.error_type == error_type)
+    if model_version is not None:
+        query = query.where(DeadLetterORM.model_version == model_version)
+    return query
+
+
+def iter_dead_letter_batches(session, batch_size: int, limit: int = None, **filters):
+    """
+    Filtreye uyan dead-letter kayıtlarını campground_id sırasıyla `batch_size`'lık [(campground_id, ham veri), ...]
+    listeleri olarak üretir. Sayfalama anahtara göre yapıldığından partiler arasında silinen veya güncellenen
+    kayıtlar sonraki partileri kaydırmaz.
+    """
+    last_key = None
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = batch_size if remaining is None else min(batch_size, remaining)
+        query = _filtered(select(DeadLetterORM.campground_id, DeadLetterORM.payload), **filters)
+        if last_key is not None:
+            query = query.where(DeadLetterORM.campground_id > last_key)
+        rows = session.execute(query.order_by(DeadLetterORM.campground_id).limit(size)).all()
+        if not rows:
+            return
+        yield [(key, decompress_payload(payload)) for key, payload in rows]
+        last_key = rows[-1][0]
+        if remaining is not None:
+            remaining -= len(rows)
+        if len(rows) < size:
+            return
+
+
+def count_dead_letters(session, **filters) -> int:
+    return session.execute(_filtered(select(func.count()).select_from(DeadLetterORM), **filters)).scalar_one()
+
+
+def list_dead_letters(session, cursor: str = None, limit: int = 50, **filters) -> dict:
+    """
+    Dead-letter kayıtlarını (ham veri olmadan) campground_id sırasıyla sayfalı listeler ve aşama / hata türü /
+    model sürümüne göre gruplanmış sayıları döndürür.
+    """
+    query = _filtered(select(DeadLetterORM), **filters)
+    if cursor is not None:
+        query = query.where(DeadLetterORM.campground_id > cursor)
+    items = [row.to_dict() for row in session.execute(query.order_by(DeadLetterORM.campground_id).limit(limit)).scalars()]
+    groups = session.execute(
+        _filtered(
+            select(
+                DeadLetterORM.stage,
+                DeadLetterORM.error_type,
+                DeadLetterORM.model_version,
+                func.count(),
+                func.sum(DeadLetterORM.payload_bytes),
+                func.sum(func.length(DeadLetterORM.payload)),
+            ),
+            **filters,
+        ).group_by(DeadLetterORM.stage, DeadLetterORM.error_type, DeadLetterORM.model_version)
+    ).all()
+    return {
+        "total": sum(group[3] for group in groups),
+        "model_version": CAMPGROUND_MODEL_VERSION,
+        "groups": [
+            {"stage": stage, "error_type": error_type, "model_version": model_version, "count": count, "payload_bytes": int(raw_bytes or 0), "compressed_bytes": int(compressed_bytes or 0)}
+            for stage, error_type, model_version, count, raw_bytes, compressed_bytes in groups
+        ],
+        "items": items,
+        "next_cursor": items[-1]["campground_id"] if len(items) == limit else None,
+    }
+
+
+def get_dead_letter(session, campground_id: str):
+    """
+    Tek bir dead-letter kaydını açılmış ham verisiyle (`payload`) döndürür; yoksa None.
+    """
+    row = session.get(DeadLetterORM, campground_id)
+    if row is None:
+        return None
+    return {**row.to_dict(), "payload": decompress_payload(row.payload)}
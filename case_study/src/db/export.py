@@ -0,0 +1,158 @@
+"""
+campgrounds tablosunun kolon tabanlı (Parquet / Arrow IPC) dışa aktarımı.
+
+Kullanım (case_study dizininden):
+    python -m src.db.export --format parquet --output exports/campgrounds.parquet
+    python -m src.db.export --format arrow --output exports/campgrounds.arrow
+
+Satırlar sunucu taraflı imleçle EXPORT_CHUNK_SIZE'lık parçalar halinde okunup dosyaya yazılır;
+bellekte aynı anda yalnızca bir parça tutulur. Arrow IPC dosyaları sıkıştırılmadan yazıldığı için
+yerel okuyucular `pyarrow.memory_map` ile kopyalamadan açabilir.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import JSON, Boolean, DateTime, Float, Integer, select
+
+from src.config import EXPORT_CHUNK_SIZE, EXPORT_DIR, EXPORT_MAX_AGE
+from src.db.base import get_engine
+from src.db.models import CampgroundORM
+from src.logger import logger
+from src.metrics import registry
+from src.serialization import dumps
+
+export_seconds = registry.histogram("campground_export_seconds", "campgrounds dışa aktarım süresi.", ("format",))
+export_requests_total = registry.counter("campground_export_requests_total", "Dışa aktarım istekleri.", ("format", "cache"))
+
+EXPORT_FORMATS = {
+    "parquet": {"extension": "parquet", "media_type": "application/vnd.apache.parquet"},
+    "arrow": {"extension": "arrow", "media_type": "application/vnd.apache.arrow.file"},
+}
+
+# Liste olarak saklanan JSON kolonları Arrow'da list<string> olur; diğer JSON kolonları (links) metin olarak yazılır.
+_LIST_COLUMNS = ("accommodation_type_names", "camper_types", "photo_urls")
+
+
+def _arrow_type(column):
+    if column.name in _LIST_COLUMNS:
+        return pa.list_(pa.string())
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us", tz="UTC" if column.type.timezone else None)
+    return pa.string()
+
+
+_EXPORT_COLUMNS = [column for column in CampgroundORM.__table__.columns if column.name not in CampgroundORM._internal_columns]
+CAMPGROUND_SCHEMA = pa.schema([pa.field(column.name, _arrow_type(column), nullable=column.nullable or column.name in _LIST_COLUMNS) for column in _EXPORT_COLUMNS])
+_JSON_TEXT_COLUMNS = [index for index, column in enumerate(_EXPORT_COLUMNS) if isinstance(column.type, JSON) and column.name not in _LIST_COLUMNS]
+
+
+def iter_record_batches(engine=None, chunk_size: int = EXPORT_CHUNK_SIZE):
+    """
+    campgrounds tablosunu id sırasıyla okuyup CAMPGROUND_SCHEMA biçiminde RecordBatch'ler üretir.
+    PostgreSQL'de `stream_results` sunucu taraflı (adlandırılmış) imleç kullanır.
+    """
+    engine = engine or get_engine()
+    query = select(*_EXPORT_COLUMNS).order_by(CampgroundORM.id)
+    with engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, yield_per=chunk_size).execute(query)
+        for rows in result.partitions(chunk_size):
+            columns = [list(values) for values in zip(*rows)]
+            for index in _JSON_TEXT_COLUMNS:
+                columns[index] = [dumps(value) if value is not None else None for value in columns[index]]
+            yield pa.RecordBatch.from_arrays([pa.array(values, type=field.type) for values, field in zip(columns, CAMPGROUND_SCHEMA)], schema=CAMPGROUND_SCHEMA)
+
+
+def _open_writer(path: str, export_format: str):
+    if export_format == "parquet":
+        return pq.ParquetWriter(path, CAMPGROUND_SCHEMA, compression="zstd")
+    # IPC dosya biçimi (stream değil) rastgele erişimlidir; memory_map ile açılabilmesi için sıkıştırılmaz.
+    return pa.ipc.new_file(path, CAMPGROUND_SCHEMA)
+
+
+def export_campgrounds(path: str, export_format: str = "parquet", chunk_size: int = EXPORT_CHUNK_SIZE, engine=None) -> dict:
+    """
+    campgrounds tablosunu `path`'e yazar. Dosya önce geçici bir adla yazılıp sonra yerine taşınır;
+    okuyucular hiçbir zaman yarım dosya görmez.
+
+    Dönüş: {"path": str, "format": str, "rows": int, "bytes": int, "seconds": float}
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Desteklenmeyen format: {export_format} (beklenen: {', '.join(EXPORT_FORMATS)})")
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    rows = 0
+    start = time.perf_counter()
+    try:
+        with export_seconds.time(format=export_format):
+            writer = _open_writer(tmp_path, export_format)
+            try:
+                for batch in iter_record_batches(engine, chunk_size):
+                    writer.write_batch(batch)
+                    rows += batch.num_rows
+            finally:
+                writer.close()
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    result = {"path": path, "format": export_format, "rows": rows, "bytes": os.path.getsize(path), "seconds": round(time.perf_counter() - start, 3)}
+    logger.info(f"campgrounds dışa aktarıldı: {rows} kayıt, {result['bytes']} bayt, {result['seconds']} sn -> {path}", extra={"component": "export", "function": "export_campgrounds"})
+    return result
+
+
+_export_locks = {export_format: threading.Lock() for export_format in EXPORT_FORMATS}
+
+
+def get_cached_export(export_format: str, max_age: float = EXPORT_MAX_AGE, directory: str = EXPORT_DIR) -> str:
+    """
+    EXPORT_DIR'deki son dışa aktarımın yolunu döndürür; dosya yoksa veya `max_age` saniyeden eskiyse
+    yeniden oluşturur. Aynı format için eşzamanlı istekler tek bir dışa aktarımı bekler.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Desteklenmeyen format: {export_format} (beklenen: {', '.join(EXPORT_FORMATS)})")
+    path = os.path.join(directory, f"campgrounds.{EXPORT_FORMATS[export_format]['extension']}")
+
+    def is_fresh():
+        try:
+            return time.time() - os.path.getmtime(path) < max_age
+        except OSError:
+            return False
+
+    if is_fresh():
+        export_requests_total.inc(format=export_format, cache="hit")
+        return path
+    with _export_locks[export_format]:
+        if is_fresh():
+            export_requests_total.inc(format=export_format, cache="hit")
+            return path
+        export_requests_total.inc(format=export_format, cache="miss")
+        export_campgrounds(path, export_format)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="campgrounds tablosunu Parquet veya Arrow IPC dosyasına aktarır.")
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="parquet")
+    parser.add_argument("--output", default=None, help=f"Varsayılan: {EXPORT_DIR}/campgrounds.<format>")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+    output = args.output or os.path.join(EXPORT_DIR, f"campgrounds.{EXPORT_FORMATS[args.format]['extension']}")
+    result = export_campgrounds(output, args.format, args.chunk_size)
+    print(json.dumps(result, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, String, Float, Boolean, Integer, DateTime, JSON
+from sqlalchemy import Column, String, Float, Boolean, Integer, DateTime, JSON, Text, Index, REAL, LargeBinary
+from sqlalchemy.orm import deferred
 from src.db.base import Base
 from pydantic import HttpUrl
 from datetime import datetime
@@ -30,23 +31,225 @@ class CampgroundORM(Base):
     price_low = Column(Float, nullable=True)
     price_high = Column(Float, nullable=True)
     availability_updated_at = Column(DateTime, nullable=True)
+    # API'den gelen normalize edilmiş özniteliklerin özeti; değişmeyen kayıtları atlamak için kullanılır.
+    content_hash = Column(String(32), nullable=True)
+    # src/utils/geo.py ızgarasındaki hücre numarası; bbox/yarıçap sorguları bu indeks üzerinden daraltılır.
+    geo_cell = Column(Integer, nullable=True)
+
+    __table_args__ = (
+        Index("ix_campgrounds_geo_cell_id", "geo_cell", "id"),
+        Index("ix_campgrounds_lat_lon", "latitude", "longitude"),
+        Index("ix_campgrounds_bookable", "bookable"),
+        Index("ix_campgrounds_rating", "rating"),
+        Index("ix_campgrounds_price_low", "price_low"),
+    )
+
+    # Okuma API'sinde döndürülmeyen, yalnızca iç kullanıma yönelik kolonlar
+    _internal_columns = ("content_hash", "geo_cell")
+
+    def to_dict(self):
+        data = {}
+        for column in self.__table__.columns:
+            if column.name in self._internal_columns:
+                continue
+            value = getattr(self, column.name)
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            data[column.name] = value
+        return data
 
     @staticmethod
     def prepare_data_for_db(validated_campground):
-        data = validated_campground.dict()
-        def convert_to_serializable(obj):
-            if isinstance(obj, HttpUrl):
-                return str(obj)
-            elif isinstance(obj, datetime):
-                return obj.isoformat()
-            elif isinstance(obj, dict):
-                return {k: convert_to_serializable(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [convert_to_serializable(item) for item in obj]
-            return obj
-        data = convert_to_serializable(data)
+        # HttpUrl -> str ve datetime -> ISO metin dönüşümleri pydantic'in (Rust) serileştiricisinde tek geçişte yapılır.
+        return validated_campground.model_dump(mode="json")
+
+class ScrapeJobORM(Base):
+    """
+    Manuel ve zamanlanmış scraper işlerinin kalıcı durum kaydı.
+    """
+    __tablename__ = "scrape_jobs"
+    id = Column(String, primary_key=True)
+    job_name = Column(String, nullable=False)
+    type = Column(String, nullable=True)
+    status = Column(String, nullable=False, index=True)
+    schedule = Column(String, nullable=True)
+    details = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    triggered_at = Column(DateTime(timezone=True), nullable=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    __table_args__ = (
+        Index("ix_scrape_jobs_status_created_at", "status", "created_at"),
+    )
+
+    def to_dict(self):
+        data = {"job_id": self.id}
+        for column in self.__table__.columns:
+            if column.name == "id":
+                continue
+            value = getattr(self, column.name)
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            if value is not None:
+                data[column.name] = value
         return data
 
+class CampgroundObservationORM(Base):
+    """
+    Fiyat, puan ve rezervasyon bilgilerinin yalnızca ekleme yapılan geçmişi. Bir kamp alanı için
+    yalnızca ilk görüldüğünde ve izlenen değerlerden biri değiştiğinde satır yazılır.
+
+    PostgreSQL'de observed_at'e göre aylık bölümlenir (src/db/observations.py bölümleri oluşturur);
+    zaman aralığı filtreli sorgular yalnızca ilgili bölümleri tarar. Kayıtlar zaman sırasıyla
+    eklendiği için observed_at üzerinde küçük bir BRIN indeksi yeterlidir.
+    """
+    __tablename__ = "campground_observations"
+    campground_id = Column(String, primary_key=True)
+    observed_at = Column(DateTime(timezone=True), primary_key=True)
+    price_low = Column(REAL, nullable=True)
+    price_high = Column(REAL, nullable=True)
+    rating = Column(REAL, nullable=True)
+    reviews_count = Column(Integer, nullable=True)
+    bookable = Column(Boolean, nullable=True)
+
+    __table_args__ = (
+        Index("ix_campground_observations_observed_at", "observed_at", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (observed_at)"},
+    )
+
+    def to_dict(self):
+        return {
+            "observed_at": self.observed_at.isoformat(),
+            "price_low": self.price_low,
+            "price_high": self.price_high,
+            "rating": self.rating,
+            "reviews_count": self.reviews_count,
+            "bookable": self.bookable,
+        }
+
+class ScrapeShardORM(Base):
+    """
+    Bir scraper işinin worker'lar arasında paylaştırılan parçası (bbox karosu). Worker'lar PENDING veya
+    kirası (lease) dolmuş parçaları `FOR UPDATE SKIP LOCKED` ile alır; sonuçlar işe (scrape_jobs) toplanır.
+    `full_reconcile` parçaları tam tarama olarak çalışır ve görülen kamp alanı id'lerini `seen_ids`'e yazar;
+    silme uzlaştırması tüm parçalar bittikten sonra bu id'lerin birleşimiyle yapılır. `seen_ids` büyük
+    olabileceği için yalnızca istendiğinde yüklenir ve to_dict'e eklenmez.
+    """
+    __tablename__ = "scrape_shards"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String, nullable=False, index=True)
+    bbox = Column(String, nullable=False)
+    status = Column(String, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    worker_id = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+    full_reconcile = Column(Boolean, nullable=True)
+    seen_ids = deferred(Column(JSON, nullable=True))
+
+    __table_args__ = (
+        Index("ix_scrape_shards_status_lease", "status", "lease_expires_at"),
+    )
+
+    def to_dict(self):
+        data = {}
+        for column in self.__table__.columns:
+            if column.name == "seen_ids":
+                continue
+            value = getattr(self, column.name)
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            data[column.name] = value
+        return data
+
+class CampgroundPhotoORM(Base):
+    """
+    Kamp alanlarının indirilen (veya indirilemeyen) fotoğraf URL'leri; aynı URL'yi paylaşan her kamp alanı için
+    ayrı satır tutulur. Dosyalar src/scraper/photos.py'deki içerik adresli depoda `file_name` (<sha256>.<uzantı>)
+    ile saklanır; farklı URL'ler aynı içeriği paylaşabilir. `attempts` art arda başarısız indirme sayısıdır,
+    `http_status` son başarısız yanıtın HTTP durum kodudur.
+    """
+    __tablename__ = "campground_photos"
+    campground_id = Column(String, primary_key=True)
+    url = Column(String, primary_key=True, index=True)
+    position = Column(Integer, nullable=False, default=0)
+    status = Column(String, nullable=False)
+    content_hash = Column(String(64), nullable=True, index=True)
+    file_name = Column(String, nullable=True)
+    content_type = Column(String, nullable=True)
+    size_bytes = Column(Integer, nullable=True)
+    has_thumbnail = Column(Boolean, nullable=False, default=False)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    http_status = Column(Integer, nullable=True)
+    fetched_at = Column(DateTime(timezone=True), nullable=False)
+
+    def to_dict(self):
+        data = {}
+        for column in self.__table__.columns:
+            value = getattr(self, column.name)
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            data[column.name] = value
+        return data
+
+class DeadLetterORM(Base):
+    """
+    Doğrulanamayan (`stage` = validate) veya veritabanına yazılamayan (`stage` = write) kamp alanlarının ham API
+    verisi. `payload` zlib ile sıkıştırılmış JSON'dur. Kamp alanı başına tek kayıt tutulur: aynı kayıt yeniden
+    reddedilirse son ham veri, hata ve model sürümü yazılır ve `attempts` artar. Kayıt başarıyla yazılınca silinir.
+    """
+    __tablename__ = "dead_letters"
+    # id'si olmayan kayıtlarda ham verinin içerik özeti ("hash:<özet>")
+    campground_id = Column(String, primary_key=True)
+    job_id = Column(String, nullable=True, index=True)
+    stage = Column(String, nullable=False)
+    error_type = Column(String, nullable=False)
+    error = Column(Text, nullable=True)
+    model_version = Column(String, nullable=False)
+    payload = Column(LargeBinary, nullable=False)
+    payload_bytes = Column(Integer, nullable=False)
+    attempts = Column(Integer, nullable=False, default=1)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+    replayed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_dead_letters_error_type", "error_type"),
+    )
+
+    def to_dict(self):
+        data = {}
+        for column in self.__table__.columns:
+            if column.name == "payload":
+                data["payload_compressed_bytes"] = len(self.payload)
+                continue
+            value = getattr(self, column.name)
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            data[column.name] = value
+        return data
+
+class CrawlStateORM(Base):
+    """
+    Tarama durumunu anahtar -> zaman olarak saklar: `tile:<bbox>` anahtarları karonun watermark'ını
+    (görülen en yeni availability-updated-at), `full_reconcile` ise son tam uzlaştırma zamanını tutar.
+    """
+    __tablename__ = "crawl_state"
+    key = Column(String, primary_key=True)
+    value = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
 class CampgroundLinks(BaseModel):
     """
     Links model to store the full JSON structure as-is.
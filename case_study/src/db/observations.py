@@ -0,0 +1,208 @@
+"""
+campground_observations: fiyat/puan/rezervasyon geçmişinin yalnızca ekleme yapılan tablosu.
+
+Scraper her partide yazdığı kayıtların izlenen değerlerini veritabanındaki önceki değerlerle
+karşılaştırır; yalnızca yeni kamp alanları ve değeri değişenler için gözlem satırı eklenir.
+PostgreSQL'de satırlar COPY ile aylık bölümlere yazılır, diğer veritabanlarında toplu INSERT kullanılır.
+"""
+import csv
+import datetime
+import io
+
+from sqlalchemy import and_, func, insert, select, text
+
+from src.db.models import CampgroundORM, CampgroundObservationORM
+from src.logger import logger, DatabaseException, handle_exception
+from src.metrics import db_rows_written_total, db_write_seconds, timed
+
+# Değişimi izlenen kolonlar; bunlardan biri değişince yeni gözlem yazılır.
+OBSERVED_COLUMNS = ("price_low", "price_high", "rating", "reviews_count", "bookable")
+
+TREND_BUCKETS = ("day", "week", "month")
+
+_TABLE = CampgroundObservationORM.__table__
+_COLUMNS = ("campground_id", "observed_at") + OBSERVED_COLUMNS
+
+# Bu süreçte varlığı doğrulanmış bölümler (ayın ilk günü); her partide DDL çalıştırmamak için
+_known_partitions = set()
+
+
+def _month_start(value: datetime.datetime) -> datetime.date:
+    return datetime.date(value.year, value.month, 1)
+
+
+def _next_month(value: datetime.date) -> datetime.date:
+    return datetime.date(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+
+def partition_name(month: datetime.date) -> str:
+    return f"{_TABLE.name}_p{month:%Y%m}"
+
+
+def ensure_partitions(connection, timestamps):
+    """
+    Verilen zamanları kapsayan aylık bölümleri (yoksa) oluşturur. PostgreSQL dışında bir şey yapmaz.
+    """
+    if connection.dialect.name != "postgresql":
+        return
+    for month in sorted({_month_start(value) for value in timestamps} - _known_partitions):
+        # Bölüm sınırları UTC'dir; oturumun saat diliminden etkilenmemesi için açıkça belirtilir.
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {_TABLE.name} "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{_next_month(month).isoformat()} 00:00:00+00')"
+        ))
+        _known_partitions.add(month)
+
+
+def seed_observations(engine):
+    """
+    Tablo ilk oluşturulduğunda mevcut kamp alanlarının güncel değerlerini başlangıç gözlemi olarak yazar.
+    """
+    observed_at = datetime.datetime.now(datetime.timezone.utc)
+    with engine.begin() as connection:
+        ensure_partitions(connection, [observed_at])
+        columns = ", ".join(OBSERVED_COLUMNS)
+        result = connection.execute(text(
+            f"INSERT INTO {_TABLE.name} (campground_id, observed_at, {columns}) "
+            f"SELECT id, :observed_at, {columns} FROM {CampgroundORM.__tablename__}"
+        ), {"observed_at": observed_at})
+    if result.rowcount:
+        logger.info(f"{result.rowcount} kamp alanı için başlangıç gözlemi yazıldı.", extra={"component": "observations"})
+
+
+def load_observed_values(session, ids):
+    """
+    Verilen kamp alanlarının veritabanındaki izlenen değerlerini id -> tuple olarak döndürür.
+    """
+    if not ids:
+        return {}
+    columns = [getattr(CampgroundORM, name) for name in OBSERVED_COLUMNS]
+    rows = session.execute(select(CampgroundORM.id, *columns).where(CampgroundORM.id.in_(list(ids)))).all()
+    return {row[0]: tuple(row[1:]) for row in rows}
+
+
+def build_observations(rows, previous_values, observed_at):
+    """
+    Yeni kayıtlar ve izlenen değerlerinden biri `previous_values`'takinden farklı olanlar için gözlem sözlükleri üretir.
+    """
+    observations = {}
+    for row in rows:
+        values = tuple(row.get(name) for name in OBSERVED_COLUMNS)
+        if previous_values.get(row["id"]) == values:
+            continue
+        observations[row["id"]] = dict(zip(_COLUMNS, (row["id"], observed_at) + values))
+    return list(observations.values())
+
+
+def _copy_rows(session, observations):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for observation in observations:
+        # CSV biçiminde tırnaksız boş alan NULL olarak okunur.
+        writer.writerow(["" if observation[name] is None else observation[name] for name in _COLUMNS])
+    buffer.seek(0)
+    cursor = session.connection().connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {_TABLE.name} ({', '.join(_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+@timed(db_write_seconds, operation="observations")
+def append_observations(session, observations):
+    """
+    Gözlemleri tek transaction içinde ekler (PostgreSQL'de COPY). Eklenen satır sayısını döndürür;
+    hata durumunda gözlemler atlanır, kamp alanı yazımı etkilenmez.
+    """
+    if not observations:
+        return 0
+    try:
+        connection = session.connection()
+        ensure_partitions(connection, [observation["observed_at"] for observation in observations])
+        if connection.dialect.name == "postgresql":
+            _copy_rows(session, observations)
+        else:
+            session.execute(insert(_TABLE), observations)
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        # Geri alınan transaction'da oluşturulan bölümler de geri alınmış olabilir.
+        _known_partitions.clear()
+        handle_exception(DatabaseException(str(e)), context="append_observations")
+        return 0
+    db_rows_written_total.inc(len(observations), operation="observations")
+    return len(observations)
+
+
+def campground_history(session, campground_id: str, since: datetime.datetime, until: datetime.datetime, limit: int):
+    """
+    Bir kamp alanının [since, until) aralığındaki gözlemlerini eskiden yeniye döndürür.
+    """
+    query = (
+        select(CampgroundObservationORM)
+        .where(
+            CampgroundObservationORM.campground_id == campground_id,
+            CampgroundObservationORM.observed_at >= since,
+            CampgroundObservationORM.observed_at < until,
+        )
+        .order_by(CampgroundObservationORM.observed_at)
+        .limit(limit)
+    )
+    return [record.to_dict() for record in session.execute(query).scalars()]
+
+
+def _bucket_expression(dialect_name: str, bucket: str):
+    observed_at = CampgroundObservationORM.observed_at
+    if dialect_name == "postgresql":
+        return func.to_char(func.date_trunc(bucket, func.timezone("UTC", observed_at)), "YYYY-MM-DD")
+    if bucket == "month":
+        return func.strftime("%Y-%m-01", observed_at)
+    if bucket == "week":
+        # Pazartesi başlangıçlı hafta (PostgreSQL date_trunc('week') ile aynı)
+        return func.date(observed_at, "-6 days", "weekday 1")
+    return func.date(observed_at)
+
+
+def region_trends(session, since: datetime.datetime, until: datetime.datetime, bucket: str = "day", region=None):
+    """
+    [since, until) aralığında yazılan gözlemleri bölge ve zaman dilimine göre toplar.
+
+    Gözlemler yalnızca değişiklik anlarında yazıldığı için ortalamalar o dilimde değişen
+    (veya ilk kez görülen) kamp alanlarının yeni değerlerini yansıtır.
+    """
+    if bucket not in TREND_BUCKETS:
+        raise ValueError(f"Geçersiz bucket: {bucket} (beklenen: {', '.join(TREND_BUCKETS)})")
+    bucket_column = _bucket_expression(session.get_bind().dialect.name, bucket).label("bucket")
+    conditions = [
+        CampgroundObservationORM.observed_at >= since,
+        CampgroundObservationORM.observed_at < until,
+    ]
+    if region is not None:
+        conditions.append(CampgroundORM.region_name == region)
+    query = (
+        select(
+            CampgroundORM.region_name,
+            bucket_column,
+            func.count().label("observations"),
+            func.count(func.distinct(CampgroundObservationORM.campground_id)).label("campgrounds"),
+            func.avg(CampgroundObservationORM.price_low).label("avg_price_low"),
+            func.avg(CampgroundObservationORM.price_high).label("avg_price_high"),
+            func.avg(CampgroundObservationORM.rating).label("avg_rating"),
+        )
+        .join(CampgroundORM, CampgroundORM.id == CampgroundObservationORM.campground_id)
+        .where(and_(*conditions))
+        .group_by(CampgroundORM.region_name, bucket_column)
+        .order_by(CampgroundORM.region_name, bucket_column)
+    )
+    items = []
+    for row in session.execute(query):
+        items.append({
+            "region_name": row.region_name,
+            "bucket": str(row.bucket),
+            "observations": row.observations,
+            "campgrounds": row.campgrounds,
+            "avg_price_low": round(row.avg_price_low, 2) if row.avg_price_low is not None else None,
+            "avg_price_high": round(row.avg_price_high, 2) if row.avg_price_high is not None else None,
+            "avg_rating": round(row.avg_rating, 2) if row.avg_rating is not None else None,
+        })
+    return items
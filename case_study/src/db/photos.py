@@ -0,0 +1,102 @@
+"""
+campground_photos tablosu: kamp alanlarının fotoğraf URL'lerinin indirme durumu ve içerik adresli depodaki dosya adları.
+"""
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.config import UPSERT_CHUNK_SIZE
+from src.db.models import CampgroundORM, CampgroundPhotoORM
+from src.logger import DatabaseException, handle_exception
+
+PHOTO_STATUS_FETCHED = "FETCHED"
+PHOTO_STATUS_FAILED = "FAILED"
+
+_TABLE = CampgroundPhotoORM.__table__
+
+
+def photo_urls(row) -> list:
+    """
+    Bir kamp alanı satırının (sözlük veya CampgroundORM) photo_url ve photo_urls adreslerini sırayla, tekrarsız döndürür.
+    """
+    get = row.get if isinstance(row, dict) else lambda name: getattr(row, name)
+    urls = []
+    for url in [get("photo_url"), *(get("photo_urls") or [])]:
+        if url and url not in urls:
+            urls.append(url)
+    return urls
+
+
+def load_photo_index(session):
+    """
+    Kayıtlı fotoğrafları tek sorguda URL bazında yükler: url -> {tablo kolonları, "campgrounds": {campground_id: position}}.
+    Aynı URL'nin birden fazla satırı varsa kolonlar FETCHED satırından alınır.
+    """
+    index = {}
+    for record in session.execute(select(_TABLE)).mappings():
+        entry = index.get(record["url"])
+        if entry is None:
+            entry = index[record["url"]] = dict(record, campgrounds={})
+        elif record["status"] == PHOTO_STATUS_FETCHED and entry["status"] != PHOTO_STATUS_FETCHED:
+            entry.update(record)
+        entry["campgrounds"][record["campground_id"]] = record["position"]
+    return index
+
+
+def link_row(photo: dict, campground_id: str, position: int) -> dict:
+    """
+    Bir URL'nin indirme sonucunu (`photo`) başka bir kamp alanı için campground_photos satırına çevirir.
+    """
+    row = {column.name: photo.get(column.name) for column in _TABLE.columns}
+    row.update(campground_id=campground_id, position=position)
+    return row
+
+
+def _upsert_statement(session, rows):
+    if session.get_bind().dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    stmt = insert(_TABLE).values(rows)
+    update_columns = {column.name: stmt.excluded[column.name] for column in _TABLE.columns if not column.primary_key}
+    return stmt.on_conflict_do_update(index_elements=["campground_id", "url"], set_=update_columns)
+
+
+def save_photos(session, rows, chunk_size=UPSERT_CHUNK_SIZE) -> int:
+    """
+    PhotoFetcher sonuçlarını campground_photos tablosuna yazar (kamp alanı + URL varsa günceller); yazılan satır sayısını döndürür.
+    """
+    rows = list({(row["campground_id"], row["url"]): row for row in rows}.values())
+    if not rows:
+        return 0
+    try:
+        for start in range(0, len(rows), chunk_size):
+            session.execute(_upsert_statement(session, rows[start:start + chunk_size]))
+        session.commit()
+    except SQLAlchemyError as e:
+        session.rollback()
+        handle_exception(DatabaseException(str(e)), context="save_photos")
+        return 0
+    return len(rows)
+
+
+def campground_photos(session, campground_id: str) -> list:
+    """
+    Bir kamp alanının indirilmiş fotoğrafları, photo_urls sırasıyla.
+    """
+    records = session.execute(
+        select(CampgroundPhotoORM)
+        .where(CampgroundPhotoORM.campground_id == campground_id, CampgroundPhotoORM.status == PHOTO_STATUS_FETCHED)
+        .order_by(CampgroundPhotoORM.position)
+    ).scalars().all()
+    return [record.to_dict() for record in records]
+
+
+def iter_campground_photo_urls(session, batch_size: int = 1000):
+    """
+    Veritabanındaki tüm kamp alanları için (campground_id, [url, ...]) üretir; `photos` komutunun geriye dönük doldurması için.
+    """
+    result = session.execute(
+        select(CampgroundORM.id, CampgroundORM.photo_url, CampgroundORM.photo_urls).execution_options(yield_per=batch_size)
+    )
+    for campground_id, photo_url, urls in result:
+        yield campground_id, photo_urls({"photo_url": photo_url, "photo_urls": urls})
@@ -0,0 +1,29 @@
+from .store import (
+    job_store,
+    JobStore,
+    JOB_STATUS_PENDING,
+    JOB_STATUS_RUNNING,
+    JOB_STATUS_COMPLETED,
+    JOB_STATUS_FAILED,
+    JOB_STATUS_SKIPPED,
+    TERMINAL_STATUSES,
+)
+from .coordinator import (
+    job_coordinator,
+    JobCoordinator,
+    JobQueueFull,
+    JOB_PRIORITY_MANUAL,
+    JOB_PRIORITY_SCHEDULED,
+    SCRAPE_JOB_KEY,
+    run_exclusive,
+)
+from .shards import (
+    shard_queue,
+    ShardQueue,
+    ShardWorker,
+    finalize_job,
+    plan_shards,
+    run_failure,
+    job_fields_from_summary,
+    start_worker_threads,
+)
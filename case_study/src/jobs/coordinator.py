@@ -0,0 +1,273 @@
+import asyncio
+import hashlib
+import itertools
+import threading
+from dataclasses import dataclass, field
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+
+from src.config import JOB_MAX_CONCURRENCY, JOB_QUEUE_SIZE
+from src.db.base import get_engine
+from src.jobs.store import JOB_STATUS_FAILED, JOB_STATUS_PENDING, JOB_STATUS_SKIPPED, utcnow
+from src.logger import logger
+from src.metrics import registry
+
+job_queue_depth = registry.gauge("scrape_job_queue_depth", "Koordinatör kuyruğunda bekleyen iş sayısı.")
+job_requests_total = registry.counter("scrape_job_requests_total", "Koordinatöre gelen iş istekleri.", ("outcome",))
+
+# Küçük sayı önce çalışır
+JOB_PRIORITY_MANUAL = 0
+JOB_PRIORITY_SCHEDULED = 10
+
+SCRAPE_JOB_KEY = "scrape"
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class AdvisoryLock:
+    """
+    Aynı anahtarlı işin birden fazla uygulama kopyasında aynı anda çalışmasını önleyen kilit.
+
+    PostgreSQL'de oturum düzeyinde `pg_try_advisory_lock` kullanılır; kilit iş boyunca açık tutulan
+    ayrı bir bağlantıya bağlıdır, süreç ölürse bağlantıyla birlikte bırakılır. Diğer veritabanlarında
+    süreçler arası kilit yoktur; yalnızca süreç içi koordinasyon geçerlidir.
+    """
+    def __init__(self, key: str):
+        self.key = key
+        # Anahtar metninden türetilen işaretli 64 bit kilit numarası
+        self.lock_id = int.from_bytes(hashlib.sha256(f"case_study:{key}".encode("utf-8")).digest()[:8], "big", signed=True)
+        self._connection = None
+
+    def try_acquire(self) -> bool:
+        engine = get_engine()
+        if engine.dialect.name != "postgresql":
+            return True
+        connection = engine.connect()
+        try:
+            acquired = connection.execute(text("SELECT pg_try_advisory_lock(:lock_id)"), {"lock_id": self.lock_id}).scalar()
+            connection.commit()
+        except Exception:
+            connection.close()
+            raise
+        if not acquired:
+            connection.close()
+            return False
+        self._connection = connection
+        return True
+
+    def release(self):
+        connection, self._connection = self._connection, None
+        if connection is None:
+            return
+        try:
+            connection.execute(text("SELECT pg_advisory_unlock(:lock_id)"), {"lock_id": self.lock_id})
+            connection.commit()
+        except Exception as e:
+            logger.warning(f"Advisory lock bırakılamadı, bağlantı kapatılarak bırakılacak: {self.key} | {e}", extra={"component": "job_coordinator", "errtype": "DATABASE_ERROR"})
+        finally:
+            connection.close()
+
+
+@dataclass(order=True)
+class _QueuedJob:
+    priority: int
+    sequence: int
+    job_id: str = field(compare=False)
+    job_name: str = field(compare=False)
+    key: str = field(compare=False)
+
+
+class JobCoordinator:
+    """
+    Scraper işlerini tek noktadan sıraya koyan ve çalıştıran koordinatör.
+
+    - Aynı anda en fazla `max_concurrency` iş çalışır; aynı anahtarlı iki iş hiçbir zaman birlikte çalışmaz.
+    - Kuyrukta aynı anahtarlı bekleyen bir iş varsa yeni istek ona birleştirilir ve mevcut job_id döner.
+    - Kuyruk `queue_size` ile sınırlıdır ve önceliğe göre (küçük sayı önce, eşitse geliş sırası) boşaltılır.
+    - İş başlamadan önce anahtarın advisory lock'u alınır; başka bir kopya aynı işi çalıştırıyorsa veya kilit
+      alınamıyorsa (ör. veritabanı hatası) iş çalıştırılmaz ve SKIPPED olarak sonuçlanır.
+    """
+    def __init__(self, max_concurrency: int = JOB_MAX_CONCURRENCY, queue_size: int = JOB_QUEUE_SIZE, lock_factory=AdvisoryLock):
+        self.max_concurrency = max(1, max_concurrency)
+        self.queue_size = queue_size
+        self._lock_factory = lock_factory
+        self._queue = []
+        self._pending = {}
+        self._running = {}
+        self._sequence = itertools.count()
+        self._condition = None
+        self._dispatcher = None
+        self._tasks = set()
+        self._runner = None
+        self._save_job = None
+
+    def start(self, runner, save_job):
+        """
+        runner(job_id, job_name): işi çalıştıran coroutine fonksiyonu.
+        save_job(job_id, **fields): iş durumunu kaydeden coroutine fonksiyonu.
+        """
+        self._runner = runner
+        self._save_job = save_job
+        self._condition = asyncio.Condition()
+        self._dispatcher = asyncio.create_task(self._dispatch(), name="job-coordinator")
+
+    async def stop(self):
+        """
+        Dağıtıcıyı durdurur; kuyrukta bekleyen işler FAILED olarak işaretlenir.
+        Çalışan işler tamamlanmaya bırakılır.
+        """
+        if self._dispatcher is None:
+            return
+        self._dispatcher.cancel()
+        try:
+            await self._dispatcher
+        except asyncio.CancelledError:
+            pass
+        self._dispatcher = None
+        queued, self._queue = self._queue, []
+        self._pending.clear()
+        job_queue_depth.set(0)
+        for entry in queued:
+            await self._save_job(entry.job_id, status=JOB_STATUS_FAILED, error="Uygulama kapanırken iş kuyrukta bekliyordu.", details="İş başlatılamadı.")
+
+    def snapshot(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "queue_size": self.queue_size,
+            "running": [{"job_id": entry.job_id, "key": entry.key} for entry in self._running.values()],
+            "queued": [{"job_id": entry.job_id, "key": entry.key, "priority": entry.priority} for entry in sorted(self._queue)],
+        }
+
+    async def submit(self, job_id: str, job_name: str, priority: int = JOB_PRIORITY_MANUAL, key: str = SCRAPE_JOB_KEY, **fields) -> dict:
+        """
+        İşi kuyruğa ekler ve `fields` ile PENDING olarak kaydeder. Aynı anahtarlı bekleyen bir iş
+        varsa yeni iş oluşturulmaz; bekleyen işin job_id'si `coalesced=True` ile döner (öncelik gerekirse yükseltilir).
+        Kuyruk doluysa JobQueueFull fırlatılır.
+        """
+        if self._condition is None:
+            raise RuntimeError("JobCoordinator başlatılmadı.")
+        async with self._condition:
+            existing = self._pending.get(key)
+            if existing is not None:
+                existing.priority = min(existing.priority, priority)
+                job_requests_total.inc(outcome="coalesced")
+                logger.info(f"İş isteği kuyrukta bekleyen işle birleştirildi: {job_name} -> {existing.job_id}", extra={"component": "job_coordinator", "job_id": existing.job_id})
+                return {"job_id": existing.job_id, "coalesced": True, "position": self._position(existing)}
+            if len(self._queue) >= self.queue_size:
+                job_requests_total.inc(outcome="rejected")
+                raise JobQueueFull(f"İş kuyruğu dolu ({self.queue_size}); daha sonra tekrar deneyin.")
+            entry = _QueuedJob(priority, next(self._sequence), job_id, job_name, key)
+            # Kayıt kuyruğa girmeden yazılır; dağıtıcı iş RUNNING olarak kaydedilmeden önce bunu ezemez.
+            await self._save_job(job_id, status=JOB_STATUS_PENDING, job_name=job_name, **fields)
+            self._queue.append(entry)
+            self._pending[key] = entry
+            job_queue_depth.set(len(self._queue))
+            job_requests_total.inc(outcome="queued")
+            self._condition.notify_all()
+            return {"job_id": job_id, "coalesced": False, "position": self._position(entry)}
+
+    def _position(self, entry) -> int:
+        return sorted(self._queue).index(entry) + 1 if entry in self._queue else 0
+
+    def _next_runnable(self):
+        if len(self._running) >= self.max_concurrency:
+            return None
+        for entry in sorted(self._queue):
+            if entry.key not in self._running:
+                return entry
+        return None
+
+    async def _dispatch(self):
+        while True:
+            async with self._condition:
+                await self._condition.wait_for(lambda: self._next_runnable() is not None)
+                entry = self._next_runnable()
+                self._queue.remove(entry)
+                del self._pending[entry.key]
+                self._running[entry.key] = entry
+                job_queue_depth.set(len(self._queue))
+            task = asyncio.create_task(self._run(entry), name=f"job-{entry.job_id}")
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, entry):
+        lock = self._lock_factory(entry.key)
+        try:
+            # Kilit alınamazsa iş kilitsiz çalıştırılmaz; başka bir kopyayla aynı anda çalışabilirdi.
+            try:
+                acquired = await run_in_threadpool(lock.try_acquire)
+            except Exception as e:
+                job_requests_total.inc(outcome="skipped")
+                logger.warning(f"Advisory lock alınamadı, iş atlanıyor: {entry.job_name} (ID: {entry.job_id}) | {e}", extra={"component": "job_coordinator", "job_id": entry.job_id, "errtype": "DATABASE_ERROR"})
+                await self._save_skipped(entry, "Advisory lock alınamadığı için iş atlandı.", error=str(e))
+                return
+            if not acquired:
+                job_requests_total.inc(outcome="skipped")
+                logger.info(f"Aynı iş başka bir uygulama kopyasında çalışıyor, atlanıyor: {entry.job_name} (ID: {entry.job_id})", extra={"component": "job_coordinator", "job_id": entry.job_id})
+                await self._save_skipped(entry, "Aynı iş başka bir uygulama kopyasında çalıştığı için atlandı.")
+                return
+            try:
+                await self._runner(entry.job_id, entry.job_name)
+            finally:
+                await run_in_threadpool(lock.release)
+        except Exception as e:
+            logger.error(f"İş koordinatörü işi çalıştıramadı: {entry.job_id} | {e}", extra={"component": "job_coordinator", "job_id": entry.job_id}, exc_info=True)
+        finally:
+            async with self._condition:
+                self._running.pop(entry.key, None)
+                self._condition.notify_all()
+
+    async def _save_skipped(self, entry, summary: str, error: str = None):
+        await self._save_job(
+            entry.job_id,
+            status=JOB_STATUS_SKIPPED,
+            finished_at=utcnow(),
+            details={"summary": summary, "skipped": True},
+            error=error,
+        )
+
+
+job_coordinator = JobCoordinator()
+
+# run_exclusive: bu süreçte çalışan işlerin anahtarları ve JOB_MAX_CONCURRENCY kadar çalışma yuvası
+_exclusive_running = set()
+_exclusive_guard = threading.Lock()
+_exclusive_slots = threading.BoundedSemaphore(max(1, JOB_MAX_CONCURRENCY))
+
+
+def run_exclusive(key: str, func, *args, lock_factory=AdvisoryLock, **kwargs):
+    """
+    Koordinatörün dışında (ör. `python main.py schedule` zamanlayıcısında) çalışan işleri koordinatörle aynı
+    kurallarla çalıştırır: aynı anahtarlı iş bu süreçte çalışıyorsa veya anahtarın advisory lock'u başka bir
+    kopyadaysa (veya kilit alınamıyorsa) `func` çalıştırılmadan atlanır; bu süreçte en fazla JOB_MAX_CONCURRENCY iş aynı anda çalışır,
+    fazlası yuva boşalana kadar bekler. Dönüş: (çalıştırıldı mı, func'ın sonucu)
+    """
+    with _exclusive_guard:
+        if key in _exclusive_running:
+            job_requests_total.inc(outcome="skipped")
+            logger.info(f"Aynı iş bu süreçte zaten çalışıyor, atlanıyor: {key}", extra={"component": "job_coordinator"})
+            return False, None
+        _exclusive_running.add(key)
+    try:
+        with _exclusive_slots:
+            lock = lock_factory(key)
+            try:
+                acquired = lock.try_acquire()
+            except Exception as e:
+                job_requests_total.inc(outcome="skipped")
+                logger.warning(f"Advisory lock alınamadı, iş atlanıyor: {key} | {e}", extra={"component": "job_coordinator", "errtype": "DATABASE_ERROR"})
+                return False, None
+            if not acquired:
+                job_requests_total.inc(outcome="skipped")
+                logger.info(f"Aynı iş başka bir uygulama kopyasında çalışıyor, atlanıyor: {key}", extra={"component": "job_coordinator"})
+                return False, None
+            try:
+                return True, func(*args, **kwargs)
+            finally:
+                lock.release()
+    finally:
+        with _exclusive_guard:
+            _exclusive_running.discard(key)
@@ -0,0 +1,67 @@
+import asyncio
+import itertools
+
+from src.logger import logger
+from src.serialization import dumps
+
+# Yavaş bir istemcinin kuyruğu dolarsa en eski olay atılır; istemci bir sonraki olayla güncellenir.
+SUBSCRIBER_QUEUE_SIZE = 256
+
+
+class JobEventBroker:
+    """
+    İş durum geçişlerini ve ilerleme olaylarını SSE aboneliklerine dağıtan süreç içi yayıncı.
+
+    `publish` event loop thread'inden, `publish_threadsafe` ise scraper'ın çalıştığı
+    threadpool thread'lerinden çağrılır. Olaylar yalnızca bu sürecin abonelerine iletilir.
+    """
+    def __init__(self):
+        self._subscribers = set()
+        self._loop = None
+        self._ids = itertools.count(1)
+
+    def bind_loop(self, loop):
+        self._loop = loop
+
+    def publish(self, event_type: str, data: dict):
+        event = {"id": next(self._ids), "event": event_type, "data": data}
+        for subscriber in list(self._subscribers):
+            if subscriber.full():
+                try:
+                    subscriber.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+            subscriber.put_nowait(event)
+
+    def publish_threadsafe(self, event_type: str, data: dict):
+        if self._loop is None or self._loop.is_closed():
+            return
+        try:
+            self._loop.call_soon_threadsafe(self.publish, event_type, data)
+        except RuntimeError as e:
+            logger.debug(f"Olay yayınlanamadı (event loop kapalı): {e}", extra={"component": "job_events"})
+
+    def subscribe(self):
+        subscriber = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        self._subscribers.discard(subscriber)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+
+def format_sse(event_type: str, data, event_id=None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    payload = dumps(data)
+    lines.extend(f"data: {line}" for line in payload.splitlines() or [""])
+    return "\n".join(lines) + "\n\n"
+
+
+job_events = JobEventBroker()
@@ -0,0 +1,495 @@
+import datetime
+import os
+import socket
+import threading
+import time
+
+from sqlalchemy import and_, case, delete, insert, or_, select, update
+
+from src.config import (
+    SHARD_HEARTBEAT_SECONDS,
+    SHARD_LEASE_SECONDS,
+    SHARD_MAX_ATTEMPTS,
+    SHARD_POLL_INTERVAL,
+)
+from src.db.base import SessionLocal, get_engine
+from src.db.models import ScrapeShardORM
+from src.jobs.store import JOB_STATUS_COMPLETED, JOB_STATUS_FAILED, job_store, utcnow
+from src.logger import job_log_context, logger
+from src.metrics import StageTimings, registry
+
+shard_events_total = registry.counter("scrape_shard_events_total", "Parça kuyruğundaki olaylar.", ("event",))
+
+SHARD_STATUS_PENDING = "PENDING"
+SHARD_STATUS_RUNNING = "RUNNING"
+SHARD_STATUS_COMPLETED = "COMPLETED"
+SHARD_STATUS_FAILED = "FAILED"
+
+SHARD_STATUSES = (SHARD_STATUS_PENDING, SHARD_STATUS_RUNNING, SHARD_STATUS_COMPLETED, SHARD_STATUS_FAILED)
+
+# Satır kilidi olmayan veritabanlarında koşullu güncelleme başka bir worker'a kaybedilirse tekrar deneme sayısı
+_CLAIM_RETRIES = 5
+# İş detaylarında listelenen en fazla parça hatası
+_MAX_REPORTED_ERRORS = 10
+# Parça sonuçlarında toplanmayan (oran/süre/durum) ilerleme alanları
+_NON_ADDITIVE_COUNTS = ("elapsed", "rows_per_sec", "completed")
+
+
+def run_failure(progress: dict, error=None):
+    """
+    Bir tarama çalışmasının (iş veya parça) başarısızlık nedenini döndürür; çalışma başarılıysa None.
+    run_scraper_job hataları kendisi loglayıp özet döndürdüğünden son ilerleme raporu (`completed`)
+    gelmediyse çalışma yarıda kesilmiş sayılır. Hiç sayfa alınamadıysa, başarısız sayfa veya yazılamayan
+    kayıt varsa da başarısızdır.
+    """
+    if error is not None:
+        return str(error)
+    if not progress.get("completed"):
+        return "Tarama tamamlanmadı; ayrıntılar iş loglarında."
+    if not progress.get("pages"):
+        return "Hiç sayfa alınamadı."
+    if progress.get("failed_pages"):
+        return f"{progress['failed_pages']} sayfa alınamadı."
+    if progress.get("failed"):
+        return f"{progress['failed']} kayıt yazılamadı."
+    return None
+
+
+def plan_shards(count: int, bbox: str = None):
+    """
+    Yapılandırılan (veya verilen) bbox'ı `count` boylam şeridine böler.
+    """
+    from src.scraper.crawler import CrawlEngine, shard_bboxes
+    return shard_bboxes([bbox or CrawlEngine(cache=None).root_tile.to_param()], count)
+
+
+def default_worker_id(suffix=None) -> str:
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    return f"{worker_id}:{suffix}" if suffix is not None else worker_id
+
+
+class ShardQueue:
+    """
+    scrape_shards tablosu üzerinde işlerin parçalarını dağıtan kuyruk.
+
+    Worker'lar `claim` ile PENDING ya da kirası dolmuş RUNNING bir parça alır. PostgreSQL'de seçim
+    `FOR UPDATE SKIP LOCKED` ile yapılır; aynı anda soran worker'lar birbirini beklemeden farklı
+    parçalar alır. Satır kilidi olmayan veritabanlarında (SQLite) koşullu UPDATE ile yalnızca bir
+    worker'ın kazanması sağlanır. Parçayı çalıştıran worker `heartbeat` ile kirayı uzatır; kirası
+    dolan parça `max_attempts` hakkı bitene kadar başka bir worker'a verilir.
+    """
+    def __init__(self, session_factory=None, lease_seconds: float = SHARD_LEASE_SECONDS, max_attempts: int = SHARD_MAX_ATTEMPTS):
+        self._session_factory = session_factory
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    def _session(self):
+        if self._session_factory is not None:
+            return self._session_factory()
+        get_engine()
+        return SessionLocal.session_factory()
+
+    def _lease_until(self, now):
+        return now + datetime.timedelta(seconds=self.lease_seconds)
+
+    def enqueue(self, job_id: str, bboxes, full_reconcile: bool = False) -> int:
+        """
+        İşin parçalarını PENDING olarak ekler ve eklenen parça sayısını döndürür. Aynı job_id ile
+        (ör. her gün aynı id'yle tetiklenen zamanlanmış iş) önceki çalışmadan kalan parçalar silinir.
+        `full_reconcile` ise parçalar tam tarama olarak çalışır ve iş sonuçlanırken silme uzlaştırması yapılır.
+        """
+        now = utcnow()
+        rows = [
+            {"job_id": job_id, "bbox": bbox, "status": SHARD_STATUS_PENDING, "attempts": 0, "max_attempts": self.max_attempts, "full_reconcile": full_reconcile, "created_at": now, "updated_at": now}
+            for bbox in bboxes
+        ]
+        session = self._session()
+        try:
+            session.execute(delete(ScrapeShardORM).where(ScrapeShardORM.job_id == job_id))
+            session.execute(insert(ScrapeShardORM), rows)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+        shard_events_total.inc(len(rows), event="enqueued")
+        logger.info(f"İş {len(rows)} parçaya bölünüp kuyruğa eklendi: {job_id}", extra={"component": "shard_queue", "job_id": job_id})
+        return len(rows)
+
+    def sweep(self) -> set:
+        """
+        Kirası dolmuş ve deneme hakkı bitmiş parçaları FAILED yapar; etkilenen işlerin id'lerini döndürür.
+        """
+        now = utcnow()
+        exhausted = and_(
+            ScrapeShardORM.status == SHARD_STATUS_RUNNING,
+            ScrapeShardORM.lease_expires_at < now,
+            ScrapeShardORM.attempts >= ScrapeShardORM.max_attempts,
+        )
+        session = self._session()
+        try:
+            job_ids = set(session.execute(select(ScrapeShardORM.job_id).where(exhausted)).scalars())
+            if not job_ids:
+                return set()
+            result = session.execute(
+                update(ScrapeShardORM).where(exhausted).values(
+                    status=SHARD_STATUS_FAILED,
+                    error="Worker'dan heartbeat alınamadı ve deneme hakkı bitti.",
+                    worker_id=None,
+                    lease_expires_at=None,
+                    finished_at=now,
+                    updated_at=now,
+                )
+            )
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+        shard_events_total.inc(result.rowcount, event="expired")
+        logger.warning(f"Kirası dolan {result.rowcount} parça deneme hakkı bittiği için başarısız sayıldı.", extra={"component": "shard_queue", "errtype": "TIMEOUT_ERROR"})
+        return job_ids
+
+    def claim(self, worker_id: str):
+        """
+        Çalıştırılacak bir parçayı `worker_id` adına kiralar; yoksa None döner.
+        Dönüş: {"id", "job_id", "bbox", "attempt", "full_reconcile"}
+        """
+        session = self._session()
+        try:
+            postgres = session.get_bind().dialect.name == "postgresql"
+            for _ in range(_CLAIM_RETRIES):
+                now = utcnow()
+                claimable = and_(
+                    or_(
+                        ScrapeShardORM.status == SHARD_STATUS_PENDING,
+                        and_(ScrapeShardORM.status == SHARD_STATUS_RUNNING, ScrapeShardORM.lease_expires_at < now),
+                    ),
+                    ScrapeShardORM.attempts < ScrapeShardORM.max_attempts,
+                )
+                query = select(ScrapeShardORM.id, ScrapeShardORM.job_id, ScrapeShardORM.bbox, ScrapeShardORM.status, ScrapeShardORM.attempts, ScrapeShardORM.full_reconcile).where(claimable).order_by(ScrapeShardORM.id).limit(1)
+                if postgres:
+                    query = query.with_for_update(skip_locked=True)
+                shard = session.execute(query).first()
+                if shard is None:
+                    session.commit()
+                    return None
+                result = session.execute(
+                    update(ScrapeShardORM)
+                    .where(ScrapeShardORM.id == shard.id, ScrapeShardORM.status == shard.status, ScrapeShardORM.attempts == shard.attempts)
+                    .values(
+                        status=SHARD_STATUS_RUNNING,
+                        attempts=shard.attempts + 1,
+                        worker_id=worker_id,
+                        lease_expires_at=self._lease_until(now),
+                        heartbeat_at=now,
+                        started_at=now,
+                        updated_at=now,
+                    )
+                )
+                session.commit()
+                if result.rowcount == 1:
+                    event = "reclaimed" if shard.status == SHARD_STATUS_RUNNING else "claimed"
+                    shard_events_total.inc(event=event)
+                    if event == "reclaimed":
+                        logger.warning(f"Kirası dolan parça yeniden alındı: {shard.id} ({shard.bbox}), deneme {shard.attempts + 1}", extra={"component": "shard_queue", "job_id": shard.job_id})
+                    return {"id": shard.id, "job_id": shard.job_id, "bbox": shard.bbox, "attempt": shard.attempts + 1, "full_reconcile": bool(shard.full_reconcile)}
+            return None
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def _update_owned(self, shard_id: int, owner_id: str, **values) -> bool:
+        """
+        Parça hâlâ `owner_id` worker'ındaysa (kirası başka bir worker'a geçmediyse) günceller.
+        `values` parçanın worker_id sütununu da değiştirebilir.
+        """
+        values.setdefault("updated_at", utcnow())
+        session = self._session()
+        try:
+            result = session.execute(
+                update(ScrapeShardORM)
+                .where(ScrapeShardORM.id == shard_id, ScrapeShardORM.worker_id == owner_id, ScrapeShardORM.status == SHARD_STATUS_RUNNING)
+                .values(**values)
+            )
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+        return result.rowcount == 1
+
+    def heartbeat(self, shard_id: int, worker_id: str) -> bool:
+        """
+        Kirayı uzatır; parça artık bu worker'da değilse False döner.
+        """
+        now = utcnow()
+        return self._update_owned(shard_id, worker_id, heartbeat_at=now, lease_expires_at=self._lease_until(now), updated_at=now)
+
+    def complete(self, shard_id: int, worker_id: str, result: dict, seen_ids=None) -> bool:
+        now = utcnow()
+        completed = self._update_owned(
+            shard_id, worker_id,
+            status=SHARD_STATUS_COMPLETED, result=result, error=None, seen_ids=seen_ids,
+            lease_expires_at=None, finished_at=now, updated_at=now,
+        )
+        shard_events_total.inc(event="completed" if completed else "lost")
+        return completed
+
+    def fail(self, shard_id: int, worker_id: str, error: str, result: dict = None) -> bool:
+        """
+        Parçayı deneme hakkı kaldıysa yeniden PENDING, kalmadıysa FAILED yapar.
+        """
+        now = utcnow()
+        failed = self._update_owned(
+            shard_id, worker_id,
+            status=case((ScrapeShardORM.attempts < ScrapeShardORM.max_attempts, SHARD_STATUS_PENDING), else_=SHARD_STATUS_FAILED),
+            result=result, error=error, worker_id=None,
+            lease_expires_at=None, finished_at=now, updated_at=now,
+        )
+        shard_events_total.inc(event="failed" if failed else "lost")
+        return failed
+
+    def list_shards(self, job_id: str):
+        session = self._session()
+        try:
+            query = select(ScrapeShardORM).where(ScrapeShardORM.job_id == job_id).order_by(ScrapeShardORM.id)
+            return [shard.to_dict() for shard in session.execute(query).scalars()]
+        finally:
+            session.close()
+
+    def load_seen_ids(self, job_id: str) -> set:
+        """
+        İşin tamamlanan parçalarında görülen kamp alanı id'lerinin birleşimi.
+        """
+        session = self._session()
+        try:
+            query = select(ScrapeShardORM.seen_ids).where(ScrapeShardORM.job_id == job_id, ScrapeShardORM.status == SHARD_STATUS_COMPLETED)
+            return {campground_id for ids in session.execute(query).scalars() for campground_id in ids or ()}
+        finally:
+            session.close()
+
+    def job_summary(self, job_id: str) -> dict:
+        """
+        İşin parçalarını durum sayıları, toplanmış sayaçlar ve aşama süreleri olarak özetler.
+        `done` tüm parçalar COMPLETED/FAILED olduğunda True'dur; `full_reconcile` işin tam uzlaştırma olduğunu gösterir.
+        """
+        shards = {status: 0 for status in SHARD_STATUSES}
+        counts = {}
+        stages = {}
+        errors = []
+        rows = self.list_shards(job_id)
+        for shard in rows:
+            shards[shard["status"]] += 1
+            result = shard["result"] or {}
+            for key, value in (result.get("counts") or {}).items():
+                if isinstance(value, (int, float)) and key not in _NON_ADDITIVE_COUNTS:
+                    counts[key] = counts.get(key, 0) + value
+            for stage, value in (result.get("stages") or {}).items():
+                total = stages.setdefault(stage, {"seconds": 0.0, "count": 0})
+                total["seconds"] = round(total["seconds"] + value["seconds"], 4)
+                total["count"] += value["count"]
+            if shard["status"] == SHARD_STATUS_FAILED and len(errors) < _MAX_REPORTED_ERRORS:
+                errors.append({"bbox": shard["bbox"], "attempts": shard["attempts"], "error": shard["error"]})
+        return {
+            "total": len(rows),
+            "done": bool(rows) and not shards[SHARD_STATUS_PENDING] and not shards[SHARD_STATUS_RUNNING],
+            "full_reconcile": any(shard["full_reconcile"] for shard in rows),
+            "shards": shards,
+            "counts": counts,
+            "stages": stages,
+            "errors": errors,
+        }
+
+
+def job_fields_from_summary(summary: dict) -> dict:
+    """
+    Tamamlanmış bir parçalı işin özetinden scrape_jobs kaydına yazılacak alanları üretir.
+    Başarısız parça varsa iş FAILED olur; tamamlanan parçaların sayaçları yine de kaydedilir.
+    """
+    counts = summary["counts"]
+    failed_shards = summary["shards"][SHARD_STATUS_FAILED]
+    text = (
+        f"{summary['total']} parçada {counts.get('processed', 0)} kamp alanı işlendi "
+        f"({counts.get('inserted', 0)} eklendi, {counts.get('updated', 0)} güncellendi, {counts.get('unchanged', 0)} değişmedi, "
+        f"{counts.get('failed', 0)} başarısız, {counts.get('rejected', 0)} doğrulanamadı"
+        + (f", {counts['deleted']} silindi" if counts.get("deleted") else "")
+        + ")."
+    )
+    fields = {
+        "status": JOB_STATUS_FAILED if failed_shards else JOB_STATUS_COMPLETED,
+        "details": {
+            "summary": text,
+            "shards": summary["shards"],
+            "counts": counts,
+            "stages": summary["stages"],
+        },
+        "error": None,
+    }
+    if failed_shards:
+        fields["details"]["shard_errors"] = summary["errors"]
+        fields["error"] = f"{failed_shards}/{summary['total']} parça başarısız oldu."
+    return fields
+
+
+def finalize_job(job_id: str, queue: ShardQueue = None, save_job=None):
+    """
+    İşin tüm parçaları bittiyse iş kaydını toplanmış sonuçla sonuçlandırır ve kaydedilen işi döndürür.
+
+    İş kaydının tek sahibi burasıdır: parçayı bitiren worker'lar ve API süreci aynı işi sonuçlandırmaya
+    çalışabilir, ancak yalnızca job_store.claim_finish'i kazanan kaydeder; diğerleri None alır. Tam
+    uzlaştırma işlerinde tüm parçalar tamamlandıysa silme uzlaştırması parçalarda görülen id'lerin
+    birleşimiyle burada yapılır.
+    """
+    from src.scraper.scraper import reconcile_sharded_run
+
+    queue = queue or shard_queue
+    save_job = save_job or job_store.save
+    summary = queue.job_summary(job_id)
+    if not summary["done"]:
+        return None
+    now = utcnow()
+    if not job_store.claim_finish(job_id, now):
+        return None
+    fields = job_fields_from_summary(summary)
+    if summary["full_reconcile"]:
+        if fields["status"] == JOB_STATUS_COMPLETED:
+            try:
+                crawl_stats = {key: summary["counts"].get(key, 0) for key in ("failed_pages", "truncated_tiles")}
+                summary["counts"]["deleted"] = reconcile_sharded_run(queue.load_seen_ids(job_id), crawl_stats)
+                fields = job_fields_from_summary(summary)
+            except Exception as e:
+                fields["status"] = JOB_STATUS_FAILED
+                fields["error"] = f"Silme uzlaştırması başarısız: {e}"
+                logger.error(fields["error"], extra={"component": "shard_worker", "job_id": job_id, "errtype": "DATABASE_ERROR"}, exc_info=True)
+        else:
+            logger.warning(f"Başarısız parça olduğu için silme uzlaştırması atlandı: {job_id}", extra={"component": "shard_worker", "job_id": job_id})
+    job = job_store.get(job_id, refresh=True) or {}
+    if job.get("started_at"):
+        started_at = datetime.datetime.fromisoformat(job["started_at"])
+        # SQLite zaman dilimini saklamaz; değerler UTC olarak yazılır.
+        if started_at.tzinfo is None:
+            started_at = started_at.replace(tzinfo=datetime.timezone.utc)
+        fields["details"]["elapsed_seconds"] = round((now - started_at).total_seconds(), 3)
+    job = save_job(job_id, finished_at=now, **fields)
+    logger.info(f"Parçalı iş sonuçlandı: {job_id} | {fields['details']['summary']}", extra={"component": "shard_worker", "job_id": job_id})
+    return job
+
+
+class ShardWorker:
+    """
+    Kuyruktan parça alıp `run_scraper_job(bbox=...)` ile çalıştıran worker.
+
+    Parça çalışırken ayrı bir thread kirayı `heartbeat_interval` aralıklarla uzatır. Kira başka bir
+    worker'a geçmişse (ör. süreç uzun süre durakladıysa) sonuç kaydedilmez; upsert'ler idempotent
+    olduğundan parçanın iki kez çalışması veriyi bozmaz. İşin son parçasını bitiren worker iş
+    kaydını da sonuçlandırır (finalize_job); böylece API süreci çalışmıyorken de işler tamamlanır.
+    """
+    def __init__(self, queue: ShardQueue = None, worker_id: str = None, poll_interval: float = SHARD_POLL_INTERVAL, heartbeat_interval: float = SHARD_HEARTBEAT_SECONDS, save_job=None):
+        self.queue = queue or shard_queue
+        self.worker_id = worker_id or default_worker_id()
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self._save_job = save_job or job_store.save
+
+    def _heartbeat(self, shard, stop):
+        while not stop.wait(self.heartbeat_interval):
+            try:
+                if not self.queue.heartbeat(shard["id"], self.worker_id):
+                    logger.warning(f"Parçanın kirası kaybedildi: {shard['id']} ({shard['bbox']})", extra={"component": "shard_worker", "job_id": shard["job_id"]})
+                    return
+            except Exception as e:
+                logger.warning(f"Heartbeat gönderilemedi: {shard['id']} | {e}", extra={"component": "shard_worker", "job_id": shard["job_id"], "errtype": "DATABASE_ERROR"})
+
+    def _execute(self, shard):
+        # Parça süresince yazılan tüm loglar (tarama motoru ve fotoğraf thread'leri dahil) işin job_id'sini taşır.
+        with job_log_context(shard["job_id"]):
+            self._run_shard(shard)
+
+    def _run_shard(self, shard):
+        from src.scraper.scraper import run_scraper_job
+
+        logger.info(f"Parça başlıyor: {shard['id']} ({shard['bbox']}), deneme {shard['attempt']}", extra={"component": "shard_worker", "job_id": shard["job_id"]})
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(shard, stop), name=f"shard-heartbeat-{shard['id']}", daemon=True)
+        heartbeat.start()
+        timings = StageTimings()
+        progress = {}
+        start = time.perf_counter()
+        # Tam uzlaştırma parçaları önbelleksiz tam tarama yapar ve gördüğü id'leri sonuçla birlikte kaydeder.
+        seen_ids = set() if shard["full_reconcile"] else None
+        try:
+            summary = run_scraper_job(progress.update, timings, bbox=shard["bbox"], full_reconcile=shard["full_reconcile"], seen_ids=seen_ids)
+            error = None
+        except Exception as e:
+            summary, error = None, str(e)
+        finally:
+            stop.set()
+            heartbeat.join()
+        result = {
+            "worker_id": self.worker_id,
+            "summary": summary,
+            "counts": progress,
+            "stages": timings.as_dict(),
+            "elapsed_seconds": round(time.perf_counter() - start, 3),
+        }
+        # run_scraper_job hataları kendisi loglayıp özet döndürür; son ilerleme raporu gelmediyse, hiç sayfa
+        # alınamadıysa, başarısız sayfa veya yazılamayan kayıt varsa parça yeniden denenir. Böylece tam
+        # uzlaştırmada yarım kalmış bir parçanın eksik seen_ids listesi silme için kullanılmaz.
+        error = run_failure(progress, error)
+        if error is None:
+            recorded = self.queue.complete(shard["id"], self.worker_id, result, seen_ids=sorted(seen_ids) if seen_ids is not None else None)
+            logger.info(f"Parça tamamlandı: {shard['id']} ({shard['bbox']}) | {summary}", extra={"component": "shard_worker", "job_id": shard["job_id"]})
+        else:
+            recorded = self.queue.fail(shard["id"], self.worker_id, error, result)
+            logger.warning(f"Parça başarısız: {shard['id']} ({shard['bbox']}), deneme {shard['attempt']} | {error}", extra={"component": "shard_worker", "job_id": shard["job_id"], "errtype": "SHARD_ERROR"})
+        if not recorded:
+            logger.warning(f"Parça başka bir worker'a geçtiği için sonucu kaydedilmedi: {shard['id']} ({shard['bbox']})", extra={"component": "shard_worker", "job_id": shard["job_id"]})
+        self.finalize(shard["job_id"])
+
+    def finalize(self, job_id: str):
+        return finalize_job(job_id, self.queue, self._save_job)
+
+    def run_once(self) -> bool:
+        """
+        Bir parça alıp çalıştırır; alınacak parça yoksa False döner.
+        """
+        for job_id in self.queue.sweep():
+            self.finalize(job_id)
+        shard = self.queue.claim(self.worker_id)
+        if shard is None:
+            return False
+        self._execute(shard)
+        return True
+
+    def run_forever(self, stop_event: threading.Event):
+        logger.info(f"Parça worker'ı başladı: {self.worker_id}", extra={"component": "shard_worker"})
+        while not stop_event.is_set():
+            try:
+                if self.run_once():
+                    continue
+            except Exception as e:
+                logger.error(f"Parça worker'ı hatası: {e}", extra={"component": "shard_worker", "errtype": "DATABASE_ERROR"}, exc_info=True)
+            stop_event.wait(self.poll_interval)
+        logger.info(f"Parça worker'ı durdu: {self.worker_id}", extra={"component": "shard_worker"})
+
+
+def start_worker_threads(count: int, stop_event: threading.Event):
+    """
+    Bu süreçte `count` adet daemon worker thread'i başlatır.
+    """
+    threads = []
+    for index in range(count):
+        worker = ShardWorker(worker_id=default_worker_id(index))
+        thread = threading.Thread(target=worker.run_forever, args=(stop_event,), name=f"shard-worker-{index}", daemon=True)
+        thread.start()
+        threads.append(thread)
+    return threads
+
+
+shard_queue = ShardQueue()
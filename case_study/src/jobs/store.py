@@ -0,0 +1,249 @@
+import base64
+import datetime
+import json
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import and_, func, or_, select, update
+
+from src.config import JOB_CACHE_SIZE
+from src.db.base import SessionLocal, get_engine
+from src.db.models import ScrapeJobORM
+from src.logger import logger
+
+# İş durumları için sabitler
+JOB_STATUS_PENDING = "PENDING"
+JOB_STATUS_RUNNING = "RUNNING"
+JOB_STATUS_COMPLETED = "COMPLETED"
+JOB_STATUS_FAILED = "FAILED"
+# İş çalıştırılmadı: aynı iş başka bir uygulama kopyasında çalışıyor veya advisory lock alınamadı
+JOB_STATUS_SKIPPED = "SKIPPED"
+
+TERMINAL_STATUSES = (JOB_STATUS_COMPLETED, JOB_STATUS_FAILED, JOB_STATUS_SKIPPED)
+
+_DATETIME_FIELDS = ("created_at", "triggered_at", "started_at", "finished_at", "updated_at")
+
+
+def utcnow():
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def _parse_datetime(value):
+    if isinstance(value, str):
+        return datetime.datetime.fromisoformat(value)
+    return value
+
+
+def _as_utc(value):
+    # SQLite zaman dilimini saklamaz; değerler UTC olarak yazılır.
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=datetime.timezone.utc)
+    return value
+
+
+def encode_cursor(job: dict) -> str:
+    """
+    Sayfalama cursor'ı: (created_at, job_id) çiftinin URL güvenli base64 kodlaması. İstemci için opaktır;
+    created_at içindeki "+" gibi karakterler sorgu dizgesinde bozulmaz.
+    """
+    payload = json.dumps([job["created_at"], job["job_id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """
+    encode_cursor'ın tersi: (created_at, job_id). Çözülemeyen cursor için ValueError.
+    """
+    try:
+        created_at, job_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(created_at, str) or not isinstance(job_id, str):
+            raise ValueError(cursor)
+        return _parse_datetime(created_at), job_id
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Geçersiz cursor: {cursor}") from e
+
+
+def _page_key(job: dict):
+    return _as_utc(_parse_datetime(job["created_at"])), job["job_id"]
+
+
+class JobStore:
+    """
+    scrape_jobs tablosu üzerinde iş durumu deposu.
+
+    Yazmalar önce süreç içi, boyutu sınırlı bir LRU ön belleğe sonra veritabanına yapılır.
+    Bu süreçte oluşturulan/güncellenen işler ön bellekten okunur; diğer işler için ön bellek
+    yalnızca sonuçlanmış (COMPLETED/FAILED/SKIPPED) kayıtlar için kullanılır, çünkü başka bir worker
+    tarafından güncelleniyor olabilirler. Veritabanına ulaşılamazsa ön bellekle çalışmaya devam edilir.
+    """
+    def __init__(self, session_factory=None, cache_size: int = JOB_CACHE_SIZE):
+        self._session_factory = session_factory
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._local_ids = set()
+        self._lock = threading.Lock()
+
+    def _session(self):
+        if self._session_factory is not None:
+            return self._session_factory()
+        get_engine()
+        return SessionLocal.session_factory()
+
+    def _remember(self, job: dict, local: bool):
+        with self._lock:
+            self._cache[job["job_id"]] = dict(job)
+            self._cache.move_to_end(job["job_id"])
+            if local:
+                self._local_ids.add(job["job_id"])
+            while len(self._cache) > self.cache_size:
+                evicted_id, _ = self._cache.popitem(last=False)
+                self._local_ids.discard(evicted_id)
+
+    def _cached(self, job_id: str):
+        with self._lock:
+            job = self._cache.get(job_id)
+            if job is None:
+                return None
+            if job_id not in self._local_ids and job.get("status") not in TERMINAL_STATUSES:
+                return None
+            self._cache.move_to_end(job_id)
+            return dict(job)
+
+    def save(self, job_id: str, **fields) -> dict:
+        """
+        İşi oluşturur veya verilen alanlarla günceller; güncel iş sözlüğünü döndürür.
+        """
+        fields.setdefault("updated_at", utcnow())
+        with self._lock:
+            job = dict(self._cache.get(job_id) or {"job_id": job_id})
+        for key, value in fields.items():
+            job[key] = value.isoformat() if isinstance(value, datetime.datetime) else value
+        job.setdefault("created_at", job["updated_at"])
+        self._remember(job, local=True)
+        session = self._session()
+        try:
+            record = session.get(ScrapeJobORM, job_id)
+            if record is None:
+                record = ScrapeJobORM(id=job_id, job_name=job.get("job_name", job_id), created_at=_parse_datetime(job["created_at"]))
+                session.add(record)
+            for key, value in fields.items():
+                setattr(record, key, _parse_datetime(value) if key in _DATETIME_FIELDS else value)
+            session.commit()
+            merged = record.to_dict()
+        except Exception as e:
+            session.rollback()
+            logger.warning(f"İş durumu veritabanına yazılamadı, yalnızca bellekte tutuluyor: {job_id} | {e}", extra={"component": "job_store", "errtype": "DATABASE_ERROR"})
+            return job
+        finally:
+            session.close()
+        self._remember(merged, local=True)
+        return merged
+
+    def claim_finish(self, job_id: str, finished_at) -> bool:
+        """
+        İş henüz sonuçlanmadıysa (finished_at boşsa) finished_at'i yazar ve True döner. Aynı işi birden fazla
+        süreç sonuçlandırmaya çalıştığında koşullu güncellemeyi yalnızca biri kazanır.
+        """
+        session = self._session()
+        try:
+            result = session.execute(
+                update(ScrapeJobORM)
+                .where(ScrapeJobORM.id == job_id, ScrapeJobORM.finished_at.is_(None))
+                .values(finished_at=finished_at, updated_at=finished_at)
+            )
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.warning(f"İşin sonuçlandırılması veritabanında işaretlenemedi: {job_id} | {e}", extra={"component": "job_store", "errtype": "DATABASE_ERROR"})
+            return False
+        finally:
+            session.close()
+        return result.rowcount == 1
+
+    def get(self, job_id: str, refresh: bool = False):
+        """
+        `refresh` True ise ön bellek atlanır; başka bir süreçte güncellenen bu süreçteki işler için kullanılır.
+        """
+        job = None if refresh else self._cached(job_id)
+        if job is not None:
+            return job
+        session = self._session()
+        try:
+            record = session.get(ScrapeJobORM, job_id)
+        except Exception as e:
+            logger.warning(f"İş durumu veritabanından okunamadı: {job_id} | {e}", extra={"component": "job_store", "errtype": "DATABASE_ERROR"})
+            with self._lock:
+                job = self._cache.get(job_id)
+            return dict(job) if job else None
+        finally:
+            session.close()
+        if record is None:
+            return None
+        job = record.to_dict()
+        self._remember(job, local=job_id in self._local_ids)
+        return job
+
+    def list_jobs(self, status=None, since=None, cursor=None, limit: int = 50) -> dict:
+        """
+        İşleri en yeniden eskiye (created_at, id) sıralı, keyset sayfalama ile listeler.
+
+        status: yalnızca bu durumdaki işler.
+        since: yalnızca bu zamandan sonra güncellenen işler (artımlı sorgulama için).
+        cursor: önceki yanıttaki next_cursor.
+
+        latest_updated_at yalnızca bu sayfanın değil, status/since ile süzülen tüm işlerin en yeni updated_at değeridir;
+        sayfalar created_at'e göre sıralı olduğundan sayfa içindeki en büyük değer sonraki sayfalardaki güncellemeleri kaçırır.
+        """
+        since = _parse_datetime(since)
+        session = self._session()
+        try:
+            filters = []
+            if status:
+                filters.append(ScrapeJobORM.status == status)
+            if since is not None:
+                filters.append(ScrapeJobORM.updated_at > since)
+            latest = session.execute(select(func.max(ScrapeJobORM.updated_at)).where(*filters)).scalar()
+            latest_updated_at = latest.isoformat() if latest is not None else None
+            query = select(ScrapeJobORM).where(*filters)
+            if cursor:
+                cursor_created_at, cursor_id = decode_cursor(cursor)
+                query = query.where(or_(
+                    ScrapeJobORM.created_at < cursor_created_at,
+                    and_(ScrapeJobORM.created_at == cursor_created_at, ScrapeJobORM.id < cursor_id),
+                ))
+            query = query.order_by(ScrapeJobORM.created_at.desc(), ScrapeJobORM.id.desc()).limit(limit + 1)
+            jobs = [record.to_dict() for record in session.execute(query).scalars()]
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.warning(f"İş listesi veritabanından okunamadı, ön bellek kullanılıyor: {e}", extra={"component": "job_store", "errtype": "DATABASE_ERROR"})
+            jobs, latest_updated_at = self._list_cached(status, since, cursor, limit)
+        finally:
+            session.close()
+        has_more = len(jobs) > limit
+        jobs = jobs[:limit]
+        if latest_updated_at is None and since is not None:
+            latest_updated_at = since.isoformat()
+        return {
+            "items": jobs,
+            "next_cursor": encode_cursor(jobs[-1]) if has_more else None,
+            "latest_updated_at": latest_updated_at,
+        }
+
+    def _list_cached(self, status, since, cursor, limit):
+        with self._lock:
+            jobs = [dict(job) for job in self._cache.values()]
+        if status:
+            jobs = [job for job in jobs if job.get("status") == status]
+        if since is not None:
+            jobs = [job for job in jobs if _parse_datetime(job["updated_at"]) > since]
+        latest_updated_at = max((job["updated_at"] for job in jobs), default=None)
+        jobs.sort(key=_page_key, reverse=True)
+        if cursor:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+            cursor_key = (_as_utc(cursor_created_at), cursor_id)
+            jobs = [job for job in jobs if _page_key(job) < cursor_key]
+        return jobs[:limit + 1], latest_updated_at
+
+
+job_store = JobStore()
@@ -0,0 +1,295 @@
+"""
+Sıkıştırılmış log arşivi ve job_id dizini.
+
+Rotasyonda app.log, logs/archive altına `app.log.<zaman>.json.gz` olarak taşınır. Arşiv, yaklaşık
+LOG_ARCHIVE_BLOCK_BYTES büyüklüğündeki satır bloklarının art arda yazılmış bağımsız gzip üyelerinden oluşur:
+dosya `zcat` ile bütün olarak okunabilir, her blok da kendi ofsetinden başlayarak tek başına açılabilir.
+
+Her arşiv için `index.jsonl` dosyasına, arşivde kaydı bulunan her iş için bir satır ve arşivin kendisi için
+bir kapanış satırı eklenir:
+
+    {"job_id": "...", "file": "app.log.<zaman>.json.gz", "blocks": [[ofset, uzunluk], ...], "lines": 12, "first": "...", "last": "..."}
+    {"file": "app.log.<zaman>.json.gz", "jobs": 3, "bytes": 348211}
+
+Bir işin logları yalnızca bu dizinde geçen bloklar açılarak okunur; arşiv dizini taranmaz. Dizin yalnızca
+eklenerek büyür ve süreç içinde son okunan ofsetten itibaren artımlı olarak yüklenir.
+"""
+import logging
+import os
+import threading
+import time
+import zlib
+
+from src.config import LOG_ARCHIVE_BLOCK_BYTES, LOG_ARCHIVE_COMPRESSION_LEVEL
+from src.serialization import dumps, dumps_bytes, loads
+
+INDEX_FILE_NAME = "index.jsonl"
+ARCHIVE_SUFFIX = ".json.gz"
+LEGACY_SUFFIX = ".json"
+# zlib'in gzip başlığı/sonekiyle sıkıştırıp açması için wbits değeri
+_GZIP_WBITS = 31
+
+_LEVELS = {name: logging.getLevelName(name) for name in ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")}
+
+
+def _job_id_needle(job_id: str) -> bytes:
+    # JsonFormatter'ın yazdığı `"job_id":"<id>"` parçası; mesaj içindeki tırnaklar kaçışlı olduğundan yanlış eşleşmez.
+    return dumps({"job_id": job_id})[1:-1].encode("utf-8")
+
+
+def _compress_block(lines) -> bytes:
+    compressor = zlib.compressobj(LOG_ARCHIVE_COMPRESSION_LEVEL, zlib.DEFLATED, _GZIP_WBITS)
+    return compressor.compress(b"".join(lines)) + compressor.flush()
+
+
+def _iter_line_blocks(source, block_bytes: int):
+    """
+    Dosyayı bütün satırlardan oluşan, yaklaşık `block_bytes` büyüklüğünde bloklara böler.
+    """
+    block, size = [], 0
+    for line in source:
+        block.append(line)
+        size += len(line)
+        if size >= block_bytes:
+            yield block
+            block, size = [], 0
+    if block:
+        yield block
+
+
+def _iter_members(data: bytes):
+    """
+    Art arda yazılmış gzip üyelerini (ofset, uzunluk, açılmış içerik) olarak üretir.
+    """
+    view = memoryview(data)
+    offset = 0
+    while offset < len(data):
+        decompressor = zlib.decompressobj(_GZIP_WBITS)
+        try:
+            content = decompressor.decompress(view[offset:])
+        except zlib.error:
+            return
+        length = len(data) - offset - len(decompressor.unused_data)
+        yield offset, length, content
+        offset += length
+
+
+def _matching_lines(data: bytes, needle: bytes, min_levelno=None):
+    """
+    `needle` geçen tam satırları sırayla üretir; yarım kalmış son satır (yazılmakta olan kayıt) atlanır.
+    """
+    start = data.find(needle)
+    while start != -1:
+        line_start = data.rfind(b"\n", 0, start) + 1
+        line_end = data.find(b"\n", start)
+        if line_end == -1:
+            return
+        line = data[line_start:line_end]
+        start = data.find(needle, line_end)
+        if min_levelno is not None:
+            try:
+                level = loads(line).get("level")
+            except ValueError:
+                continue
+            if _LEVELS.get(level, 0) < min_levelno:
+                continue
+        yield line.decode("utf-8", errors="replace")
+
+
+def _collect_jobs(jobs: dict, lines, offset: int, length: int):
+    """
+    Bir bloğun satırlarındaki işleri `jobs` sözlüğüne ekler: job_id -> blok listesi, satır sayısı, ilk/son zaman.
+    """
+    seen = set()
+    for line in lines:
+        if b'"job_id"' not in line:
+            continue
+        try:
+            record = loads(line)
+        except ValueError:
+            continue
+        job_id = record.get("job_id")
+        if job_id is None:
+            continue
+        job_id = str(job_id)
+        timestamp = record.get("timestamp")
+        stats = jobs.get(job_id)
+        if stats is None:
+            stats = jobs[job_id] = {"blocks": [], "lines": 0, "first": timestamp, "last": timestamp}
+        if job_id not in seen:
+            seen.add(job_id)
+            stats["blocks"].append([offset, length])
+        stats["lines"] += 1
+        stats["last"] = timestamp
+
+
+class LogArchive:
+    """
+    logs/archive dizinindeki sıkıştırılmış arşivleri yazar ve job_id dizini üzerinden okur.
+    """
+    def __init__(self, archive_dir: str, live_path: str, block_bytes: int = LOG_ARCHIVE_BLOCK_BYTES):
+        self.archive_dir = archive_dir
+        self.live_path = live_path
+        self.block_bytes = max(1, block_bytes)
+        self.index_path = os.path.join(archive_dir, INDEX_FILE_NAME)
+        self._entries = {}
+        self._files = set()
+        self._index_offset = 0
+        self._lock = threading.Lock()
+
+    # --- Yazma ---
+
+    def _pending_path(self) -> str:
+        timestamp = time.strftime("%Y-%m-%d_%H-%M-%S", time.localtime())
+        path = os.path.join(self.archive_dir, f"app.log.{timestamp}{LEGACY_SUFFIX}")
+        suffix = 1
+        # Aynı saniyede birden fazla rotasyon olursa önceki arşivin üzerine yazılmaz.
+        while os.path.exists(path) or os.path.exists(path + ".gz"):
+            path = os.path.join(self.archive_dir, f"app.log.{timestamp}-{suffix}{LEGACY_SUFFIX}")
+            suffix += 1
+        return path
+
+    def rotate(self, source: str, dest_unused=None):
+        """
+        RotatingFileHandler.rotator: app.log'u arşiv dizinine taşıyıp sıkıştırır ve dizine ekler.
+        Sıkıştırma yarıda kalırsa dosya `.json` olarak kalır; `python main.py logs --reindex` ile tamamlanır.
+        """
+        if not os.path.exists(source):
+            return
+        pending = self._pending_path()
+        os.rename(source, pending)
+        self.archive(pending)
+
+    def archive(self, path: str) -> str:
+        """
+        Sıkıştırılmamış bir JSON log dosyasını blok blok `.json.gz` arşivine çevirir, dizine ekler ve
+        kaynağı siler. Arşivin yolunu döndürür.
+        """
+        target_path = path + ".gz"
+        temp_path = target_path + ".tmp"
+        jobs = {}
+        with open(path, "rb") as source, open(temp_path, "wb") as target:
+            for lines in _iter_line_blocks(source, self.block_bytes):
+                offset = target.tell()
+                block = _compress_block(lines)
+                target.write(block)
+                _collect_jobs(jobs, lines, offset, len(block))
+        os.replace(temp_path, target_path)
+        self._append_index(os.path.basename(target_path), jobs, os.path.getsize(target_path))
+        os.remove(path)
+        return target_path
+
+    def index_archive(self, path: str):
+        """
+        Dizinde olmayan bir `.json.gz` arşivini (ör. dizine yazılmadan kesilen rotasyon) yeniden yazmadan dizine ekler.
+        Tek üyeli (bloksuz) gzip dosyalarında bütün dosya tek blok sayılır.
+        """
+        with open(path, "rb") as archive:
+            data = archive.read()
+        jobs = {}
+        for offset, length, content in _iter_members(data):
+            _collect_jobs(jobs, content.splitlines(keepends=True), offset, length)
+        self._append_index(os.path.basename(path), jobs, len(data))
+
+    def _append_index(self, file_name: str, jobs: dict, size: int):
+        records = [{"job_id": job_id, "file": file_name, **stats} for job_id, stats in jobs.items()]
+        records.append({"file": file_name, "jobs": len(jobs), "bytes": size})
+        payload = b"".join(dumps_bytes(record) + b"\n" for record in records)
+        # Tek bir O_APPEND yazımı: aynı dizine yazan diğer süreçlerin satırlarıyla karışmaz.
+        fd = os.open(self.index_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, payload)
+        finally:
+            os.close(fd)
+
+    def reindex(self, on_file=None) -> dict:
+        """
+        Dizinde olmayan arşivleri işler: eski sıkıştırılmamış `.json` arşivler sıkıştırılıp, dizinsiz `.json.gz`
+        arşivler olduğu gibi dizine eklenir. Sayaçları döndürür.
+        """
+        self._refresh()
+        with self._lock:
+            indexed = set(self._files)
+        counts = {"compressed": 0, "indexed": 0}
+        for name in sorted(os.listdir(self.archive_dir)):
+            path = os.path.join(self.archive_dir, name)
+            if name.endswith(ARCHIVE_SUFFIX):
+                if name in indexed:
+                    continue
+                self.index_archive(path)
+                counts["indexed"] += 1
+            elif name.endswith(LEGACY_SUFFIX) and name != INDEX_FILE_NAME:
+                if os.path.exists(path + ".gz"):
+                    # Önceki sıkıştırma yarıda kalmış; arşiv baştan yazılır.
+                    os.remove(path + ".gz")
+                self.archive(path)
+                counts["compressed"] += 1
+            else:
+                continue
+            if on_file is not None:
+                on_file(name)
+        return counts
+
+    # --- Okuma ---
+
+    def _refresh(self):
+        """
+        index.jsonl'e son okumadan bu yana eklenen tam satırları belleğe alır.
+        """
+        with self._lock:
+            try:
+                size = os.path.getsize(self.index_path)
+            except FileNotFoundError:
+                size = 0
+            if size < self._index_offset:
+                # Dizin silinmiş veya yeniden oluşturulmuş
+                self._entries, self._files, self._index_offset = {}, set(), 0
+            if size == self._index_offset:
+                return
+            with open(self.index_path, "rb") as index:
+                index.seek(self._index_offset)
+                data = index.read(size - self._index_offset)
+            end = data.rfind(b"\n") + 1
+            for line in data[:end].splitlines():
+                try:
+                    record = loads(line)
+                except ValueError:
+                    continue
+                self._files.add(record.get("file"))
+                if record.get("job_id") is not None:
+                    self._entries.setdefault(record["job_id"], []).append(record)
+            self._index_offset += end
+
+    def entries(self, job_id: str) -> list:
+        """
+        İşin dizin girdileri (arşiv dosyası, bloklar, satır sayısı, ilk/son zaman), rotasyon sırasıyla.
+        """
+        self._refresh()
+        with self._lock:
+            return list(self._entries.get(job_id, ()))
+
+    def iter_job_lines(self, job_id: str, min_level: str = None):
+        """
+        İşin JSON log satırlarını eskiden yeniye üretir: önce dizindeki arşiv blokları, sonra henüz
+        arşivlenmemiş app.log. `min_level` verilirse daha düşük seviyedeki kayıtlar atlanır.
+        """
+        needle = _job_id_needle(job_id)
+        min_levelno = _LEVELS[min_level] if min_level else None
+        for entry in self.entries(job_id):
+            try:
+                archive = open(os.path.join(self.archive_dir, entry["file"]), "rb")
+            except FileNotFoundError:
+                # Arşiv saklama süresi dolduğu için silinmiş
+                continue
+            with archive:
+                for offset, length in entry["blocks"]:
+                    archive.seek(offset)
+                    yield from _matching_lines(zlib.decompress(archive.read(length), _GZIP_WBITS), needle, min_levelno)
+        try:
+            live = open(self.live_path, "rb")
+        except FileNotFoundError:
+            return
+        # app.log belleğe bütün olarak alınmaz; satır satır okunup arşiv bloğu büyüklüğünde parçalarla taranır.
+        with live:
+            for block in _iter_line_blocks(live, LOG_ARCHIVE_BLOCK_BYTES):
+                yield from _matching_lines(b"".join(block), needle, min_levelno)
@@ -1,10 +1,18 @@
+import atexit
+import contextlib
+import contextvars
+import copy
 import logging
+import multiprocessing
+import queue
 import sys
-import json
 import os
+import threading
 import time
-from logging.handlers import RotatingFileHandler
-from src.config import ENV
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+from src.config import ENV, LOG_ASYNC, LOG_MAX_BYTES, LOG_ROW_SAMPLE_RATE, LOG_ROW_MAX_PER_SECOND
+from src.log_archive import LogArchive
+from src.serialization import dumps
 
 class JsonFormatter(logging.Formatter):
     def __init__(self, fmt=None, datefmt=None, style='%', validate=True, *, defaults=None):
@@ -24,9 +32,97 @@ class JsonFormatter(logging.Formatter):
             "errtype": getattr(record, "errtype", "GENERIC"),
             "message": record.getMessage(),
         }
+        job_id = getattr(record, "job_id", None)
+        if job_id is not None:
+            log_record["job_id"] = job_id
         if record.exc_info:
             log_record["exception"] = self.formatException(record.exc_info)
-        return json.dumps(log_record, ensure_ascii=False)
+        elif record.exc_text:
+            log_record["exception"] = record.exc_text
+        return dumps(log_record)
+
+# Çalışmakta olan scraper işinin kimliği. Bu bağlamda (ve bağlamı kopyalanan thread'lerde) yazılan kayıtlara
+# JobContextFilter tarafından `job_id` olarak eklenir; işin logları log arşivinde bu alanla dizinlenir.
+current_job_id = contextvars.ContextVar("current_job_id", default=None)
+
+@contextlib.contextmanager
+def job_log_context(job_id):
+    token = current_job_id.set(job_id)
+    try:
+        yield
+    finally:
+        current_job_id.reset(token)
+
+class JobContextFilter(logging.Filter):
+    """
+    Kayıtta açıkça `extra={"job_id": ...}` verilmemişse bağlamdaki işin kimliğini ekler. Logger'a
+    bağlanır; böylece kuyruk/listener thread'ine geçmeden, kaydı oluşturan thread'in bağlamında çalışır.
+    """
+    def filter(self, record):
+        if getattr(record, "job_id", None) is None:
+            job_id = current_job_id.get()
+            if job_id is not None:
+                record.job_id = job_id
+        return True
+
+class RowLogSampler(logging.Filter):
+    """
+    `extra={"per_row": True}` ile işaretlenen kayıt başına logları bileşen bazında örnekler:
+    her `sample_rate` kayıttan biri geçer ve saniyede en fazla `max_per_second` kayıt yazılır.
+    WARNING ve üzeri seviyeler ile işaretsiz kayıtlar her zaman geçer. Atlanan kayıtların
+    sayısı `pop_dropped` ile parti özetlerine eklenmek üzere alınabilir.
+    """
+    def __init__(self, sample_rate=LOG_ROW_SAMPLE_RATE, max_per_second=LOG_ROW_MAX_PER_SECOND):
+        super().__init__()
+        self.sample_rate = max(1, sample_rate)
+        self.max_per_second = max_per_second
+        self._state = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if not getattr(record, "per_row", False) or record.levelno >= logging.WARNING:
+            return True
+        component = getattr(record, "component", record.module)
+        now = time.monotonic()
+        with self._lock:
+            state = self._state.get(component)
+            if state is None:
+                state = self._state[component] = {"seen": 0, "window_start": now, "in_window": 0, "dropped": 0}
+            state["seen"] += 1
+            if now - state["window_start"] >= 1.0:
+                state["window_start"] = now
+                state["in_window"] = 0
+            allowed = (state["seen"] - 1) % self.sample_rate == 0
+            if allowed and self.max_per_second and state["in_window"] >= self.max_per_second:
+                allowed = False
+            if allowed:
+                state["in_window"] += 1
+            else:
+                state["dropped"] += 1
+        return allowed
+
+    def pop_dropped(self):
+        with self._lock:
+            dropped = {component: state["dropped"] for component, state in self._state.items() if state["dropped"]}
+            for state in self._state.values():
+                state["dropped"] = 0
+        return dropped
+
+class StructuredQueueHandler(QueueHandler):
+    """
+    Kaydı JSON'a çevirmeden kuyruğa koyar; biçimlendirme QueueListener thread'inde yapılır.
+    Mesaj argümanları ve exception metni burada çözülür ki kayıt thread'ler arası güvenle taşınsın.
+    """
+    _exception_formatter = logging.Formatter()
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self._exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
 
 # --- Directory Setup ---
 LOG_ROOT_DIR = "logs"
@@ -41,25 +137,27 @@ if not os.path.exists(ARCHIVE_LOG_DIR):
 logger = logging.getLogger("case_study")
 logger.setLevel(logging.DEBUG)
 
-# --- Custom Rotator for app.log Archiving ---
-def archive_rotator(source, dest_unused):
-    timestamp = time.strftime("%Y-%m-%d_%H-%M-%S", time.localtime())
-    archive_path = os.path.join(ARCHIVE_LOG_DIR, f"app.log.{timestamp}.json")
-    if os.path.exists(source):
-        try:
-            os.rename(source, archive_path)
-        except Exception as e:
-            print(f"Error during app.log rotation: {e}", file=sys.stderr)
+logger.addFilter(JobContextFilter())
 
 # --- Handlers Setup ---
 JSON_DATEFMT = '%Y-%m-%d %H:%M:%S'
+app_log_filepath = os.path.join(LOG_ROOT_DIR, "app.log")
+
+# --- Custom Rotator for app.log Archiving ---
+# Rotasyonda app.log sıkıştırılıp logs/archive altına taşınır ve job_id dizinine eklenir (src/log_archive.py).
+log_archive = LogArchive(ARCHIVE_LOG_DIR, app_log_filepath)
+
+def archive_rotator(source, dest_unused):
+    try:
+        log_archive.rotate(source)
+    except Exception as e:
+        print(f"Error during app.log rotation: {e}", file=sys.stderr)
 
 # 1. Main App Log Handler with Archiving (logs/app.log)
-app_log_filepath = os.path.join(LOG_ROOT_DIR, "app.log")
 app_log_handler = RotatingFileHandler(
     app_log_filepath,
-    maxBytes=10*1024*1024,  # 10 MB
-    backupCount=0,          # Archiving handled by custom archive_rotator
+    maxBytes=LOG_MAX_BYTES,
+    backupCount=1,          # RotatingFileHandler rotator'ı yalnızca backupCount > 0 iken çağırır; hedef adı archive_rotator'da kullanılmaz
     encoding="utf-8",
     delay=True
 )
@@ -76,8 +174,75 @@ console_handler.setLevel(logging.INFO)
 if logger.hasHandlers():
     logger.handlers.clear()
 
-logger.addHandler(app_log_handler)
-logger.addHandler(console_handler)
+# 3. Per-row log sampling: logger'a bağlanır ki her kayıt çıktı sayısından bağımsız olarak bir kez örneklensin
+row_log_sampler = RowLogSampler()
+logger.addFilter(row_log_sampler)
+
+log_listener = None
+if LOG_ASYNC:
+    # JSON formatting and file/stdout I/O happen on the listener thread, not on the caller's thread.
+    log_queue = queue.SimpleQueue()
+    queue_handler = StructuredQueueHandler(log_queue)
+    log_listener = QueueListener(log_queue, app_log_handler, console_handler, respect_handler_level=True)
+    log_listener.start()
+    atexit.register(log_listener.stop)
+    logger.addHandler(queue_handler)
+else:
+    logger.addHandler(app_log_handler)
+    logger.addHandler(console_handler)
+
+# --- Child Process Logging ---
+# spawn ile açılan işlemler bu modülü yeniden import eder ve her biri logs/app.log'a kendi RotatingFileHandler'ıyla
+# yazar; bir işlemin rotasyonu diğerlerinin satırlarını kaybettirir. Süreç havuzları bu yüzden ProcessLogForwarder
+# ile açılır: alt işlemlerin kayıtları kuyrukla ana işleme taşınır ve dosyaya yalnızca ana işlem yazar.
+class _ForwardedRecordHandler(logging.Handler):
+    """
+    Alt işlemden gelen kaydı bu işlemin handler'larından geçirir. Kayıt başına örnekleme alt işlemde
+    yapıldığından kayıt ikinci kez örneklenmez.
+    """
+    def emit(self, record):
+        record.per_row = False
+        logger.handle(record)
+
+def forward_logs_to_parent(parent_queue):
+    """
+    Süreç havuzu başlatıcısı (alt işlemde çalışır): dosya ve konsol handler'larını kaldırır, kayıtları
+    `parent_queue` ile ana işleme gönderir.
+    """
+    global log_listener
+    if log_listener is not None:
+        atexit.unregister(log_listener.stop)
+        log_listener.stop()
+        log_listener = None
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.addHandler(StructuredQueueHandler(parent_queue))
+
+class ProcessLogForwarder:
+    """
+    Alt işlemlerin loglarını bu işleme taşıyan kuyruk ve dinleyici. `executor_options()` ProcessPoolExecutor'a
+    verilir; dinleyici havuz kapatıldıktan sonra durdurulmalıdır ki kuyrukta kalan kayıtlar da yazılsın.
+    """
+    def __init__(self, context=None):
+        self.context = context or multiprocessing.get_context("spawn")
+        self.queue = self.context.Queue()
+        self._listener = QueueListener(self.queue, _ForwardedRecordHandler())
+
+    def start(self):
+        self._listener.start()
+        return self
+
+    def stop(self):
+        self._listener.stop()
+
+    def executor_options(self) -> dict:
+        return {"mp_context": self.context, "initializer": forward_logs_to_parent, "initargs": (self.queue,)}
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
 
 # --- Custom Exception Classes ---
 class DatabaseException(Exception): pass
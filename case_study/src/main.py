@@ -1,5 +1,5 @@
-from fastapi import FastAPI, BackgroundTasks, HTTPException
-from fastapi.responses import FileResponse 
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles 
 from fastapi.concurrency import run_in_threadpool
 from contextlib import asynccontextmanager
@@ -8,84 +8,241 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.executors.asyncio import AsyncIOExecutor
 from apscheduler.triggers.cron import CronTrigger
 
-from src.scraper.scraper import run_scraper_job 
-from src.logger import logger 
+from src.scraper.scraper import full_reconcile_due, run_scraper_job
+from src.api.dead_letters import router as dead_letters_router
+from src.api.endpoints import router as campgrounds_router
+from src.api.photos import router as photos_router
+from src.api.responses import FastJSONResponse
+from src.api.snapshot import campground_snapshot
+from src.db.base import dispose_engine
+from src.db.db import init_db
+from src.jobs import (
+    job_store,
+    job_coordinator,
+    JobQueueFull,
+    JOB_PRIORITY_MANUAL,
+    JOB_PRIORITY_SCHEDULED,
+    JOB_STATUS_PENDING,
+    JOB_STATUS_RUNNING,
+    JOB_STATUS_COMPLETED,
+    JOB_STATUS_FAILED,
+    TERMINAL_STATUSES,
+    shard_queue,
+    finalize_job,
+    plan_shards,
+    run_failure,
+    start_worker_threads,
+)
+from src.jobs.events import job_events, format_sse
+from src.logger import job_log_context, log_archive, logger
+from src.metrics import StageTimings, registry, scrape_job_seconds, scrape_jobs_total
+from src.config import API_URL, SCRAPE_SHARDS, SHARD_APP_WORKERS, SHARD_POLL_INTERVAL
+from src.utils.circuit_breaker import CircuitOpenError, circuit_breakers
 
+from typing import Optional
+import asyncio
+import itertools
+import threading
+import time
 import uuid
 import datetime
+from urllib.parse import urlsplit
 
-# İş durumları için sabitler
-JOB_STATUS_PENDING = "PENDING"
-JOB_STATUS_RUNNING = "RUNNING"
-JOB_STATUS_COMPLETED = "COMPLETED"
-JOB_STATUS_FAILED = "FAILED"
+# SSE bağlantısı açıldığında gönderilen iş sayısı ve boşta keep-alive aralığı (saniye)
+SSE_SNAPSHOT_SIZE = 50
+SSE_KEEPALIVE_INTERVAL = 15
+# Açık akışlar uvicorn'un kapanmasını bekletmesin diye bağlantı bu süre sonunda kapatılır;
+# EventSource otomatik olarak yeniden bağlanır ve güncel bir snapshot alır.
+SSE_MAX_STREAM_SECONDS = 300
 
-# İş durumlarını ve detaylarını saklamak için global bir sözlük
-# Daha büyük uygulamalarda Redis gibi harici bir depolama düşünülebilir.
-job_statuses = {}
+# İş durumları artık scrape_jobs tablosunda (src/jobs/store.py) kalıcı olarak saklanıyor;
+# süreç içinde yalnızca sınırlı bir LRU ön bellek tutulur.
+
+async def _save_job(job_id: str, **fields):
+    """
+    İş durumunu kaydeder ve güncel hâlini SSE abonelerine `job` olayı olarak yayınlar.
+    """
+    job = await run_in_threadpool(job_store.save, job_id, **fields)
+    job_events.publish("job", job)
+    return job
+
+def _save_job_threadsafe(job_id: str, **fields):
+    """
+    Thread havuzundan çağrılan _save_job karşılığı; `job` olayı event loop'a aktarılarak yayınlanır.
+    """
+    job = job_store.save(job_id, **fields)
+    job_events.publish_threadsafe("job", job)
+    return job
+
+async def _run_sharded_job(job_id: str, job_name: str, job_start: float):
+    """
+    İşi SCRAPE_SHARDS parçaya bölüp scrape_shards kuyruğuna ekler ve tüm parçalar bitene kadar bekler.
+    Parçaları herhangi bir süreçteki worker'lar çalıştırır; toplanan ilerleme SSE ile yayınlanır.
+    Tam uzlaştırmanın süresi geldiyse parçalar tam tarama olarak çalışır. İş kaydını finalize_job
+    sonuçlandırır (silme uzlaştırması dahil); son parçayı bitiren worker önce davranırsa bu süreç
+    yalnızca sonucu bekler.
+    """
+    full_reconcile = await run_in_threadpool(full_reconcile_due)
+    shard_count = await run_in_threadpool(shard_queue.enqueue, job_id, plan_shards(SCRAPE_SHARDS), full_reconcile)
+    mode = " (tam uzlaştırma)" if full_reconcile else ""
+    await _save_job(job_id, details=f"İş {shard_count} parçaya bölündü{mode}, worker'lar bekleniyor.")
+    while True:
+        for expired_job_id in await run_in_threadpool(shard_queue.sweep):
+            logger.warning(f"Kirası dolan parçalar başarısız sayıldı: {expired_job_id}", extra={"component": "job_runner", "job_id": expired_job_id})
+        summary = await run_in_threadpool(shard_queue.job_summary, job_id)
+        job_events.publish("progress", {"job_id": job_id, **summary["counts"], "shards": summary["shards"], "elapsed": round(time.perf_counter() - job_start, 2)})
+        if summary["done"]:
+            break
+        await asyncio.sleep(SHARD_POLL_INTERVAL)
+    job = await run_in_threadpool(finalize_job, job_id, shard_queue, _save_job_threadsafe)
+    if job is None:
+        # Başka bir süreç sonuçlandırıyor; silme uzlaştırması bitene kadar iş kaydı RUNNING kalır.
+        while job is None or job.get("status") not in TERMINAL_STATUSES:
+            await asyncio.sleep(SHARD_POLL_INTERVAL)
+            job = await run_in_threadpool(job_store.get, job_id, True)
+        job_events.publish("job", job)
+    elapsed = time.perf_counter() - job_start
+    scrape_job_seconds.observe(elapsed, status=job["status"])
+    scrape_jobs_total.inc(status=job["status"])
+    logger.info(f"Parçalı iş sonuçlandı: {job_name} (ID: {job_id}) | {job['details']['summary']}", extra={"component": "job_runner", "job_id": job_id, "job_name": job_name})
+    if summary["shards"]["COMPLETED"]:
+        campground_snapshot.schedule_rebuild()
 
 async def _run_scraper_job_with_status(job_id: str, job_name: str):
+    # İş süresince yazılan her log kaydı (thread havuzundaki scraper ve onun thread'leri dahil) işin
+    # job_id'siyle etiketlenir; GET /scrape/status/{job_id}/logs bu alanla dizinlenmiş arşivden okur.
+    with job_log_context(job_id):
+        await _execute_job(job_id, job_name)
+
+async def _execute_job(job_id: str, job_name: str):
     logger.info(f"İş başlıyor: {job_name} (ID: {job_id})", extra={"component": "job_runner", "job_id": job_id, "job_name": job_name})
-    # Ensure the job_id exists in job_statuses before trying to update it,
-    # especially if it's initialized elsewhere or might be cleared.
-    if job_id not in job_statuses:
-        job_statuses[job_id] = {} # Initialize if not present
-
-    job_statuses[job_id].update({ # Use update to preserve other potential keys like 'type', 'schedule'
-        "status": JOB_STATUS_RUNNING,
-        "job_name": job_name, # Keep job_name in case it's not already there or needs update
-        "started_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
-        "updated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
-        "details": "İş çalışıyor..."
-    })
+    now = datetime.datetime.now(datetime.timezone.utc)
+    await _save_job(
+        job_id,
+        status=JOB_STATUS_RUNNING,
+        job_name=job_name,
+        started_at=now,
+        finished_at=None,
+        error=None,
+        details="İş çalışıyor..."
+    )
+    timings = StageTimings()
+    job_start = time.perf_counter()
+    last_progress = {}
     try:
+        # API host'unun devresi açıksa iş hiç başlatılmadan başarısız sayılır.
+        api_host = urlsplit(API_URL).netloc
+        retry_in = circuit_breakers.get(api_host).retry_in()
+        if retry_in > 0:
+            raise CircuitOpenError(api_host, retry_in)
+        if SCRAPE_SHARDS > 0:
+            await _run_sharded_job(job_id, job_name, job_start)
+            return
         # Run the synchronous scraper job in a separate thread pool
-        scraper_result = await run_in_threadpool(run_scraper_job) # Dönen değeri al
-        
-        job_statuses[job_id].update({
-            "status": JOB_STATUS_COMPLETED,
-            "finished_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
-            "updated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
-            "details": scraper_result if scraper_result is not None else "İş başarıyla tamamlandı, ancak ek detay yok." # Sonucu details'e ata
-        })
-        logger.info(f"İş başarıyla tamamlandı: {job_name} (ID: {job_id})", extra={"component": "job_runner", "job_id": job_id, "job_name": job_name})
+        # İlerleme scraper thread'inden event loop'a aktarılarak SSE ile yayınlanır
+        def on_progress(progress):
+            last_progress.update(progress)
+            job_events.publish_threadsafe("progress", {"job_id": job_id, **progress})
+        scraper_result = await run_in_threadpool(run_scraper_job, on_progress, timings) # Dönen değeri al
+        # run_scraper_job hataları kendisi loglayıp özet döndürür; son ilerleme raporu gelmediyse, hiç sayfa
+        # alınamadıysa, başarısız sayfa veya yazılamayan kayıt varsa iş başarısız sayılır.
+        failure = run_failure(last_progress)
+        status = JOB_STATUS_FAILED if failure is not None else JOB_STATUS_COMPLETED
+
+        elapsed = time.perf_counter() - job_start
+        scrape_job_seconds.observe(elapsed, status=status)
+        scrape_jobs_total.inc(status=status)
+        await _save_job(
+            job_id,
+            status=status,
+            finished_at=datetime.datetime.now(datetime.timezone.utc),
+            details={
+                "summary": scraper_result if scraper_result is not None else "İş başarıyla tamamlandı, ancak ek detay yok.", # Sonucu details'e ata
+                "elapsed_seconds": round(elapsed, 3),
+                "stages": timings.as_dict(),
+            },
+            error=f"İş sırasında hata oluştu: {failure}" if failure is not None else None,
+        )
+        if failure is not None:
+            logger.error(f"İş hata ile sonlandı: {job_name} (ID: {job_id}). Hata: {failure}", extra={"component": "job_runner", "job_id": job_id, "job_name": job_name})
+        else:
+            logger.info(f"İş başarıyla tamamlandı: {job_name} (ID: {job_id})", extra={"component": "job_runner", "job_id": job_id, "job_name": job_name})
+        # Okuma tarafındaki snapshot arka planda yenilenir; sorgular eski snapshot ile devam eder.
+        # Başarısız işin yazabildiği kayıtlar da snapshot'a alınır.
+        campground_snapshot.schedule_rebuild()
     except Exception as e:
         error_message = f"İş sırasında hata oluştu: {str(e)}"
-        job_statuses[job_id].update({
-            "status": JOB_STATUS_FAILED,
-            "finished_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
-            "updated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
-            "details": "İş hata ile sonlandı.",
-            "error": error_message 
-        })
+        scrape_job_seconds.observe(time.perf_counter() - job_start, status=JOB_STATUS_FAILED)
+        scrape_jobs_total.inc(status=JOB_STATUS_FAILED)
+        await _save_job(
+            job_id,
+            status=JOB_STATUS_FAILED,
+            finished_at=datetime.datetime.now(datetime.timezone.utc),
+            details={"summary": "İş hata ile sonlandı.", "stages": timings.as_dict()},
+            error=error_message
+        )
         logger.error(f"İş hata ile sonlandı: {job_name} (ID: {job_id}). Hata: {error_message}", extra={"component": "job_runner", "job_id": job_id, "job_name": job_name}, exc_info=True)
 
+async def _enqueue_scheduled_job(job_id: str, job_name: str):
+    """
+    Zamanlanmış tetikleme: iş doğrudan çalıştırılmaz, koordinatör kuyruğuna eklenir.
+    """
+    now = datetime.datetime.now(datetime.timezone.utc)
+    try:
+        result = await job_coordinator.submit(job_id, job_name, priority=JOB_PRIORITY_SCHEDULED, triggered_at=now, details="Zamanlanmış iş tetiklendi, kuyrukta bekliyor.")
+    except JobQueueFull as e:
+        logger.warning(f"Zamanlanmış iş kuyruğa eklenemedi: {job_name} (ID: {job_id}) | {e}", extra={"component": "job_runner", "job_id": job_id})
+        return
+    if result["coalesced"] and result["job_id"] != job_id:
+        await _save_job(job_id, details=f"Kuyrukta bekleyen {result['job_id']} işiyle birleştirildi.")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("FastAPI uygulaması başlatılıyor.")
-    app.state.job_statuses = job_statuses # Global sözlüğü app state'e atayarak endpoint'lerden erişim
+    app.state.job_store = job_store
+    job_events.bind_loop(asyncio.get_running_loop())
+    # Şema her işte değil, uygulama başlangıcında bir kez hazırlanır.
+    # Veritabanı henüz hazır değilse ilk iş init_db'yi tekrar dener.
+    try:
+        await run_in_threadpool(init_db)
+    except Exception as e:
+        logger.error(f"Başlangıçta veritabanı şeması hazırlanamadı: {e}", extra={"component": "lifespan", "errtype": "DATABASE_ERROR"})
+    # /campgrounds/nearest için snapshot arka planda yüklenir; hazır olana kadar endpoint 503 döner.
+    campground_snapshot.schedule_rebuild()
+    # Manuel ve zamanlanmış tüm işler koordinatör üzerinden sıraya girer.
+    job_coordinator.start(_run_scraper_job_with_status, _save_job)
+    # Parçalı modda her uygulama kopyası kuyruktaki parçaları da çalıştırır.
+    shard_workers_stop = threading.Event()
+    if SCRAPE_SHARDS > 0 and SHARD_APP_WORKERS > 0:
+        start_worker_threads(SHARD_APP_WORKERS, shard_workers_stop)
+        logger.info(f"{SHARD_APP_WORKERS} parça worker'ı başlatıldı.", extra={"component": "lifespan"})
     scheduler = AsyncIOScheduler(timezone="Europe/Istanbul", executors={'default': AsyncIOExecutor()})
     
     # Başlangıçta çalışan kazıyıcı kaldırıldı.
     # Günlük cron görevi
     daily_job_id = "scheduled_daily_scraper_0300"
-    job_statuses[daily_job_id] = {
-        "status": JOB_STATUS_PENDING,
-        "job_name": "Günlük Scraper (03:00)",
+    daily_job_name = "Günlük Scraper (03:00)"
+    daily_job = await run_in_threadpool(job_store.get, daily_job_id)
+    daily_job_fields = {
+        "job_name": daily_job_name,
         "type": "scheduled",
         "schedule": "Her gün 03:00",
-        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
-        "updated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
-        "details": "Zamanlanmış görev oluşturuldu, tetiklenmeyi bekliyor."
     }
+    if daily_job is None or daily_job.get("status") != JOB_STATUS_RUNNING:
+        # Başka bir worker işi çalıştırıyor olabilir; o durumda durumu ezilmez.
+        daily_job_fields.update({
+            "status": JOB_STATUS_PENDING,
+            "details": "Zamanlanmış görev oluşturuldu, tetiklenmeyi bekliyor."
+        })
+    await _save_job(daily_job_id, **daily_job_fields)
     scheduler.add_job(
-        _run_scraper_job_with_status,
+        _enqueue_scheduled_job,
         CronTrigger(hour=3, minute=0, timezone="Europe/Istanbul"),
-        args=[daily_job_id, "Günlük Scraper (03:00)"],
+        args=[daily_job_id, daily_job_name],
         id=daily_job_id, # APScheduler için de aynı ID
         replace_existing=True
     )
-    logger.info(f"{job_statuses[daily_job_id]['job_name']} zamanlandı (ID: {daily_job_id}).")
+    logger.info(f"{daily_job_name} zamanlandı (ID: {daily_job_id}).")
     
     scheduler.start()
     app.state.scheduler = scheduler
@@ -97,77 +254,159 @@ async def lifespan(app: FastAPI):
     if hasattr(app.state, 'scheduler') and app.state.scheduler.running:
         app.state.scheduler.shutdown()
         logger.info("APScheduler durduruldu.")
+    await job_coordinator.stop()
+    # Çalışmakta olan parça yarıda kalırsa kirası dolunca başka bir worker'a verilir.
+    shard_workers_stop.set()
+    dispose_engine()
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # Statik dosyalar için mount
 app.mount("/static", StaticFiles(directory="static"), name="static")
+app.include_router(campgrounds_router)
+app.include_router(photos_router)
+app.include_router(dead_letters_router)
 
 @app.post("/scrape/start", status_code=202) 
-async def start_scraping_job_manual(background_tasks: BackgroundTasks):
+async def start_scraping_job_manual():
     """
-    Scraper işlemini manuel olarak arka planda başlatır ve bir iş ID'si döner.
+    Scraper işlemini iş kuyruğuna ekler ve bir iş ID'si döner. Kuyrukta bekleyen bir scraper işi
+    varsa yeni iş oluşturulmaz, bekleyen işin ID'si döner.
     """
     job_id = f"manual_scraper_{uuid.uuid4()}"
     job_name = "Manuel Scraper"
     logger.info(f"Manuel scraper başlatma isteği alındı. Atanan ID: {job_id}", extra={"component": "api", "function": "start_scraping_job_manual", "job_id": job_id})
     
-    app.state.job_statuses[job_id] = {
-        "status": JOB_STATUS_PENDING,
-        "job_name": job_name,
-        "type": "manual",
-        "triggered_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
-        "updated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
-        "details": "Manuel iş tetiklendi, başlaması bekleniyor."
-    }
-    
+    now = datetime.datetime.now(datetime.timezone.utc)
     try:
-        background_tasks.add_task(_run_scraper_job_with_status, job_id, job_name)
-        message = f"Scraper görevi başarıyla arka planda başlatıldı. İş ID: {job_id}"
-        logger.info(message, extra={"component": "api", "function": "start_scraping_job_manual", "job_id": job_id})
-        return {"message": message, "job_id": job_id}
-    except Exception as e:
-        error_message = f"Scraper görevi başlatılırken hata oluştu: {str(e)}"
-        # Bu aşamada hata olursa, job_statuses'a PENDING olarak eklenmiş olabilir, FAILED'a çekebiliriz.
-        app.state.job_statuses[job_id].update({
-            "status": JOB_STATUS_FAILED,
-            "updated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
-            "details": "İş başlatılamadı.",
-            "error": error_message
-        })
-        logger.error(error_message, extra={"component": "api", "function": "start_scraping_job_manual", "job_id": job_id, "errtype": "API_ERROR"}, exc_info=True)
-        # FastAPI'nin default exception handler'ı 500 dönecektir, ancak özel bir yanıt da oluşturulabilir.
-        # from fastapi import HTTPException
-        # raise HTTPException(status_code=500, detail=error_message)
-        # Şimdilik basit bir dönüş yapalım, FastAPI normal hata yönetimini yapsın.
-        return {"error": error_message, "job_id": job_id, "status_code": 500}
+        result = await job_coordinator.submit(
+            job_id,
+            job_name,
+            priority=JOB_PRIORITY_MANUAL,
+            type="manual",
+            created_at=now,
+            triggered_at=now,
+            details="Manuel iş tetiklendi, kuyrukta bekliyor."
+        )
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    if result["coalesced"]:
+        message = f"Kuyrukta zaten bekleyen bir scraper işi var; yeni iş oluşturulmadı. İş ID: {result['job_id']}"
+    else:
+        message = f"Scraper görevi kuyruğa eklendi (sıra: {result['position']}). İş ID: {job_id}"
+    logger.info(message, extra={"component": "api", "function": "start_scraping_job_manual", "job_id": result["job_id"]})
+    return {"message": message, **result}
+
+@app.get("/scrape/queue")
+async def get_job_queue():
+    """
+    Koordinatörde çalışan ve kuyrukta bekleyen işleri döndürür.
+    """
+    return job_coordinator.snapshot()
 
 @app.get("/scrape/status")
-async def get_all_job_statuses():
+async def get_all_job_statuses(
+    status: Optional[str] = Query(None, description="Yalnızca bu durumdaki işler (PENDING, RUNNING, COMPLETED, FAILED, SKIPPED)"),
+    since: Optional[datetime.datetime] = Query(None, description="Yalnızca bu zamandan sonra güncellenen işler"),
+    cursor: Optional[str] = Query(None, description="Önceki yanıttaki next_cursor değeri"),
+    limit: int = Query(50, ge=1, le=500),
+):
     """
-    Tüm scraper işlerinin mevcut durumlarını listeler.
+    Scraper işlerini en yeniden eskiye sayfalı olarak listeler.
+    Artımlı sorgulama için yanıttaki latest_updated_at değeri bir sonraki istekte since olarak gönderilebilir.
     """
-    # logger.info(f"Current job_statuses: {app.state.job_statuses}", extra={"component": "api", "function": "get_all_job_statuses"})
-    return app.state.job_statuses
+    try:
+        # Arayüz bu endpoint'i sık yokladığı için yanıt jsonable_encoder'a uğramadan serileştirilir.
+        return FastJSONResponse(await run_in_threadpool(app.state.job_store.list_jobs, status=status, since=since, cursor=cursor, limit=limit))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/scrape/events")
+async def stream_job_events(request: Request):
+    """
+    İş durum geçişlerini (`job`) ve çalışan işlerin ilerlemesini (`progress`) Server-Sent Events olarak akıtır.
+    Bağlantı açıldığında en son işler `snapshot` olayı ile bir kez gönderilir.
+    """
+    subscriber = job_events.subscribe()
+
+    async def event_stream():
+        try:
+            snapshot = await run_in_threadpool(app.state.job_store.list_jobs, limit=SSE_SNAPSHOT_SIZE)
+            yield "retry: 1000\n\n"
+            yield format_sse("snapshot", snapshot)
+            deadline = asyncio.get_running_loop().time() + SSE_MAX_STREAM_SECONDS
+            while True:
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    break
+                try:
+                    event = await asyncio.wait_for(subscriber.get(), timeout=min(SSE_KEEPALIVE_INTERVAL, remaining))
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    # Proxy'lerin bağlantıyı boşta sayıp kapatmaması için yorum satırı gönderilir
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(event["event"], event["data"], event["id"])
+        finally:
+            job_events.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @app.get("/scrape/status/{job_id}")
 async def get_job_status(job_id: str):
     """
     Belirli bir scraper işinin durumunu ID ile sorgular.
     """
-    if job_id in app.state.job_statuses:
-        return app.state.job_statuses[job_id]
+    job = await run_in_threadpool(app.state.job_store.get, job_id)
+    if job is not None:
+        return FastJSONResponse(job)
     else:
-        from fastapi import HTTPException
         raise HTTPException(status_code=404, detail=f"İş ID'si bulunamadı: {job_id}")
 
+@app.get("/scrape/status/{job_id}/shards")
+async def get_job_shards(job_id: str):
+    """
+    Parçalı bir işin parçalarını (bbox, durum, deneme, worker, sonuç) listeler.
+    """
+    shards = await run_in_threadpool(shard_queue.list_shards, job_id)
+    if not shards:
+        raise HTTPException(status_code=404, detail=f"İşe ait parça bulunamadı: {job_id}")
+    return {"job_id": job_id, "items": shards}
+
+@app.get("/scrape/status/{job_id}/logs")
+async def get_job_logs(
+    job_id: str,
+    level: Optional[str] = Query(None, pattern="^(DEBUG|INFO|WARNING|ERROR|CRITICAL)$", description="Bu seviyenin altındaki kayıtlar atlanır"),
+    limit: Optional[int] = Query(None, ge=1, description="Döndürülecek azami satır sayısı"),
+):
+    """
+    İşin log kayıtlarını eskiden yeniye NDJSON (satır başına bir JSON kaydı) olarak akıtır. Arşivlenmiş
+    kayıtlar logs/archive/index.jsonl dizininden bulunan sıkıştırılmış bloklardan, güncel kayıtlar app.log'dan okunur.
+    """
+    job = await run_in_threadpool(app.state.job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"İş ID'si bulunamadı: {job_id}")
+    lines = log_archive.iter_job_lines(job_id, min_level=level)
+    if limit is not None:
+        lines = itertools.islice(lines, limit)
+    # Senkron üreteç StreamingResponse tarafından thread havuzunda tüketilir; dosya okuma event loop'u bekletmez.
+    return StreamingResponse((line + "\n" for line in lines), media_type="application/x-ndjson")
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Süreç içi metrikleri Prometheus metin formatında döndürür.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.get("/", response_class=FileResponse) 
 async def read_root():
     return FileResponse("static/index.html")
-    # logger.info("Tüm iş durumları sorgulandı.") # Loglama isteğe bağlı
-    if not hasattr(app.state, 'job_statuses') or not app.state.job_statuses:
-        return {}
-    return app.state.job_statuses
 
 # if __name__ == "__main__":
     # uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,223 @@
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+# Saniye cinsinden varsayılan histogram aralıkları (HTTP isteği ile tüm iş arasını kapsar)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(label_names, label_values, extra=()):
+    pairs = list(zip(label_names, label_values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in pairs) + "}"
+
+
+def _format_number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict):
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} için beklenen etiketler: {self.label_names}, verilen: {tuple(labels)}")
+        return tuple(labels[name] for name in self.label_names)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            lines.extend(self._render_value(label_values, value))
+        return lines
+
+    def _render_value(self, label_values, value):
+        return [f"{self.name}{_format_labels(self.label_names, label_values)} {_format_number(value)}"]
+
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    metric_type = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for position, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][position] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Bloğun süresini (hata ile çıkılsa bile) histogram'a ekler.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _render_value(self, label_values, state):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, state["counts"]):
+            cumulative += count
+            lines.append(f"{self.name}_bucket{_format_labels(self.label_names, label_values, [('le', _format_number(bound))])} {cumulative}")
+        lines.append(f"{self.name}_bucket{_format_labels(self.label_names, label_values, [('le', '+Inf')])} {state['count']}")
+        lines.append(f"{self.name}_sum{_format_labels(self.label_names, label_values)} {_format_number(state['sum'])}")
+        lines.append(f"{self.name}_count{_format_labels(self.label_names, label_values)} {state['count']}")
+        return lines
+
+
+def timed(histogram: Histogram, **labels):
+    """
+    Fonksiyonun her çağrısının süresini `histogram`'a ekleyen dekoratör.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with histogram.time(**labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class MetricsRegistry:
+    """
+    Süreç içi metrik kaydı; `render` Prometheus metin formatını üretir.
+    Metrikler süreç başınadır: doğrulama havuzundaki alt süreçlerin ölçümleri buraya yansımaz.
+    """
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metrik zaten kayıtlı: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, label_names=()):
+        return self._register(Counter(name, documentation, label_names))
+
+    def gauge(self, name, documentation, label_names=()):
+        return self._register(Gauge(name, documentation, label_names))
+
+    def histogram(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, label_names, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class StageTimings:
+    """
+    Bir scraper işinin aşama bazında toplam süreleri. Farklı thread'lerden (tarama thread'i,
+    iş thread'i) güvenle güncellenir; eşzamanlı HTTP istekleri toplandığından aşama süreleri
+    toplamı işin duvar saati süresini aşabilir.
+    """
+    def __init__(self):
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float, count: int = 1):
+        with self._lock:
+            total = self._stages.setdefault(stage, [0.0, 0])
+            total[0] += seconds
+            total[1] += count
+        scrape_stage_seconds.inc(seconds, stage=stage)
+
+    @contextmanager
+    def time(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def track(self, iterable, stage: str):
+        """
+        `iterable`'dan her öğeyi beklerken geçen süreyi `stage` olarak kaydeder.
+        """
+        iterator = iter(iterable)
+        seconds = 0.0
+        count = 0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    seconds += time.perf_counter() - start
+                    return
+                seconds += time.perf_counter() - start
+                count += 1
+                yield item
+        finally:
+            self.add(stage, seconds, count)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {stage: {"seconds": round(seconds, 4), "count": count} for stage, (seconds, count) in self._stages.items()}
+
+
+registry = MetricsRegistry()
+
+http_request_seconds = registry.histogram("scraper_http_request_seconds", "Kaynak API'ye yapılan HTTP isteklerinin süresi.", ("client",))
+http_requests_total = registry.counter("scraper_http_requests_total", "Kaynak API'ye yapılan HTTP istekleri.", ("client", "status"))
+validation_seconds = registry.histogram("scraper_validation_seconds", "Campground.validate_api_data çağrılarının süresi.", buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1))
+validations_total = registry.counter("scraper_validations_total", "Doğrulanan kamp alanı kayıtları.", ("result",))
+db_write_seconds = registry.histogram("scraper_db_write_seconds", "Veritabanı yazma işlemlerinin süresi.", ("operation",))
+db_rows_written_total = registry.counter("scraper_db_rows_written_total", "Veritabanına yazılan kamp alanı satırları.", ("operation",))
+scrape_job_seconds = registry.histogram("scraper_job_seconds", "Scraper işlerinin toplam süresi.", ("status",))
+scrape_jobs_total = registry.counter("scraper_jobs_total", "Sonuçlanan scraper işleri.", ("status",))
+scrape_stage_seconds = registry.counter("scraper_stage_seconds_total", "Scraper aşamalarında harcanan toplam süre.", ("stage",))
@@ -1,8 +1,12 @@
 from datetime import datetime
+import hashlib
 from typing import List, Optional
 from pydantic import BaseModel, Field, ValidationError, HttpUrl
 import logging
 
+from src.metrics import timed, validation_seconds, validations_total
+from src.serialization import dumps_bytes
+
 class CampgroundLinks(BaseModel):
     self: HttpUrl
 
@@ -31,6 +35,7 @@ class Campground(BaseModel):
     availability_updated_at: Optional[datetime] = Field(None, alias="availability-updated-at")
 
     @classmethod
+    @timed(validation_seconds)
     def validate_api_data(cls, raw_data: dict):
         # Preprocessing: Ensure 'links' field is valid
         if "links" in raw_data and isinstance(raw_data["links"], dict):
@@ -51,8 +56,16 @@ class Campground(BaseModel):
                 raw_data[field] = default_value
         try:
             validated_data = cls(**raw_data)
+            validations_total.inc(result="valid")
             return validated_data
         except ValidationError as e:
+            validations_total.inc(result="invalid")
             logger = logging.getLogger(__name__)
             logger.warning(f"Validation failed for data: {raw_data} | Errors: {e.errors()}")
             raise e
+
+# Doğrulama mantığının sürümü; validate_api_data'daki ön işleme değiştiğinde elle artırılır.
+CAMPGROUND_MODEL_REVISION = 1
+# dead_letters kayıtlarına yazılan model sürümü: revizyon + şema özeti. Alan/tip değişiklikleri sürümü
+# kendiliğinden değiştirir; böylece eski sürümle reddedilmiş kayıtlar ayırt edilebilir.
+CAMPGROUND_MODEL_VERSION = f"{CAMPGROUND_MODEL_REVISION}.{hashlib.sha256(dumps_bytes(Campground.model_json_schema(), sort_keys=True)).hexdigest()[:8]}"
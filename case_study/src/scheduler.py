@@ -1,8 +1,8 @@
 from apscheduler.schedulers.background import BackgroundScheduler
-from src.scraper import run_scraper_job
+from src.scraper.scheduler import run_scheduled_job
 
 def start_scheduler():
     scheduler = BackgroundScheduler()
-    scheduler.add_job(run_scraper_job, 'interval', minutes=2)
+    scheduler.add_job(run_scheduled_job, 'interval', minutes=2, max_instances=1, coalesce=True)
     scheduler.start()
     return scheduler
@@ -0,0 +1,567 @@
+import asyncio
+import contextlib
+import contextvars
+import datetime
+import math
+import queue as thread_queue
+import threading
+import time
+from dataclasses import dataclass
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import httpx
+
+from src.config import (
+    API_URL,
+    CRAWL_BBOX,
+    CRAWL_PAGE_SIZE,
+    CRAWL_MAX_PAGES_PER_TILE,
+    CRAWL_MAX_TILE_DEPTH,
+    CRAWL_MAX_CONCURRENCY,
+    CRAWL_RATE_LIMIT_PER_HOST,
+    CRAWL_HTTP_TIMEOUT,
+    CRAWL_MAX_RETRIES,
+    CRAWL_STREAMING,
+    CRAWL_RETRY_DEADLINE,
+    CRAWL_INCREMENTAL_SORT,
+)
+from src.logger import logger
+from src.metrics import http_request_seconds, http_requests_total
+from src.scraper.http_client import create_async_client, get_default_cache
+from src.scraper.stream import JsonItemStream
+from src.utils.circuit_breaker import CircuitOpenError, circuit_breakers
+from src.utils.utils import retry_operation_async
+
+BBOX_PARAM = "filter[search][bbox]"
+PAGE_NUMBER_PARAM = "page[number]"
+PAGE_SIZE_PARAM = "page[size]"
+SORT_PARAM = "sort"
+UPDATED_AT_ATTRIBUTE = "availability-updated-at"
+
+# Üretici görevin bittiğini tüketiciye bildiren işaret
+_DONE = object()
+# CrawlEngine(cache=None) ile önbelleği kapatmayı varsayılandan ayırmak için
+_DEFAULT_CACHE = object()
+
+
+@dataclass(frozen=True)
+class Tile:
+    """
+    Arama API'sine gönderilen bbox (min_lon, min_lat, max_lon, max_lat) karosu.
+    """
+    min_lon: float
+    min_lat: float
+    max_lon: float
+    max_lat: float
+    depth: int = 0
+
+    @classmethod
+    def from_string(cls, value: str, depth: int = 0):
+        min_lon, min_lat, max_lon, max_lat = (float(part) for part in value.split(","))
+        return cls(min_lon, min_lat, max_lon, max_lat, depth)
+
+    def to_param(self) -> str:
+        return ",".join(f"{value:.6f}".rstrip("0").rstrip(".") for value in (self.min_lon, self.min_lat, self.max_lon, self.max_lat))
+
+    def split(self):
+        mid_lon = (self.min_lon + self.max_lon) / 2
+        mid_lat = (self.min_lat + self.max_lat) / 2
+        depth = self.depth + 1
+        return [
+            Tile(self.min_lon, self.min_lat, mid_lon, mid_lat, depth),
+            Tile(mid_lon, self.min_lat, self.max_lon, mid_lat, depth),
+            Tile(self.min_lon, mid_lat, mid_lon, self.max_lat, depth),
+            Tile(mid_lon, mid_lat, self.max_lon, self.max_lat, depth),
+        ]
+
+
+def shard_bboxes(bboxes, shards: int):
+    """
+    bbox'ları, sayısı en az `shards` olana kadar en geniş olanı boylamda ikiye bölerek çoğaltır.
+    """
+    tiles = [Tile.from_string(bbox) for bbox in bboxes]
+    while len(tiles) < shards:
+        widest = max(tiles, key=lambda tile: tile.max_lon - tile.min_lon)
+        tiles.remove(widest)
+        mid_lon = (widest.min_lon + widest.max_lon) / 2
+        tiles.append(Tile(widest.min_lon, widest.min_lat, mid_lon, widest.max_lat))
+        tiles.append(Tile(mid_lon, widest.min_lat, widest.max_lon, widest.max_lat))
+    return [tile.to_param() for tile in tiles]
+
+
+def empty_crawl_stats() -> dict:
+    """
+    Tarama kaynaklarının (CrawlEngine, ResponseReplay) run_scraper_job'a sunduğu sayaçlar.
+    """
+    return {
+        "total_count": None,
+        "tiles": 0,
+        "split_tiles": 0,
+        "truncated_tiles": 0,
+        "pages": 0,
+        "failed_pages": 0,
+        "not_modified_pages": 0,
+        "not_modified_items": 0,
+        "locations": 0,
+        "duplicates": 0,
+        "incremental_tiles": 0,
+        "incremental_fallbacks": 0,
+    }
+
+
+def parse_updated_at(value):
+    """
+    API'deki availability-updated-at metnini UTC datetime'a çevirir; boş veya geçersizse None.
+    """
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed.astimezone(datetime.timezone.utc)
+
+
+class TileScan:
+    """
+    Bir karonun taraması boyunca görülen en yeni availability-updated-at değerini izler.
+
+    `watermark` verilirse (artımlı tarama) bundan yeni olmayan konumlar atlanır ve `behind` işaretlenir;
+    sonuçların yeniden eskiye sıralı gelmediği fark edilirse `out_of_order` işaretlenir.
+    Bir sayfa alınamaz veya karo kırpılırsa `complete` False olur ve watermark ilerletilmez.
+    """
+    def __init__(self, watermark=None):
+        self.watermark = watermark
+        self.max_updated_at = None
+        self.complete = True
+        self.behind = False
+        self.out_of_order = False
+        self._last_updated_at = None
+
+    def accept(self, location: dict) -> bool:
+        updated_at = parse_updated_at((location.get("attributes") or {}).get(UPDATED_AT_ATTRIBUTE))
+        if updated_at is None:
+            return True
+        if self.max_updated_at is None or updated_at > self.max_updated_at:
+            self.max_updated_at = updated_at
+        if self.watermark is None:
+            return True
+        if self._last_updated_at is not None and updated_at > self._last_updated_at:
+            self.out_of_order = True
+        self._last_updated_at = updated_at
+        # Watermark'la aynı zamanlı kayıtlar önceki çalışmada görülmüştür; aynı anda güncellenip
+        # o çalışmadan sonra listeye girenler tam uzlaştırmada yakalanır.
+        if updated_at <= self.watermark:
+            self.behind = True
+            return False
+        return True
+
+    def merge(self, other):
+        if other.max_updated_at is not None and (self.max_updated_at is None or other.max_updated_at > self.max_updated_at):
+            self.max_updated_at = other.max_updated_at
+        self.complete = self.complete and other.complete
+
+
+class HostRateLimiter:
+    """
+    Host başına saniyede en fazla `rate` istek geçirir. İstekler eşit aralıklı zaman
+    dilimlerine yerleştirilir; bekleme asyncio.sleep ile yapıldığı için event loop bloklanmaz.
+    """
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = {}
+
+    async def acquire(self, host: str):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        slot = max(now, self._next_slot.get(host, now))
+        self._next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class CrawlEngine:
+    """
+    Yapılandırılan bbox'ı karolara bölerek arama sonuçlarının tüm sayfalarını eşzamanlı çeker.
+
+    total_count değeri sayfalanabilir üst sınırı (page_size * max_pages_per_tile) aşan karolar
+    dört alt karoya bölünür. Bulunan konumlar id'ye göre tekilleştirilir ve sınırlı bir kuyruk
+    üzerinden `iter_locations` ile akıtılır; tüketici yavaşladığında indirme de yavaşlar.
+
+    `incremental` açıkken `watermarks` (karo bbox'ı -> datetime) içinde watermark'ı olan karolar
+    `incremental_sort` ile yeniden eskiye sıralı olarak sırayla sayfalanır ve watermark'tan eski
+    sonuçlara ulaşılınca durulur. Eksiksiz taranan karoların yeni watermark'ları `new_watermarks`'ta toplanır.
+
+    Alınan sayfaların ETag/Last-Modified doğrulayıcıları önbelleğe hemen yazılmaz; çağıran, sayfaların
+    kayıtları veritabanına yazıldıktan sonra `commit_cache` ile kaydeder. Aksi halde yazılamayan kayıtların
+    sayfası sonraki çalışmada 304 döner ve kayıtlar yeniden görülmez.
+    """
+    def __init__(
+        self,
+        base_url: str = API_URL,
+        bbox: str = CRAWL_BBOX,
+        page_size: int = CRAWL_PAGE_SIZE,
+        max_pages_per_tile: int = CRAWL_MAX_PAGES_PER_TILE,
+        max_depth: int = CRAWL_MAX_TILE_DEPTH,
+        max_concurrency: int = CRAWL_MAX_CONCURRENCY,
+        rate_limit_per_host: float = CRAWL_RATE_LIMIT_PER_HOST,
+        timeout: float = CRAWL_HTTP_TIMEOUT,
+        max_retries: int = CRAWL_MAX_RETRIES,
+        queue_size: int = 1000,
+        streaming: bool = CRAWL_STREAMING,
+        cache=_DEFAULT_CACHE,
+        timings=None,
+        watermarks=None,
+        incremental: bool = False,
+        incremental_sort: str = CRAWL_INCREMENTAL_SORT,
+    ):
+        parts = urlsplit(base_url)
+        params = parse_qsl(parts.query, keep_blank_values=True)
+        self._base_url = urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+        self._host = parts.netloc
+        self._base_params = [(key, value) for key, value in params if key not in (BBOX_PARAM, PAGE_NUMBER_PARAM, PAGE_SIZE_PARAM)]
+        bbox = bbox or dict(params).get(BBOX_PARAM)
+        if not bbox:
+            raise ValueError("Tarama için bbox bulunamadı: CRAWL_BBOX veya API_URL içinde filter[search][bbox] tanımlanmalı.")
+        self.root_tile = Tile.from_string(bbox)
+        self.page_size = page_size
+        self.tile_result_cap = page_size * max_pages_per_tile
+        self.max_depth = max_depth
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.queue_size = queue_size
+        self.streaming = streaming
+        self.cache = get_default_cache() if cache is _DEFAULT_CACHE else cache
+        # commit_cache çağrılana kadar bekleyen önbellek girdileri: (url, doğrulayıcı başlıklar, meta, öğe sayısı)
+        self._pending_cache = []
+        # StageTimings verilirse istek, JSON çözümleme ve kuyruk bekleme süreleri aşama olarak kaydedilir
+        self.timings = timings
+        self.watermarks = dict(watermarks or {})
+        self.new_watermarks = {}
+        self.incremental = incremental
+        self.incremental_sort = incremental_sort
+        self._rate_limiter = HostRateLimiter(rate_limit_per_host)
+        self._semaphore = None
+        self._seen_ids = set()
+        self.stats = empty_crawl_stats()
+
+    @property
+    def seen_ids(self):
+        """
+        Bu taramada API'den gelen (watermark'tan eski olup atlananlar hariç) tüm konum id'leri.
+        """
+        return self._seen_ids
+
+    def commit_cache(self) -> int:
+        """
+        Bu taramada alınan sayfaların doğrulayıcılarını önbelleğe yazar; yazılan girdi sayısını döndürür.
+        Yalnızca sayfaların tüm kayıtları veritabanına yazıldıktan sonra çağrılmalıdır.
+        """
+        pending, self._pending_cache = self._pending_cache, []
+        if not self.cache:
+            return 0
+        for url, validators, meta, item_count in pending:
+            self.cache.store(url, validators, meta=meta, item_count=item_count)
+        return len(pending)
+
+    def build_url(self, tile: Tile, page_number: int, sort: str = None) -> str:
+        params = self._base_params
+        if sort is not None:
+            params = [(key, value) for key, value in params if key != SORT_PARAM] + [(SORT_PARAM, sort)]
+        params = params + [
+            (BBOX_PARAM, tile.to_param()),
+            (PAGE_NUMBER_PARAM, str(page_number)),
+            (PAGE_SIZE_PARAM, str(self.page_size)),
+        ]
+        return f"{self._base_url}?{urlencode(params)}"
+
+    async def iter_locations(self):
+        """
+        Taranan konumları (JSON:API `data[]` öğeleri) geldikçe üreten async generator.
+        """
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with create_async_client(self.max_concurrency, self.timeout) as client:
+            producer = asyncio.create_task(self._crawl_all(client, queue))
+            try:
+                while True:
+                    item = await queue.get()
+                    if item is _DONE:
+                        break
+                    yield item
+                await producer
+            finally:
+                if not producer.done():
+                    producer.cancel()
+                    with contextlib.suppress(asyncio.CancelledError):
+                        await producer
+
+    def iter_locations_sync(self):
+        """
+        Taramayı ayrı bir thread'deki event loop'ta çalıştırır ve konumları senkron olarak üretir.
+        Böylece indirme, çağıranın doğrulama/yazma adımlarıyla eşzamanlı ilerler; aradaki
+        kuyruk sınırlı olduğu için bellek kullanımı queue_size ile sınırlı kalır.
+        """
+        items = thread_queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+
+        async def pump():
+            async for location in self.iter_locations():
+                while True:
+                    if stop.is_set():
+                        return
+                    try:
+                        items.put_nowait(location)
+                        break
+                    except thread_queue.Full:
+                        await asyncio.sleep(0.01)
+
+        def worker():
+            try:
+                asyncio.run(pump())
+                items.put((_DONE, None))
+            except BaseException as e:
+                items.put((_DONE, e))
+
+        # Çağıranın bağlamı (log kayıtlarındaki job_id) motor thread'ine taşınır.
+        thread = threading.Thread(target=contextvars.copy_context().run, args=(worker,), name="crawl-engine", daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = items.get()
+                if isinstance(item, tuple) and item and item[0] is _DONE:
+                    if item[1] is not None:
+                        raise item[1]
+                    break
+                yield item
+        finally:
+            stop.set()
+            # Worker'ın bekleyen put çağrısında takılı kalmaması için kuyruk boşaltılır.
+            while thread.is_alive():
+                try:
+                    items.get(timeout=0.1)
+                except thread_queue.Empty:
+                    pass
+            thread.join()
+
+    async def _crawl_all(self, client, queue):
+        # İptal (CancelledError) durumunda tüketici zaten ayrılmıştır; işaret yalnızca
+        # normal bitişte ve hatada gönderilir.
+        try:
+            await self._crawl_tile(client, self.root_tile, queue)
+        except Exception:
+            await queue.put(_DONE)
+            raise
+        await queue.put(_DONE)
+
+    async def _crawl_tile(self, client, tile: Tile, queue):
+        self.stats["tiles"] += 1
+        key = tile.to_param()
+        watermark = self.watermarks.get(key) if self.incremental else None
+        scan = None
+        if watermark is not None:
+            scan = await self._crawl_tile_incremental(client, tile, queue, watermark)
+        if scan is None:
+            scan = TileScan()
+            await self._crawl_tile_full(client, tile, queue, scan)
+        self._advance_watermark(key, scan)
+        return scan
+
+    def _advance_watermark(self, key: str, scan: TileScan):
+        if not scan.complete or scan.max_updated_at is None:
+            return
+        current = self.watermarks.get(key)
+        if current is None or scan.max_updated_at > current:
+            self.watermarks[key] = scan.max_updated_at
+            self.new_watermarks[key] = scan.max_updated_at
+
+    async def _split_tile(self, client, tile: Tile, queue, scan: TileScan):
+        for sub_scan in await asyncio.gather(*(self._crawl_tile(client, sub_tile, queue) for sub_tile in tile.split())):
+            scan.merge(sub_scan)
+
+    async def _crawl_tile_incremental(self, client, tile: Tile, queue, watermark):
+        """
+        Karoyu yeniden eskiye sıralı olarak sayfa sayfa tarar ve watermark'a ulaşınca durur.
+        Sonuçlar sıralı gelmiyorsa (API sıralamayı desteklemiyor) None döner; karo tam taranmalıdır.
+        """
+        self.stats["incremental_tiles"] += 1
+        scan = TileScan(watermark)
+        for page_number in range(1, self.tile_result_cap // self.page_size + 1):
+            page = await self._fetch_page(client, tile, page_number, queue, scan=scan, sort=self.incremental_sort)
+            if page is None:
+                return scan
+            if page_number == 1 and tile is self.root_tile:
+                self.stats["total_count"] = page["meta"].get("total_count")
+            if scan.out_of_order:
+                self.stats["incremental_fallbacks"] += 1
+                logger.warning(f"Sonuçlar {self.incremental_sort} sırasında gelmiyor, karo tam taranıyor ({tile.to_param()}).", extra={"component": "crawler", "function": "_crawl_tile_incremental"})
+                return None
+            # 304: sıralamanın başı, kayıtları yazılmış son çalışmadakiyle aynı (commit_cache), yani yeni güncelleme yok.
+            if page.get("not_modified") or scan.behind or page["item_count"] < self.page_size:
+                return scan
+        # Watermark'tan sonra sayfalanabilir sınırdan fazla kayıt güncellenmiş.
+        if tile.depth < self.max_depth:
+            self.stats["split_tiles"] += 1
+            logger.info(f"Karo bölünüyor ({tile.to_param()}): watermark'tan sonra {self.tile_result_cap} sonuçtan fazla güncelleme var", extra={"component": "crawler", "function": "_crawl_tile_incremental"})
+            await self._split_tile(client, tile, queue, scan)
+            return scan
+        self.stats["truncated_tiles"] += 1
+        scan.complete = False
+        return scan
+
+    async def _crawl_tile_full(self, client, tile: Tile, queue, scan: TileScan):
+        first_page = await self._fetch_page(client, tile, 1, queue, check_split=True, scan=scan)
+        if first_page is None:
+            return
+        total_count = first_page["meta"].get("total_count")
+        if tile is self.root_tile:
+            self.stats["total_count"] = total_count
+        if total_count is None:
+            # total_count yoksa kısa bir sayfa gelene kadar sırayla sayfalanır.
+            page_number, item_count = 1, first_page["item_count"]
+            while item_count >= self.page_size and page_number < self.tile_result_cap // self.page_size:
+                page_number += 1
+                page = await self._fetch_page(client, tile, page_number, queue, scan=scan)
+                if page is None:
+                    return
+                item_count = page["item_count"]
+            return
+        if total_count > self.tile_result_cap:
+            if tile.depth < self.max_depth:
+                self.stats["split_tiles"] += 1
+                logger.info(f"Karo bölünüyor ({tile.to_param()}): {total_count} sonuç > {self.tile_result_cap}", extra={"component": "crawler", "function": "_crawl_tile"})
+                await self._split_tile(client, tile, queue, scan)
+                return
+            self.stats["truncated_tiles"] += 1
+            scan.complete = False
+            logger.warning(f"Azami karo derinliğine ulaşıldı, sonuçlar kırpılıyor ({tile.to_param()}): {total_count} sonuç", extra={"component": "crawler", "function": "_crawl_tile"})
+            total_count = self.tile_result_cap
+        page_count = math.ceil(total_count / self.page_size)
+        await asyncio.gather(*(self._fetch_page(client, tile, page_number, queue, scan=scan) for page_number in range(2, page_count + 1)))
+
+    def _needs_split(self, tile: Tile, meta) -> bool:
+        if not isinstance(meta, dict) or meta.get("total_count") is None:
+            return False
+        return meta["total_count"] > self.tile_result_cap and tile.depth < self.max_depth
+
+    async def _fetch_page(self, client, tile: Tile, page_number: int, queue, check_split: bool = False, scan: TileScan = None, sort: str = None):
+        """
+        Bir sayfayı indirir ve içindeki konumları kuyruğa aktarır; sayfanın `meta` bilgisini ve
+        öğe sayısını döndürür. Sayfa tüm denemelere rağmen alınamazsa None döner.
+        """
+        url = self.build_url(tile, page_number, sort)
+
+        async def op():
+            async with self._semaphore:
+                await self._rate_limiter.acquire(self._host)
+                headers = self.cache.conditional_headers(url) if self.cache else {}
+                start = time.perf_counter()
+                spent = {"json_parse": 0.0, "crawl_backpressure": 0.0}
+                status = "error"
+                try:
+                    async with client.stream("GET", url, headers=headers) as response:
+                        status = response.status_code
+                        if response.status_code == 304:
+                            return self._not_modified_page(url)
+                        response.raise_for_status()
+                        if not self.streaming:
+                            await response.aread()
+                            parse_start = time.perf_counter()
+                            page_body = response.json()
+                            spent["json_parse"] += time.perf_counter() - parse_start
+                            locations = page_body.get("data", [])
+                            for location in locations:
+                                await self._emit(location, queue, spent, scan)
+                            page = {"meta": page_body.get("meta") or {}, "item_count": len(locations)}
+                        else:
+                            page = await self._stream_page(response, tile, queue, check_split, spent, scan)
+                        if self.cache:
+                            validators = {name: response.headers[name] for name in ("ETag", "Last-Modified") if name in response.headers}
+                            if validators:
+                                self._pending_cache.append((url, validators, page["meta"], page["item_count"]))
+                        return page
+                finally:
+                    self._record_request(time.perf_counter() - start, status, spent)
+
+        try:
+            page = await retry_operation_async(
+                op,
+                max_retries=self.max_retries,
+                initial_wait=1,
+                backoff_factor=2,
+                exception_types=(httpx.HTTPError, ValueError),
+                context=f"HTTP GET {url}",
+                deadline=CRAWL_RETRY_DEADLINE,
+                circuit_breaker=circuit_breakers.get(self._host),
+            )
+        except (httpx.HTTPError, ValueError, CircuitOpenError) as e:
+            self.stats["failed_pages"] += 1
+            if scan is not None:
+                scan.complete = False
+            logger.error(f"Sayfa alınamadı, atlanıyor: {url} | {type(e).__name__}: {e}", extra={"component": "crawler", "function": "_fetch_page", "errtype": "HTTP_ERROR"})
+            return None
+        self.stats["pages"] += 1
+        return page
+
+    def _record_request(self, elapsed: float, status, spent: dict):
+        http_request_seconds.observe(elapsed, client="crawler")
+        http_requests_total.inc(client="crawler", status=str(status))
+        if self.timings is None:
+            return
+        # "http" yalnızca ağda geçen süreyi gösterir; çözümleme ve kuyruk beklemesi ayrı aşamalardır.
+        self.timings.add("http", elapsed - spent["json_parse"] - spent["crawl_backpressure"])
+        for stage, seconds in spent.items():
+            if seconds:
+                self.timings.add(stage, seconds)
+
+    async def _stream_page(self, response, tile: Tile, queue, check_split: bool, spent: dict, scan: TileScan = None):
+        parser = JsonItemStream("data")
+        async for chunk in response.aiter_bytes():
+            parse_start = time.perf_counter()
+            locations = parser.feed(chunk)
+            spent["json_parse"] += time.perf_counter() - parse_start
+            for location in locations:
+                await self._emit(location, queue, spent, scan)
+            if check_split and parser.items_seen == 0 and self._needs_split(tile, parser.extras.get("meta")):
+                # meta, data'dan önce geldiyse bölünecek karonun gövdesinin geri kalanı okunmaz.
+                return {"meta": parser.extras["meta"], "item_count": 0}
+        parse_start = time.perf_counter()
+        locations = parser.close()
+        spent["json_parse"] += time.perf_counter() - parse_start
+        for location in locations:
+            await self._emit(location, queue, spent, scan)
+        return {"meta": parser.extras.get("meta") or {}, "item_count": parser.items_seen}
+
+    def _not_modified_page(self, url: str):
+        """
+        304 yanıtında sayfa işlenmez; sayfalama için önbellekteki meta bilgisi kullanılır.
+        """
+        entry = self.cache.get(url) if self.cache else None
+        entry = entry or {}
+        item_count = entry.get("item_count") or 0
+        self.stats["not_modified_pages"] += 1
+        self.stats["not_modified_items"] += item_count
+        return {"meta": entry.get("meta") or {}, "item_count": item_count, "not_modified": True}
+
+    async def _emit(self, location: dict, queue, spent=None, scan: TileScan = None):
+        if scan is not None and not scan.accept(location):
+            # Artımlı taramada watermark'tan eski konum: önceki çalışmalarda işlenmiş.
+            return
+        location_id = location.get("id")
+        if location_id in self._seen_ids:
+            # Karo sınırındaki konumlar (veya yeniden denenen sayfalar) birden fazla kez gelebilir.
+            self.stats["duplicates"] += 1
+            return
+        self._seen_ids.add(location_id)
+        self.stats["locations"] += 1
+        if spent is not None and queue.full():
+            # Tüketici (doğrulama/yazma) geride kaldığında indirme burada bekler.
+            wait_start = time.perf_counter()
+            await queue.put(location)
+            spent["crawl_backpressure"] += time.perf_counter() - wait_start
+            return
+        await queue.put(location)
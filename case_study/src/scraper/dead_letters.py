@@ -0,0 +1,160 @@
+"""
+Reddedilen kamp alanı kayıtlarının toplanması ve yeniden oynatılması.
+
+DeadLetterCollector bir scraper çalışmasında doğrulamada veya yazmada reddedilen kayıtları ham verileriyle
+dead_letters tablosuna yazar; daha önce reddedilmiş bir kamp alanı başarıyla yazılınca kaydını siler.
+replay_dead_letters, model veya ayrıştırıcı düzeltmesinden sonra saklanan ham verileri tam tarama yapmadan
+yeniden doğrular ve partiler halinde yazar.
+"""
+import datetime
+
+from sqlalchemy import select
+
+from src.config import DEAD_LETTER_REPLAY_BATCH_SIZE
+from src.db.dead_letters import (
+    DEAD_LETTER_STAGE_VALIDATE,
+    DEAD_LETTER_STAGE_WRITE,
+    count_dead_letters,
+    dead_letter_row,
+    iter_dead_letter_batches,
+    load_dead_letter_ids,
+    resolve_dead_letters,
+    save_dead_letters,
+)
+from src.db.db import bulk_upsert_rows
+from src.db.models import CampgroundORM
+from src.db.observations import append_observations, build_observations, load_observed_values
+from src.logger import logger
+from src.metrics import registry
+from src.scraper.validation import validate_chunk
+from src.utils.utils import content_hash
+
+dead_letter_replays_total = registry.counter("scraper_dead_letter_replays_total", "Yeniden oynatılan dead-letter kayıtları.", ("result",))
+
+
+class DeadLetterCollector:
+    """
+    Bir scraper çalışmasında reddedilen kayıtları toplayıp her parti sonunda dead_letters tablosuna yazar.
+
+    Yazma hatasında ham veriye ulaşabilmek için doğrulamaya giren (değişmiş) kayıtların ham verisi, partisi
+    yazılana kadar tutulur; bellekte en fazla boru hattındaki kayıtlar kadar veri bulunur.
+    """
+    def __init__(self, session, job_id=None):
+        self.session = session
+        self.job_id = job_id
+        self.known_ids = load_dead_letter_ids(session)
+        self.stats = {"saved": 0, "resolved": 0}
+        self._raw = {}
+        self._pending = []
+
+    def track(self, rows):
+        """
+        detect_changes çıktısını olduğu gibi geçirir ve ham verileri kamp alanı id'siyle saklar.
+        """
+        for item in rows:
+            _, raw_data, row_hash, _ = item
+            self._raw[raw_data.get("id")] = (raw_data, row_hash)
+            yield item
+
+    def reject(self, rejection: dict):
+        """
+        validate_chunk'ın reddettiği kaydı yazılmak üzere sıraya alır.
+        """
+        raw_data, row_hash = self._raw.pop(rejection["id"], (rejection["raw_data"], None))
+        self._pending.append(dead_letter_row(raw_data, DEAD_LETTER_STAGE_VALIDATE, rejection["error_type"], rejection["error"], job_id=self.job_id, row_hash=row_hash))
+
+    def written(self, rows, write_result: dict):
+        """
+        Yazılan partinin sonucunu işler: yazılamayan satırlar ham verileriyle sıraya alınır, başarıyla yazılan ve
+        daha önce reddedilmiş kamp alanlarının kayıtları silinir. Ardından sıradaki kayıtlar yazılır.
+        """
+        failed_ids = set(write_result["failed_ids"])
+        errors = write_result.get("errors", {})
+        succeeded = []
+        for row in rows:
+            raw_data, row_hash = self._raw.pop(row["id"], (None, None))
+            if row["id"] not in failed_ids:
+                succeeded.append(row["id"])
+            elif raw_data is not None:
+                error = errors.get(row["id"], {})
+                self._pending.append(dead_letter_row(raw_data, DEAD_LETTER_STAGE_WRITE, error.get("error_type", "DatabaseException"), error.get("error"), job_id=self.job_id, row_hash=row_hash))
+        resolved_ids = [campground_id for campground_id in succeeded if campground_id in self.known_ids]
+        if resolved_ids:
+            self.stats["resolved"] += resolve_dead_letters(self.session, resolved_ids)
+            self.known_ids.difference_update(resolved_ids)
+        self.flush()
+
+    def flush(self) -> int:
+        if not self._pending:
+            return 0
+        saved = save_dead_letters(self.session, self._pending)
+        if saved:
+            self.known_ids.update(row["campground_id"] for row in self._pending)
+        self.stats["saved"] += saved
+        self._pending = []
+        return saved
+
+
+def replay_dead_letters(session, batch_size: int = DEAD_LETTER_REPLAY_BATCH_SIZE, limit: int = None, timings=None, progress_callback=None, **filters) -> dict:
+    """
+    Dead-letter kayıtlarını güncel modelle yeniden doğrular ve partiler halinde bulk_upsert_rows ile yazar.
+    Yazılan kayıtlar tablodan silinir; yine reddedilenlerin hatası, aşaması ve model sürümü güncellenir.
+    `filters`: stage, error_type, model_version. `limit` verilirse en fazla o kadar kayıt işlenir.
+
+    Dönüş: {"replayed", "written", "inserted", "updated", "rejected", "failed", "observations", "remaining"}
+    """
+    stats = {"replayed": 0, "written": 0, "inserted": 0, "updated": 0, "rejected": 0, "failed": 0, "observations": 0}
+    for batch_number, batch in enumerate(iter_dead_letter_batches(session, batch_size, limit=limit, **filters), start=1):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        ids = [raw_data.get("id") for _, raw_data in batch if raw_data.get("id") is not None]
+        existing = set(session.execute(select(CampgroundORM.id).where(CampgroundORM.id.in_(ids))).scalars()) if ids else set()
+        # content_hash scraper'daki değişiklik tespitiyle aynı özet; sonraki taramalar yazılan kaydı değişmemiş sayar.
+        chunk = [(index, raw_data, content_hash(raw_data), raw_data.get("id") not in existing) for index, (_, raw_data) in enumerate(batch, start=1)]
+        accepted, rejected, stage_seconds = validate_chunk(chunk)
+        if timings is not None:
+            for stage, seconds in stage_seconds.items():
+                timings.add(stage, seconds, len(chunk))
+        raw_by_id = {raw_data.get("id"): raw_data for _, raw_data in batch}
+        retry_rows = [
+            dead_letter_row(rejection["raw_data"], DEAD_LETTER_STAGE_VALIDATE, rejection["error_type"], rejection["error"], now=now)
+            for rejection in rejected
+        ]
+        write_result = {"written": 0, "failed": 0, "failed_ids": [], "errors": {}}
+        if accepted:
+            previous_values = load_observed_values(session, [row["id"] for _, row, is_new in accepted if not is_new])
+            write_result = bulk_upsert_rows(session, [row for _, row, _ in accepted])
+            failed_ids = set(write_result["failed_ids"])
+            written = [(row, is_new) for _, row, is_new in accepted if row["id"] not in failed_ids]
+            stats["observations"] += append_observations(session, build_observations((row for row, _ in written), previous_values, now))
+            stats["inserted"] += sum(1 for _, is_new in written if is_new)
+            stats["updated"] += sum(1 for _, is_new in written if not is_new)
+            for campground_id in write_result["failed_ids"]:
+                error = write_result["errors"].get(campground_id, {})
+                retry_rows.append(dead_letter_row(raw_by_id[campground_id], DEAD_LETTER_STAGE_WRITE, error.get("error_type", "DatabaseException"), error.get("error"), now=now))
+            resolve_dead_letters(session, [row["id"] for row, _ in written])
+        for row in retry_rows:
+            # İlk reddeden işin kimliği korunur.
+            del row["job_id"]
+            row["replayed_at"] = now
+        save_dead_letters(session, retry_rows)
+        stats["replayed"] += len(batch)
+        stats["written"] += len(accepted) - write_result["failed"]
+        stats["rejected"] += len(rejected)
+        stats["failed"] += write_result["failed"]
+        dead_letter_replays_total.inc(len(accepted) - write_result["failed"], result="written")
+        dead_letter_replays_total.inc(len(rejected), result="rejected")
+        dead_letter_replays_total.inc(write_result["failed"], result="failed")
+        logger.info(
+            f"Dead-letter partisi {batch_number} yeniden oynatıldı: {len(batch)} kayıt, {len(accepted) - write_result['failed']} yazıldı, "
+            f"{len(rejected)} yine doğrulanamadı, {write_result['failed']} yazılamadı.",
+            extra={"component": "dead_letters", "function": "replay_dead_letters"}
+        )
+        if progress_callback is not None:
+            progress_callback(dict(stats))
+    stats["remaining"] = count_dead_letters(session, **filters)
+    logger.info(
+        f"Dead-letter yeniden oynatma tamamlandı: {stats['replayed']} kayıt işlendi, {stats['written']} yazıldı "
+        f"({stats['inserted']} eklendi, {stats['updated']} güncellendi), {stats['rejected'] + stats['failed']} reddedildi, {stats['remaining']} kayıt bekliyor.",
+        extra={"component": "dead_letters", "function": "replay_dead_letters"}
+    )
+    return stats
@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import httpx
+
+from src.config import HTTP_CACHE_DIR, HTTP_CACHE_ENABLED, HTTP_CACHE_MAX_AGE
+from src.logger import logger
+
+try:
+    import brotli  # noqa: F401  (httpx br çözümlemesi için yeterli)
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+DEFAULT_HEADERS = {
+    "Accept": "application/json",
+    "Accept-Encoding": ACCEPT_ENCODING,
+}
+
+def create_async_client(max_connections: int, timeout: float) -> httpx.AsyncClient:
+    """
+    Tarama motoru için keep-alive ve sıkıştırma başlıklarıyla yapılandırılmış httpx istemcisi.
+    """
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    return httpx.AsyncClient(timeout=timeout, limits=limits, headers=DEFAULT_HEADERS)
+
+
+class ResponseCache:
+    """
+    URL'ye göre anahtarlanan, ETag/Last-Modified doğrulayıcılarını diskte saklayan önbellek.
+
+    Gövdenin kendisi değil, sayfanın `meta` bilgisi ve öğe sayısı saklanır: 304 yanıtında
+    sayfa zaten işlenmiş kabul edilir ve sayfalama kararları bu bilgilerle verilir.
+    `max_age` saniyeden eski girdiler için koşullu başlık gönderilmez; böylece önceki bir
+    çalışmada yazılamamış kayıtlar en geç bu süre sonunda yeniden işlenir.
+    """
+    def __init__(self, directory: str = HTTP_CACHE_DIR, max_age: float = HTTP_CACHE_MAX_AGE):
+        self.directory = directory
+        self.max_age = max_age
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, url: str):
+        path = self._path(url)
+        try:
+            with open(path, "r", encoding="utf-8") as cache_file:
+                entry = json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+        if entry.get("url") != url:
+            return None
+        if self.max_age and time.time() - entry.get("stored_at", 0) > self.max_age:
+            return None
+        return entry
+
+    def conditional_headers(self, url: str) -> dict:
+        entry = self.get(url)
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url: str, response_headers, meta=None, item_count=None):
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "meta": meta or {},
+            "item_count": item_count,
+            "stored_at": time.time(),
+        }
+        path = self._path(url)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as cache_file:
+                json.dump(entry, cache_file)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"HTTP önbelleğine yazılamadı: {url} | {e}", extra={"component": "http_cache"})
+
+
+def get_default_cache():
+    return ResponseCache() if HTTP_CACHE_ENABLED else None
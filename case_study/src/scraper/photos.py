@@ -0,0 +1,514 @@
+"""
+Kamp alanı fotoğraflarının indirilmesi ve içerik adresli yerel depoda saklanması.
+
+PhotoFetcher, yazılan kamp alanlarının photo_url/photo_urls adreslerini ayrı bir thread'deki event loop'ta
+sınırlı sayıda async worker ile indirir; böylece indirme, taramanın doğrulama/yazma adımlarıyla eşzamanlı
+ilerler. Daha önce indirilmiş (ve depoda hâlâ duran) URL'ler ile aynı çalışmada tekrar gelen URL'ler
+atlanır; farklı URL'lerden gelen aynı içerik (sha256) tek dosya olarak saklanır. İndirilemeyen URL'ler
+artan aralıklarla en fazla PHOTO_FETCH_MAX_ATTEMPTS kez yeniden denenir; kalıcı 4xx yanıtları denenmez.
+
+PhotoStore dosyaları `originals/<ilk iki hane>/<sha256>.<uzantı>` ve `thumbs/<ilk iki hane>/<sha256>.jpg`
+altında tutar. Toplam boyut PHOTO_CACHE_MAX_BYTES'ı aşınca en uzun süredir okunmayan dosyalar silinir.
+"""
+import asyncio
+import contextvars
+import datetime
+import hashlib
+import io
+import os
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+import httpx
+
+from src.config import (
+    PHOTO_CACHE_DIR,
+    PHOTO_CACHE_MAX_BYTES,
+    PHOTO_FETCH_CONCURRENCY,
+    PHOTO_FETCH_MAX_ATTEMPTS,
+    PHOTO_HTTP_TIMEOUT,
+    PHOTO_MAX_BYTES,
+    PHOTO_MAX_RETRIES,
+    PHOTO_RATE_LIMIT_PER_HOST,
+    PHOTO_RETRY_SECONDS,
+    PHOTO_THUMB_SIZE,
+)
+from src.db.photos import PHOTO_STATUS_FAILED, PHOTO_STATUS_FETCHED, iter_campground_photo_urls, link_row, load_photo_index, photo_urls, save_photos
+from src.logger import logger
+from src.metrics import registry
+from src.scraper.crawler import HostRateLimiter
+from src.utils.circuit_breaker import CircuitOpenError, circuit_breakers
+from src.utils.utils import retry_operation_async
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - Pillow isteğe bağlı
+    Image = None
+
+# İçerik adresli dosyalar hiç değişmediği için istemciler süresiz önbelleğe alabilir.
+PHOTO_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+MEDIA_TYPES = {"jpg": "image/jpeg", "png": "image/png", "gif": "image/gif", "webp": "image/webp"}
+PHOTO_NAME_PATTERN = re.compile(r"^([0-9a-f]{64})\.(jpg|png|gif|webp)$")
+THUMBNAIL_NAME_PATTERN = re.compile(r"^([0-9a-f]{64})\.jpg$")
+
+PHOTO_HEADERS = {"Accept": "image/avif,image/webp,image/*;q=0.8"}
+
+# Silme, deponun bu oranına inene kadar sürer; sınırın hemen altında her yeni dosyada yeniden taramamak için.
+_EVICT_TARGET_RATIO = 0.9
+# Fetcher'ın worker'larına kuyruğun bittiğini bildiren işaret
+_DONE = object()
+# Yeniden denemeye değer 4xx yanıtları; diğer 4xx'ler (404, 410, 403...) kalıcı sayılır ve URL bir daha indirilmez
+_RETRYABLE_CLIENT_ERRORS = {408, 425, 429}
+
+photo_fetch_total = registry.counter("photo_fetch_total", "Fotoğraf indirme aşamasının URL bazında sonuçları.", ("result",))
+photo_store_bytes = registry.gauge("photo_store_bytes", "Fotoğraf deposunun diskteki toplam boyutu (bayt).")
+photo_evictions_total = registry.counter("photo_evictions_total", "Depo boyut sınırı nedeniyle silinen fotoğraf dosyaları.")
+
+
+class PhotoRejected(Exception):
+    """
+    İndirilen yanıt fotoğraf olarak saklanamıyor (boyut sınırı, desteklenmeyen içerik türü).
+    """
+
+
+def retry_due(photo: dict, now, max_attempts: int = PHOTO_FETCH_MAX_ATTEMPTS, retry_seconds: float = PHOTO_RETRY_SECONDS) -> bool:
+    """
+    İndirilemeyen bir URL'nin (campground_photos satırı) bu çalışmada yeniden denenip denenmeyeceği: kalıcı 4xx
+    yanıtları ve `max_attempts` kez başarısız olanlar denenmez; diğerleri son denemeden bu yana
+    `retry_seconds * 2**(attempts - 1)` saniye geçtiyse denenir.
+    """
+    http_status = photo.get("http_status")
+    if http_status is not None and 400 <= http_status < 500 and http_status not in _RETRYABLE_CLIENT_ERRORS:
+        return False
+    attempts = photo.get("attempts") or 0
+    if attempts >= max_attempts:
+        return False
+    last_attempt = photo.get("fetched_at")
+    if last_attempt is None:
+        return True
+    if last_attempt.tzinfo is None:
+        # SQLite zaman dilimini saklamaz; değerler UTC olarak yazılır.
+        last_attempt = last_attempt.replace(tzinfo=datetime.timezone.utc)
+    return now >= last_attempt + datetime.timedelta(seconds=retry_seconds * 2 ** max(attempts - 1, 0))
+
+
+def detect_extension(content_type: str, data: bytes):
+    """
+    Dosya uzantısını önce içeriğin imzasından, bulunamazsa Content-Type başlığından belirler; fotoğraf değilse None.
+    """
+    if data.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    for extension, known_type in MEDIA_TYPES.items():
+        if media_type == known_type:
+            return extension
+    return None
+
+
+def make_thumbnail(data: bytes, size: int = PHOTO_THUMB_SIZE):
+    """
+    En uzun kenarı `size` piksel olan JPEG küçük resim üretir. Pillow kurulu değilse None döner.
+    """
+    if Image is None:
+        return None
+    with Image.open(io.BytesIO(data)) as image:
+        image.thumbnail((size, size))
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        output = io.BytesIO()
+        image.save(output, format="JPEG", quality=80, optimize=True)
+    return output.getvalue()
+
+
+class PhotoStore:
+    """
+    sha256 ile adreslenen fotoğraf ve küçük resim dosyaları. Son erişim zamanı dosyanın mtime'ı olarak
+    tutulur (atime `noatime` bağlamalarda güncellenmez); içerik hiç değişmediği için mtime bu işe ayrılabilir.
+    """
+    def __init__(self, directory: str = PHOTO_CACHE_DIR, max_bytes: int = PHOTO_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size = None
+        self._lock = threading.Lock()
+
+    def original_path(self, name: str) -> str:
+        return os.path.join(self.directory, "originals", name[:2], name)
+
+    def thumbnail_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "thumbs", digest[:2], f"{digest}.jpg")
+
+    def has(self, name: str) -> bool:
+        return os.path.exists(self.original_path(name))
+
+    def has_thumbnail(self, digest: str) -> bool:
+        return os.path.exists(self.thumbnail_path(digest))
+
+    def put(self, data: bytes, extension: str):
+        """
+        İçeriği saklar ve (sha256, dosya adı, yeni mi) döndürür; aynı içerik zaten varsa yeniden yazılmaz.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        name = f"{digest}.{extension}"
+        path = self.original_path(name)
+        if os.path.exists(path):
+            self.touch(path)
+            return digest, name, False
+        self._write(path, data)
+        return digest, name, True
+
+    def put_thumbnail(self, digest: str, data: bytes):
+        self._write(self.thumbnail_path(digest), data)
+
+    def touch(self, path: str):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _write(self, path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as photo_file:
+            photo_file.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            if self._size is None:
+                return
+            self._size += len(data)
+            over_limit = self.max_bytes and self._size > self.max_bytes
+        if over_limit:
+            self.evict()
+
+    def _scan(self):
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def size(self) -> int:
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._scan())
+            return self._size
+
+    def evict(self):
+        """
+        Toplam boyut max_bytes'ı aşıyorsa en uzun süredir erişilmeyen dosyaları sınırın %90'ına inene kadar
+        siler; (silinen dosya, boşalan bayt) döndürür. Silinen orijinaller, kamp alanı bir sonraki değiştiğinde
+        veya `python main.py photos` ile yeniden indirilir.
+        """
+        removed = freed = 0
+        with self._lock:
+            files = self._scan()
+            total = sum(size for _, size, _ in files)
+            if self.max_bytes and total > self.max_bytes:
+                target = self.max_bytes * _EVICT_TARGET_RATIO
+                for _, size, path in sorted(files):
+                    if total - freed <= target:
+                        break
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        continue
+                    removed += 1
+                    freed += size
+            self._size = total - freed
+        photo_store_bytes.set(self._size)
+        if removed:
+            photo_evictions_total.inc(removed)
+            logger.info(f"Fotoğraf deposu sınırı aşıldı: {removed} dosya ({freed / 1024 ** 2:.1f} MB) silindi.", extra={"component": "photo_store", "function": "evict"})
+        return removed, freed
+
+
+photo_store = PhotoStore()
+
+
+class PhotoFetcher:
+    """
+    Fotoğraf URL'lerini `concurrency` async worker ile indirip PhotoStore'a yazar.
+
+    Kullanım: start() -> her parti sonunda submit()/submit_rows() -> close() (sonuç satırları).
+    `known` (load_photo_index çıktısı) içinde FETCHED olan ve dosyası depoda duran URL'ler ile yeniden deneme
+    zamanı gelmemiş başarısız URL'ler indirilmez. Sonuç satırları campground_photos tablosunun kolonlarıyla aynıdır
+    ve URL'yi kullanan her kamp alanı için ayrı satır üretilir: atlanan URL'ler için bilinen sonuç yeni kamp alanına
+    bağlanır, indirilen URL'nin sonucu onu kullanan diğer kamp alanlarına da yazılır. Veritabanına çağıran yazar.
+    """
+    def __init__(
+        self,
+        store: PhotoStore = None,
+        known=None,
+        concurrency: int = PHOTO_FETCH_CONCURRENCY,
+        rate_limit_per_host: float = PHOTO_RATE_LIMIT_PER_HOST,
+        timeout: float = PHOTO_HTTP_TIMEOUT,
+        max_retries: int = PHOTO_MAX_RETRIES,
+        max_bytes: int = PHOTO_MAX_BYTES,
+        thumb_size: int = PHOTO_THUMB_SIZE,
+        timings=None,
+    ):
+        self.store = store or photo_store
+        self.known = known or {}
+        self.concurrency = max(1, concurrency)
+        self.rate_limit_per_host = rate_limit_per_host
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_bytes = max_bytes
+        self.thumb_size = thumb_size
+        # StageTimings verilirse her indirmenin süresi "photo_fetch" aşamasına eklenir
+        self.timings = timings
+        self.results = []
+        self.stats = {"submitted": 0, "skipped": 0, "fetched": 0, "deduplicated": 0, "failed": 0, "thumbnails": 0, "bytes": 0}
+        self._queued = set()
+        # Kuyruğa alınmış URL -> sonucu da yazılacak diğer kamp alanları {campground_id: position}; bitenlerin sonuçları
+        self._waiting = {}
+        self._done = {}
+        self._lock = threading.Lock()
+        self._loop = None
+        self._queue = None
+        self._workers = []
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+        self._closed = False
+
+    def needs_fetch(self, url: str, now=None) -> bool:
+        if url in self._queued:
+            return False
+        photo = self.known.get(url)
+        if photo is None:
+            return True
+        if photo["status"] == PHOTO_STATUS_FETCHED:
+            return not (photo["file_name"] and self.store.has(photo["file_name"]))
+        return retry_due(photo, now or datetime.datetime.now(datetime.timezone.utc))
+
+    def start(self):
+        # Deponun mevcut boyutu bir kez taranır; sonrasında yazılan dosyalarla güncellenir ve sınır indirme sırasında da uygulanır.
+        photo_store_bytes.set(self.store.size())
+        # Log kayıtları başlatan işin job_id'siyle etiketlensin diye çağıranın bağlamı thread'e taşınır.
+        self._thread = threading.Thread(target=contextvars.copy_context().run, args=(self._thread_main,), name="photo-fetcher", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+        return self
+
+    def submit(self, campground_id: str, urls) -> int:
+        """
+        İndirilmesi gereken URL'leri kuyruğa ekler ve eklenen sayıyı döndürür. Çağıran thread'i bekletmez.
+        """
+        queued = 0
+        now = datetime.datetime.now(datetime.timezone.utc)
+        for position, url in enumerate(urls):
+            with self._lock:
+                if url in self._queued:
+                    # Bu çalışmada başka bir kamp alanı için kuyruğa alınmış URL: sonucu bu kamp alanına da yazılır.
+                    if url in self._done:
+                        self.results.append(link_row(self._done[url], campground_id, position))
+                    else:
+                        self._waiting[url][campground_id] = position
+                    self.stats["skipped"] += 1
+                    continue
+                photo = self.known.get(url)
+                if not self.needs_fetch(url, now):
+                    if photo["campgrounds"].get(campground_id) != position:
+                        self.results.append(link_row(photo, campground_id, position))
+                    self.stats["skipped"] += 1
+                    continue
+                self._queued.add(url)
+                # Yeniden indirilen URL'nin sonucu onu kullanan diğer kayıtlı kamp alanlarına da yazılır.
+                self._waiting[url] = {other: other_position for other, other_position in (photo or {}).get("campgrounds", {}).items() if other != campground_id}
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, (campground_id, position, url))
+            queued += 1
+        self.stats["submitted"] += queued
+        return queued
+
+    def submit_rows(self, rows) -> int:
+        return sum(self.submit(row["id"], photo_urls(row)) for row in rows)
+
+    def close(self, cancel: bool = False):
+        """
+        Kuyruktaki indirmeler bitene kadar bekler ve sonuç satırlarını döndürür. `cancel` True ise
+        (örn. iş hatayla sonlanırken) bekleyen indirmeler yapılmadan durulur.
+        """
+        if self._closed or self._thread is None:
+            return self.results
+        self._closed = True
+        if cancel:
+            self._loop.call_soon_threadsafe(self._cancel_workers)
+        else:
+            for _ in self._workers:
+                self._loop.call_soon_threadsafe(self._queue.put_nowait, _DONE)
+        self._thread.join()
+        return self.results
+
+    def _cancel_workers(self):
+        for worker in self._workers:
+            worker.cancel()
+
+    def _thread_main(self):
+        try:
+            asyncio.run(self._run())
+        except BaseException as e:
+            self._error = e
+        finally:
+            self._ready.set()
+
+    async def _run(self):
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        rate_limiter = HostRateLimiter(self.rate_limit_per_host)
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits, headers=PHOTO_HEADERS, follow_redirects=True) as client:
+            self._workers = [asyncio.create_task(self._worker(client, rate_limiter)) for _ in range(self.concurrency)]
+            self._ready.set()
+            await asyncio.gather(*self._workers, return_exceptions=True)
+
+    async def _worker(self, client, rate_limiter):
+        while True:
+            item = await self._queue.get()
+            if item is _DONE:
+                return
+            start = time.perf_counter()
+            row = await self._fetch(client, rate_limiter, *item)
+            with self._lock:
+                self._done[row["url"]] = row
+                self.results.append(row)
+                self.results.extend(link_row(row, campground_id, position) for campground_id, position in self._waiting.pop(row["url"], {}).items())
+            if self.timings is not None:
+                self.timings.add("photo_fetch", time.perf_counter() - start)
+
+    async def _download(self, client, rate_limiter, url: str, host: str):
+        await rate_limiter.acquire(host)
+        async with client.stream("GET", url) as response:
+            response.raise_for_status()
+            if int(response.headers.get("Content-Length") or 0) > self.max_bytes:
+                raise PhotoRejected(f"{self.max_bytes} bayttan büyük")
+            chunks = []
+            size = 0
+            async for chunk in response.aiter_bytes():
+                size += len(chunk)
+                if size > self.max_bytes:
+                    raise PhotoRejected(f"{self.max_bytes} bayttan büyük")
+                chunks.append(chunk)
+            return response.headers.get("Content-Type", ""), b"".join(chunks)
+
+    async def _fetch(self, client, rate_limiter, campground_id: str, position: int, url: str) -> dict:
+        row = {
+            "url": url,
+            "campground_id": campground_id,
+            "position": position,
+            "status": PHOTO_STATUS_FAILED,
+            "content_hash": None,
+            "file_name": None,
+            "content_type": None,
+            "size_bytes": None,
+            "has_thumbnail": False,
+            "error": None,
+            "attempts": 0,
+            "http_status": None,
+            "fetched_at": datetime.datetime.now(datetime.timezone.utc),
+        }
+        host = urlsplit(url).netloc
+        try:
+            content_type, data = await retry_operation_async(
+                lambda: self._download(client, rate_limiter, url, host),
+                max_retries=self.max_retries,
+                initial_wait=1,
+                backoff_factor=2,
+                exception_types=(httpx.HTTPError,),
+                context=f"Fotoğraf GET {url}",
+                circuit_breaker=circuit_breakers.get(host),
+            )
+            extension = detect_extension(content_type, data)
+            if extension is None:
+                raise PhotoRejected(f"Desteklenmeyen içerik türü: {content_type or 'yok'}")
+            digest, name, created = await asyncio.to_thread(self.store.put, data, extension)
+        except (httpx.HTTPError, httpx.InvalidURL, CircuitOpenError, PhotoRejected, OSError) as e:
+            previous = self.known.get(url)
+            row["error"] = f"{type(e).__name__}: {e}"
+            failed_before = previous is not None and previous["status"] == PHOTO_STATUS_FAILED
+            row["attempts"] = ((previous.get("attempts") or 0) if failed_before else 0) + 1
+            if isinstance(e, httpx.HTTPStatusError):
+                row["http_status"] = e.response.status_code
+            self.stats["failed"] += 1
+            photo_fetch_total.inc(result="failed")
+            logger.warning(f"Fotoğraf indirilemedi: {url} | {row['error']}", extra={"component": "photo_fetcher", "function": "_fetch", "errtype": "HTTP_ERROR", "per_row": True})
+            return row
+        result = "fetched" if created else "deduplicated"
+        self.stats[result] += 1
+        photo_fetch_total.inc(result=result)
+        if created:
+            self.stats["bytes"] += len(data)
+        row.update(status=PHOTO_STATUS_FETCHED, content_hash=digest, file_name=name, content_type=MEDIA_TYPES[extension], size_bytes=len(data))
+        row["has_thumbnail"] = self.store.has_thumbnail(digest) or await self._thumbnail(digest, data, url)
+        return row
+
+    async def _thumbnail(self, digest: str, data: bytes, url: str) -> bool:
+        try:
+            # Görüntü işleme CPU'da çalışır; event loop'u (diğer indirmeleri) bekletmemek için thread'e alınır.
+            thumbnail = await asyncio.to_thread(make_thumbnail, data, self.thumb_size)
+            if thumbnail is None:
+                return False
+            await asyncio.to_thread(self.store.put_thumbnail, digest, thumbnail)
+        except Exception as e:
+            logger.warning(f"Küçük resim üretilemedi: {url} | {type(e).__name__}: {e}", extra={"component": "photo_fetcher", "function": "_thumbnail", "per_row": True})
+            return False
+        self.stats["thumbnails"] += 1
+        return True
+
+
+def start_photo_fetcher(session, timings=None) -> PhotoFetcher:
+    """
+    Kayıtlı fotoğraf dizinini yükleyip bir PhotoFetcher başlatır.
+    """
+    if Image is None:
+        logger.warning("Pillow kurulu değil; fotoğraflar küçük resim üretilmeden saklanacak.", extra={"component": "photo_fetcher", "function": "start_photo_fetcher"})
+    return PhotoFetcher(known=load_photo_index(session), timings=timings).start()
+
+
+def finish_photo_fetch(session, fetcher: PhotoFetcher) -> dict:
+    """
+    Bekleyen indirmeleri tamamlar, sonuçları campground_photos tablosuna yazar, depo sınırını uygular ve sayaçları döndürür.
+    """
+    save_photos(session, fetcher.close())
+    fetcher.store.evict()
+    stats = fetcher.stats
+    logger.info(
+        f"Fotoğraflar: {stats['fetched']} indirildi ({stats['bytes'] / 1024 ** 2:.1f} MB), {stats['deduplicated']} aynı içerikli, "
+        f"{stats['skipped']} zaten depoda, {stats['failed']} başarısız, {stats['thumbnails']} küçük resim.",
+        extra={"component": "photo_fetcher", "function": "finish_photo_fetch"}
+    )
+    return stats
+
+
+def backfill_photos(session, limit: int = None, timings=None) -> dict:
+    """
+    Veritabanındaki tüm kamp alanlarının eksik fotoğraflarını indirir (örn. özellik sonradan açıldığında
+    veya silinen dosyalar için). `limit` verilirse yalnızca ilk `limit` kamp alanına bakılır.
+    """
+    fetcher = start_photo_fetcher(session, timings)
+    try:
+        for index, (campground_id, urls) in enumerate(iter_campground_photo_urls(session)):
+            if limit is not None and index >= limit:
+                break
+            fetcher.submit(campground_id, urls)
+    except BaseException:
+        fetcher.close(cancel=True)
+        raise
+    return finish_photo_fetch(session, fetcher)
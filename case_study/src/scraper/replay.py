@@ -0,0 +1,94 @@
+import os
+
+from src.logger import logger
+from src.serialization import loads
+from src.scraper.crawler import empty_crawl_stats
+from src.scraper.stream import JsonItemStream
+
+# Dosya ayrıştırıcıya bu boyutta parçalar halinde verilir; büyük yanıtlar belleğe bütün olarak alınmaz.
+_READ_CHUNK_SIZE = 1024 * 1024
+
+
+def _collect_paths(path: str):
+    if os.path.isdir(path):
+        return sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.endswith((".json", ".jsonl"))
+        )
+    return [path]
+
+
+class ResponseReplay:
+    """
+    Kaydedilmiş arama API yanıtlarını CrawlEngine yerine run_scraper_job'a veren kaynak.
+
+    `path` bir dosya veya dizin olabilir. `.json` dosyaları tek bir JSON:API yanıtıdır
+    (`data[]` + `meta`); `.jsonl` dosyalarında her satır ya bir yanıt ya da tek bir `data[]` öğesidir.
+    Dizinlerde bu uzantılı dosyalar ad sırasıyla okunur. Konumlar CrawlEngine'deki gibi id'ye göre tekilleştirilir.
+    """
+    incremental = False
+
+    def __init__(self, path: str):
+        self.paths = _collect_paths(path)
+        if not self.paths:
+            raise ValueError(f"Oynatılacak yanıt dosyası bulunamadı: {path}")
+        self.stats = empty_crawl_stats()
+        self.new_watermarks = {}
+        self._seen_ids = set()
+
+    def commit_cache(self) -> int:
+        # Oynatılan yanıtlar HTTP önbelleğine yazılmaz.
+        return 0
+
+    @property
+    def seen_ids(self):
+        return self._seen_ids
+
+    def _emit(self, location):
+        location_id = location.get("id")
+        if location_id in self._seen_ids:
+            self.stats["duplicates"] += 1
+            return False
+        self._seen_ids.add(location_id)
+        self.stats["locations"] += 1
+        return True
+
+    def _page_done(self, meta):
+        self.stats["pages"] += 1
+        total_count = (meta or {}).get("total_count")
+        if total_count is not None:
+            self.stats["total_count"] = (self.stats["total_count"] or 0) + total_count
+
+    def _iter_json(self, path):
+        parser = JsonItemStream("data")
+        with open(path, "rb") as response_file:
+            while True:
+                chunk = response_file.read(_READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                for location in parser.feed(chunk):
+                    yield location
+        for location in parser.close():
+            yield location
+        self._page_done(parser.extras.get("meta"))
+
+    def _iter_jsonl(self, path):
+        with open(path, "r", encoding="utf-8") as response_file:
+            for line in response_file:
+                line = line.strip()
+                if not line:
+                    continue
+                value = loads(line)
+                if "data" in value:
+                    yield from value.get("data") or []
+                    self._page_done(value.get("meta"))
+                else:
+                    yield value
+
+    def iter_locations_sync(self):
+        for path in self.paths:
+            logger.info(f"Kaydedilmiş yanıt oynatılıyor: {path}", extra={"component": "replay", "function": "iter_locations_sync"})
+            locations = self._iter_jsonl(path) if path.endswith(".jsonl") else self._iter_json(path)
+            for location in locations:
+                if self._emit(location):
+                    yield location
@@ -1,8 +1,18 @@
 from apscheduler.schedulers.background import BackgroundScheduler
 from src.scraper.scraper import run_scraper_job
 
-def start_scheduler():
+def run_scheduled_job():
+    """
+    Tüm alan taramasını API koordinatörüyle aynı anahtar ve kilitle çalıştırır; aynı tarama bu süreçte
+    veya başka bir uygulama kopyasında sürüyorsa atlanır.
+    """
+    from src.jobs.coordinator import SCRAPE_JOB_KEY, run_exclusive
+
+    _, summary = run_exclusive(SCRAPE_JOB_KEY, run_scraper_job)
+    return summary
+
+def start_scheduler(minutes=2):
     scheduler = BackgroundScheduler()
-    scheduler.add_job(run_scraper_job, 'interval', minutes=2)
+    scheduler.add_job(run_scheduled_job, 'interval', minutes=minutes, max_instances=1, coalesce=True)
     scheduler.start()
     return scheduler
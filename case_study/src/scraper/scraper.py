@@ -1,81 +1,361 @@
-import requests
-from pydantic import ValidationError
-from src.db.base import get_session
-from src.db.db import insert_campground_to_db, init_db
-from src.models.campground import Campground
-from src.logger import logger, ValidationException, handle_exception
-from src.config import API_URL
-from src.utils.utils import retry_operation, sanitize_data
-
-
-def http_get_with_retry(url, max_retries=5, timeout=10):
-    def op():
-        response = requests.get(url, timeout=timeout)
-        response.raise_for_status()
-        return response
-    from requests.exceptions import HTTPError, Timeout, ConnectionError, RequestException
-    return retry_operation(
-        op,
-        max_retries=max_retries,
-        initial_wait=2,
-        backoff_factor=2,
-        exception_types=(HTTPError, Timeout, ConnectionError, RequestException),
-        context=f"HTTP GET {url}"
+import time
+import datetime
+from src.db.base import get_session, remove_session
+from src.db.observations import append_observations, build_observations, load_observed_values
+from src.db.db import bulk_upsert_rows, delete_campgrounds, init_db, load_campground_hashes, load_crawl_state, save_crawl_state
+from src.logger import current_job_id, logger, row_log_sampler, ValidationException, handle_exception
+from src.config import (
+    API_URL,
+    DEAD_LETTER_ENABLED,
+    PIPELINE_BATCH_SIZE,
+    PROGRESS_INTERVAL,
+    CRAWL_INCREMENTAL,
+    CRAWL_FULL_RECONCILE_HOURS,
+    CRAWL_RECONCILE_MAX_DELETE_RATIO,
+    PHOTO_FETCH_ENABLED,
+)
+from src.metrics import StageTimings
+from src.utils.utils import content_hash, batched
+from src.scraper.crawler import CrawlEngine
+from src.scraper.dead_letters import DeadLetterCollector
+from src.scraper.photos import finish_photo_fetch, start_photo_fetcher
+from src.scraper.validation import iter_validated
+
+# Veritabanında hiç olmayan kayıtları, özeti NULL olan kayıtlardan ayırmak için
+_UNKNOWN = object()
+
+# crawl_state anahtarları: karo watermark'ları ve son tam uzlaştırma zamanı
+TILE_STATE_PREFIX = "tile:"
+FULL_RECONCILE_KEY = "full_reconcile"
+
+def parse_locations(locations, counts):
+    """
+    JSON:API `data[]` öğelerini Campground'un beklediği düz sözlüklere çevirir.
+    """
+    for index, location in enumerate(locations, start=1):
+        counts["processed"] = index
+        yield index, {
+            "id": location.get("id"),
+            "type": location.get("type"),
+            "links": location.get("links", {}),
+            **location.get("attributes", {}),
+            "index": index
+        }
+
+def detect_changes(rows, known_hashes, counts, timings=None):
+    """
+    İçerik özeti veritabanındakiyle aynı olan kayıtları doğrulama ve yazma adımlarına
+    hiç göndermeden atlar; yeni/değişen kayıtları özetleriyle birlikte geçirir.
+    """
+    seconds = 0.0
+    hashed = 0
+    try:
+        for index, raw_data in rows:
+            started = time.perf_counter()
+            row_hash = content_hash({key: value for key, value in raw_data.items() if key != "index"})
+            known_hash = known_hashes.get(raw_data["id"], _UNKNOWN)
+            seconds += time.perf_counter() - started
+            hashed += 1
+            if known_hash == row_hash:
+                counts["unchanged"] += 1
+                continue
+            yield index, raw_data, row_hash, known_hash is _UNKNOWN
+    finally:
+        if timings is not None:
+            timings.add("change_detection", seconds, hashed)
+
+def _log_rejection(rejection):
+    context = f"Kamp alanı: {rejection['name']}"
+    if rejection["error_type"] == "ValidationError":
+        handle_exception(ValidationException(rejection["error"]), context=context, extra_args={"function": "run_scraper_job"})
+    else:
+        logger.error(f"{context} | {rejection['error_type']}: {rejection['error']}", extra={"component": "scraper_module", "function": "run_scraper_job", "errtype": "GENERIC_UNHANDLED_ERROR"})
+
+def validate_rows(rows, counts, timings=None, dead_letters=None):
+    """
+    Temizleme + doğrulama + veritabanı satırına dönüştürme aşaması. VALIDATION_WORKERS > 0 ise
+    iş süreç havuzunda yapılır. Doğrulanamayan kayıtlar loglanır ve atlanır; `dead_letters`
+    (DeadLetterCollector) verilirse ham verileri dead_letters tablosuna yazılmak üzere ona iletilir.
+    """
+    for accepted, rejected, stage_seconds in iter_validated(rows):
+        if timings is not None:
+            chunk_size = len(accepted) + len(rejected)
+            for stage, seconds in stage_seconds.items():
+                timings.add(stage, seconds, chunk_size)
+        for rejection in rejected:
+            counts["rejected"] += 1
+            _log_rejection(rejection)
+            if dead_letters is not None:
+                dead_letters.reject(rejection)
+        for index, row, is_new in accepted:
+            # Kayıt başına log örneklenir; toplu bilgi her parti sonunda özet olarak yazılır.
+            logger.info(f"{index}. kamp alanı doğrulandı: {row['name']}", extra={"component": "scraper_module", "function": "run_scraper_job", "per_row": True})
+            yield row, is_new
+
+def _log_batch_summary(batch_number, batch_size, write_result, counts, elapsed):
+    dropped = row_log_sampler.pop_dropped()
+    dropped_text = f", örneklemeyle atlanan satır logu: {sum(dropped.values())}" if dropped else ""
+    logger.info(
+        f"Parti {batch_number} yazıldı: {write_result['written']}/{batch_size} kayıt {elapsed:.2f} sn. "
+        f"Toplam: {counts['processed']} işlendi, {counts['inserted']} eklendi, {counts['updated']} güncellendi, "
+        f"{counts['unchanged']} değişmedi, {counts['rejected']} doğrulanamadı, {counts['failed']} başarısız{dropped_text}.",
+        extra={"component": "scraper_module", "function": "run_scraper_job"}
     )
 
-def run_scraper_job():
-    import time
+class ProgressReporter:
+    """
+    İş ilerlemesini (sayfa ve kayıt sayıları, throughput) `callback`'e en fazla
+    `interval` saniyede bir, parti sonlarında ise her zaman iletir.
+    """
+    def __init__(self, callback, counts, start_time, interval=PROGRESS_INTERVAL):
+        self.callback = callback
+        self.counts = counts
+        self.start_time = start_time
+        self.interval = interval
+        self.crawl_stats = {}
+        self._last_report = 0.0
+
+    def report(self, force=False, final=False):
+        """
+        `final` yalnızca çalışmanın sonunda verilir; son rapordaki `completed: True`, taramanın hata
+        olmadan sonuna kadar gittiğini gösterir (run_scraper_job hataları yükseltmez).
+        """
+        if self.callback is None:
+            return
+        now = time.time()
+        if not force and now - self._last_report < self.interval:
+            return
+        self._last_report = now
+        elapsed = now - self.start_time
+        progress = dict(self.counts)
+        progress.update({
+            "pages": self.crawl_stats.get("pages", 0),
+            "failed_pages": self.crawl_stats.get("failed_pages", 0),
+            "truncated_tiles": self.crawl_stats.get("truncated_tiles", 0),
+            "elapsed": round(elapsed, 2),
+            "rows_per_sec": round(self.counts["processed"] / elapsed, 1) if elapsed > 0 else 0.0,
+            "completed": final,
+        })
+        try:
+            self.callback(progress)
+        except Exception as e:
+            logger.warning(f"İlerleme bildirilemedi: {e}", extra={"component": "scraper_module", "function": "run_scraper_job"})
+
+    def track(self, rows):
+        for row in rows:
+            self.report()
+            yield row
+
+def reconcile_due(crawl_state, now=None):
+    """
+    Son tam uzlaştırma taramasının üzerinden CRAWL_FULL_RECONCILE_HOURS geçtiyse (veya hiç yapılmadıysa) True.
+    """
+    last_reconcile = crawl_state.get(FULL_RECONCILE_KEY)
+    if last_reconcile is None:
+        return True
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    return now - last_reconcile >= datetime.timedelta(hours=CRAWL_FULL_RECONCILE_HOURS)
+
+def full_reconcile_due() -> bool:
+    """
+    Artımlı tarama açıksa ve son tam uzlaştırmanın süresi dolduysa True. Parçalı işler bu karara göre
+    parçaları tam tarama olarak çalıştırır ve silme uzlaştırmasını tüm parçalar bittikten sonra yapar.
+    """
+    if not CRAWL_INCREMENTAL:
+        return False
+    init_db()
+    session = get_session()
+    try:
+        return reconcile_due(load_crawl_state(session))
+    finally:
+        session.close()
+        remove_session()
+
+def reconcile_deletions(session, known_ids, seen_ids, stats):
+    """
+    Tam uzlaştırma taramasında API'de artık bulunmayan (`known_ids` içinde olup `seen_ids` içinde olmayan)
+    kamp alanlarını siler ve silinen sayıyı döndürür. Tarama eksikse (`stats`: başarısız sayfa, kırpılmış karo)
+    veya silinecek kayıtların oranı CRAWL_RECONCILE_MAX_DELETE_RATIO'yu aşıyorsa hiçbir şey silinmez.
+    """
+    if stats["failed_pages"] or stats["truncated_tiles"]:
+        logger.warning(f"Tarama eksik ({stats['failed_pages']} başarısız sayfa, {stats['truncated_tiles']} kırpılmış karo); silinen kayıt uzlaştırması atlandı.", extra={"component": "scraper_module", "function": "reconcile_deletions"})
+        return 0
+    missing_ids = set(known_ids) - set(seen_ids)
+    if not missing_ids:
+        return 0
+    if len(missing_ids) > len(known_ids) * CRAWL_RECONCILE_MAX_DELETE_RATIO:
+        logger.warning(f"API'de bulunmayan {len(missing_ids)}/{len(known_ids)} kamp alanı izin verilen oranı aşıyor; silme yapılmadı.", extra={"component": "scraper_module", "function": "reconcile_deletions"})
+        return 0
+    deleted = delete_campgrounds(session, missing_ids)
+    logger.info(f"API'de artık bulunmayan {deleted} kamp alanı silindi.", extra={"component": "scraper_module", "function": "reconcile_deletions"})
+    return deleted
+
+def reconcile_sharded_run(seen_ids, stats) -> int:
+    """
+    Tam uzlaştırma olarak çalışan parçalı bir işin tüm parçaları tamamlandıktan sonra, parçalarda görülen
+    id'lerin birleşimiyle silme uzlaştırmasını yapar ve tarama eksiksizse son tam uzlaştırma zamanını ilerletir.
+    """
+    init_db()
+    session = get_session()
+    try:
+        deleted = reconcile_deletions(session, load_campground_hashes(session).keys(), seen_ids, stats)
+        if not stats["failed_pages"] and not stats["truncated_tiles"]:
+            save_crawl_state(session, {FULL_RECONCILE_KEY: datetime.datetime.now(datetime.timezone.utc)})
+        return deleted
+    finally:
+        session.close()
+        remove_session()
+
+def run_scraper_job(progress_callback=None, timings=None, full_reconcile=None, bbox=None, crawl_engine=None, seen_ids=None):
+    """
+    Tüm bbox'ı tarar, yeni/değişen kamp alanlarını doğrulayıp veritabanına yazar ve bir özet mesajı döndürür.
+    `progress_callback` verilirse işlem boyunca ilerleme sözlükleriyle çağrılır.
+    `timings` (StageTimings) verilirse aşama bazında süreler buna kaydedilir.
+
+    CRAWL_INCREMENTAL açıkken karolar watermark'a kadar taranır; `full_reconcile` True ise (None ise
+    süresi geldiğinde) HTTP önbelleği kullanılmadan tam tarama yapılır ve API'de artık bulunmayan kayıtlar silinir.
+
+    `bbox` ("min_lon,min_lat,max_lon,max_lat") yapılandırılan alan yerine yalnızca bu alanı tarar;
+    `crawl_engine` verilirse (örn. ResponseReplay) tarama yerine o kaynak kullanılır. Bu kapsamlı
+    çalışmalarda silme uzlaştırması yapılmaz ve kendiliğinden tam uzlaştırmaya geçilmez. `bbox` çalışmaları
+    artımlıdır: kendi karolarının watermark'larını kullanır ve eksiksiz taranan karolarınkini ilerletir.
+    Watermark karo bbox'ına bağlıdır ("bu karoda bu zamana kadarki güncellemeler görüldü"), bu yüzden bölge ve
+    parça taramalarının yazdığı değerler tüm alan taramasını bozmaz. Oynatılan yanıtlar (`crawl_engine`)
+    watermark'ları ne okur ne yazar. `seen_ids` (küme)
+    verilirse taramada görülen kamp alanı id'leri ona eklenir; parçalı işler silme uzlaştırmasını tüm
+    parçalar bittikten sonra bu id'lerin birleşimiyle yapar (reconcile_sharded_run).
+
+    PHOTO_FETCH_ENABLED açıkken yazılan kamp alanlarının yeni fotoğrafları tarama sürerken arka planda indirilir.
+
+    DEAD_LETTER_ENABLED açıkken doğrulanamayan veya yazılamayan kayıtların ham verisi dead_letters tablosuna yazılır
+    (src/scraper/dead_letters.py); daha önce reddedilmiş bir kamp alanı başarıyla yazılınca kaydı silinir.
+    """
     start_time = time.time()
+    timings = timings if timings is not None else StageTimings()
+    counts = {"processed": 0, "unchanged": 0, "inserted": 0, "updated": 0, "rejected": 0, "failed": 0, "deleted": 0, "observations": 0, "photos": 0, "dead_letters": 0}
+    photo_fetcher = None
+    progress = ProgressReporter(progress_callback, counts, start_time)
+    scoped = bbox is not None or crawl_engine is not None
     try:
+        # Şema uygulama başlangıcında oluşturulur; burada yalnızca ilk çağrıda veritabanına gidilir.
         init_db()
         session = get_session()
-        response = http_get_with_retry(API_URL)
-        logger.info(f"API yanıt kodu: {response.status_code}", extra={"component": "scraper_module", "function": "run_scraper_job"})
-        data = response.json()
-        total_count = data.get("meta", {}).get("total_count", len(data.get("data", [])))
+        known_hashes = load_campground_hashes(session)
+        logger.info(f"Veritabanından {len(known_hashes)} kamp alanı özeti yüklendi.", extra={"component": "scraper_module", "function": "run_scraper_job"})
+        crawl_state = load_crawl_state(session)
+        watermarks = {key[len(TILE_STATE_PREFIX):]: value for key, value in crawl_state.items() if key.startswith(TILE_STATE_PREFIX) and value is not None}
+        if full_reconcile is None:
+            full_reconcile = CRAWL_INCREMENTAL and not scoped and reconcile_due(crawl_state)
+        incremental = CRAWL_INCREMENTAL and not full_reconcile and crawl_engine is None
+        mode = "tam uzlaştırma" if full_reconcile else ("artımlı" if incremental else "tam")
+        logger.info(f"Tarama modu: {mode} ({len(watermarks)} karo watermark'ı).", extra={"component": "scraper_module", "function": "run_scraper_job"})
+        # Uzlaştırmada 304 dönen sayfaların kayıtları görülmüş sayılamayacağı için önbellek kullanılmaz.
+        engine_options = {"cache": None} if full_reconcile else {}
+        if bbox is not None:
+            engine_options["bbox"] = bbox
+        if crawl_engine is None:
+            crawl_engine = CrawlEngine(timings=timings, watermarks=watermarks, incremental=incremental, **engine_options)
+        progress.crawl_stats = crawl_engine.stats
+        if PHOTO_FETCH_ENABLED:
+            photo_fetcher = start_photo_fetcher(session, timings)
+        dead_letters = DeadLetterCollector(session, job_id=current_job_id.get()) if DEAD_LETTER_ENABLED else None
+        # Boru hattı: indir -> öğeyi ayrıştır -> değişiklik tespiti -> temizle/doğrula/satıra çevir -> partiler halinde yaz.
+        # Her aşama bir generator olduğundan bellekte en fazla bir parti kadar kayıt tutulur.
+        # crawl_wait: tüketicinin taramadan yeni konum beklediği süre
+        rows = progress.track(parse_locations(timings.track(crawl_engine.iter_locations_sync(), "crawl_wait"), counts))
+        rows = detect_changes(rows, known_hashes, counts, timings)
+        if dead_letters is not None:
+            rows = dead_letters.track(rows)
+        prepared_rows = validate_rows(rows, counts, timings, dead_letters)
+        for batch_number, batch in enumerate(batched(prepared_rows, PIPELINE_BATCH_SIZE), start=1):
+            batch_start = time.time()
+            with timings.time("observations"):
+                # Üzerine yazılmadan önce izlenen değerler okunur; yalnızca değişenler geçmişe eklenir.
+                previous_values = load_observed_values(session, [row["id"] for row, is_new in batch if not is_new])
+            with timings.time("db_write"):
+                write_result = bulk_upsert_rows(session, [row for row, _ in batch])
+            failed_ids = set(write_result["failed_ids"])
+            with timings.time("observations"):
+                observations = build_observations((row for row, _ in batch if row["id"] not in failed_ids), previous_values, datetime.datetime.now(datetime.timezone.utc))
+                counts["observations"] += append_observations(session, observations)
+            for row, is_new in batch:
+                if row["id"] in failed_ids:
+                    continue
+                counts["inserted" if is_new else "updated"] += 1
+            counts["failed"] += write_result["failed"]
+            if dead_letters is not None:
+                with timings.time("dead_letters"):
+                    dead_letters.written([row for row, _ in batch], write_result)
+                counts["dead_letters"] = dead_letters.stats["saved"]
+            if photo_fetcher is not None:
+                # Fotoğraf indirme ayrı thread'de sürer; parti döngüsü beklemez.
+                photo_fetcher.submit_rows(row for row, _ in batch if row["id"] not in failed_ids)
+            _log_batch_summary(batch_number, len(batch), write_result, counts, time.time() - batch_start)
+            progress.report(force=True)
+        if dead_letters is not None:
+            # Son partiden sonra reddedilen kayıtlar (yazılacak satır kalmadığında parti oluşmaz)
+            dead_letters.flush()
+            counts["dead_letters"] = dead_letters.stats["saved"]
+            if dead_letters.stats["saved"] or dead_letters.stats["resolved"]:
+                logger.info(f"Dead-letter: {dead_letters.stats['saved']} reddedilen kayıt saklandı, {dead_letters.stats['resolved']} eski kayıt çözüldü.", extra={"component": "scraper_module", "function": "run_scraper_job"})
+        crawl_stats = crawl_engine.stats
+        crawl_complete = not crawl_stats["failed_pages"] and not crawl_stats["truncated_tiles"]
+        if seen_ids is not None:
+            seen_ids.update(crawl_engine.seen_ids)
+        if photo_fetcher is not None:
+            # photo_wait: tarama bittikten sonra kalan fotoğraf indirmelerinin beklendiği süre
+            with timings.time("photo_wait"):
+                counts["photos"] = finish_photo_fetch(session, photo_fetcher)["fetched"]
+        if full_reconcile and not scoped:
+            counts["deleted"] = reconcile_deletions(session, known_hashes.keys(), crawl_engine.seen_ids, crawl_stats)
+        state_updates = {}
+        if not counts["failed"]:
+            # Yazılamayan kayıt varsa watermark ilerletilmez ve sayfaların ETag'leri saklanmaz; sonraki çalışma
+            # o sayfaları 304 almadan yeniden indirir ve kayıtları yeniden görür.
+            state_updates.update({TILE_STATE_PREFIX + tile: value for tile, value in crawl_engine.new_watermarks.items()})
+            crawl_engine.commit_cache()
+        if full_reconcile and crawl_complete and not scoped:
+            state_updates[FULL_RECONCILE_KEY] = datetime.datetime.now(datetime.timezone.utc)
+        if state_updates:
+            save_crawl_state(session, state_updates)
+        if incremental:
+            logger.info(f"Artımlı tarama: {crawl_stats['incremental_tiles']} karo watermark'a kadar tarandı, {crawl_stats['incremental_fallbacks']} karo tam taramaya döndü.", extra={"component": "scraper_module", "function": "run_scraper_job"})
+        logger.info(f"Tarama tamamlandı: {crawl_stats['tiles']} karo ({crawl_stats['split_tiles']} bölündü), {crawl_stats['pages']} sayfa, {crawl_stats['failed_pages']} başarısız sayfa.", extra={"component": "scraper_module", "function": "run_scraper_job"})
+        total_count = crawl_stats["total_count"] if crawl_stats["total_count"] is not None else counts["processed"]
         logger.info(f"API'de mevcut toplam kamp alanı sayısı: {total_count}", extra={"component": "scraper_module", "function": "run_scraper_job"})
-        locations = data.get("data", [])
-        if not locations:
+        if crawl_stats["not_modified_pages"]:
+            # 304 dönen sayfalardaki kayıtlar değişmemiş sayılır.
+            counts["processed"] += crawl_stats["not_modified_items"]
+            counts["unchanged"] += crawl_stats["not_modified_items"]
+            logger.info(f"{crawl_stats['not_modified_pages']} sayfa değişmedi (304), {crawl_stats['not_modified_items']} kamp alanı işlenmeden atlandı.", extra={"component": "scraper_module", "function": "run_scraper_job"})
+        progress.report(force=True, final=True)
+        if not counts["processed"] and not incremental:
             logger.warning("Hiç kamp alanı bulunamadı.", extra={"component": "scraper_module", "function": "run_scraper_job"})
             return
-        for index, location in enumerate(locations, start=1):
-            kamp_adi = location.get("attributes", {}).get("name", "Bilinmeyen İsim")
-            kamp_adi = sanitize_data(kamp_adi)
-            logger.info(f"{index}. --- Kamp alanı işleniyor: {kamp_adi} ---", extra={"component": "scraper_module", "function": "run_scraper_job"})
-            raw_data = {
-                "id": location.get("id"),
-                "type": location.get("type"),
-                "links": location.get("links", {}),
-                **location.get("attributes", {}),
-                "index": index
-            }
-            raw_data = sanitize_data(raw_data)
-            try:
-                logger.info("Adım 1: Ham veri doğrulanıyor...", extra={"component": "scraper_module", "function": "run_scraper_job"})
-                validated_campground = Campground.validate_api_data(raw_data)
-                logger.info("Adım 2: Doğrulama başarılı.", extra={"component": "scraper_module", "function": "run_scraper_job"})
-                logger.info("Adım 3: Veritabanına kaydediliyor...", extra={"component": "scraper_module", "function": "run_scraper_job"})
-                insert_campground_to_db(session, validated_campground)
-            except ValidationError as ve:
-                handle_exception(ValidationException(str(ve)), context=f"Kamp alanı: {kamp_adi}", extra_args={"function": "run_scraper_job"})
-            except Exception as e:
-                handle_exception(e, context=f"Kamp alanı: {kamp_adi}", extra_args={"function": "run_scraper_job"})
         logger.info("Tüm kamp alanları işlendi.", extra={"component": "scraper_module", "function": "run_scraper_job"})
-        logger.info(f"{len(locations)} kamp alanı işlendi.", extra={"component": "scraper_module", "function": "run_scraper_job"})
+        logger.info(f"{counts['processed']} kamp alanı işlendi.", extra={"component": "scraper_module", "function": "run_scraper_job"})
     except Exception as e:
         handle_exception(e, context="Ana döngü", extra_args={"function": "run_scraper_job"})
     finally:
+        if photo_fetcher is not None:
+            photo_fetcher.close(cancel=True)
         try:
             session.close()
         except Exception:
             pass
+        remove_session()
         execution_time = time.time() - start_time
         logger.info(f"Execution Time: {execution_time:.2f} saniye", extra={"component": "scraper_module", "function": "run_scraper_job"})
+        stage_summary = ", ".join(f"{stage}={value['seconds']:.2f}s" for stage, value in timings.as_dict().items())
+        logger.info(f"Aşama süreleri: {stage_summary}", extra={"component": "scraper_module", "function": "run_scraper_job"})
 
         # İşlem sonunda bir özet mesajı döndür
-        if 'locations' in locals() and locations:
-            return f"{len(locations)} kamp alanı {execution_time:.2f} saniyede işlendi."
-        elif 'locations' in locals() and not locations:
+        deleted_text = f", {counts['deleted']} silindi" if counts["deleted"] else ""
+        if counts["processed"]:
+            return f"{counts['processed']} kamp alanı {execution_time:.2f} saniyede işlendi ({counts['inserted']} eklendi, {counts['updated']} güncellendi, {counts['unchanged']} değişmedi, {counts['failed']} başarısız, {counts['rejected']} doğrulanamadı{deleted_text})."
+        elif crawl_engine is not None and crawl_engine.stats["pages"] and crawl_engine.incremental:
+            return f"Son taramadan bu yana güncellenen kamp alanı yok ({execution_time:.2f} saniye)."
+        elif crawl_engine is not None and crawl_engine.stats["pages"]:
             return "API'den kamp alanı bulunamadı."
         else:
             return "Scraper çalıştı ancak veri işlenemedi. Detaylar için logları kontrol edin."
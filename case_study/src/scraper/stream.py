@@ -0,0 +1,148 @@
+import codecs
+import json
+
+_WHITESPACE = " \t\n\r"
+
+
+class JsonItemStream:
+    """
+    Üst seviyesi nesne olan bir JSON belgesindeki `array_key` dizisinin öğelerini, gövde
+    parça parça geldikçe üreten artımlı ayrıştırıcı.
+
+    Bellekte yalnızca henüz tamamlanmamış öğe tutulur; belgenin geri kalan üst seviye
+    anahtarları (örn. JSON:API `meta`) küçük oldukları varsayılarak `extras` içinde toplanır.
+    """
+    def __init__(self, array_key: str = "data"):
+        self.array_key = array_key
+        self.extras = {}
+        self.items_seen = 0
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._state = "start"
+        self._key = None
+
+    @property
+    def finished(self) -> bool:
+        return self._state == "end"
+
+    def feed(self, chunk: bytes) -> list:
+        """
+        Yeni bir bayt parçası ekler ve bu parçayla tamamlanan dizi öğelerini döndürür.
+        """
+        self._buffer = self._buffer[self._pos:] + self._text_decoder.decode(chunk)
+        self._pos = 0
+        return self._parse(final=False)
+
+    def close(self) -> list:
+        """
+        Akışın sonunu bildirir; belge eksik veya hatalıysa ValueError fırlatır.
+        """
+        self._buffer = self._buffer[self._pos:] + self._text_decoder.decode(b"", final=True)
+        self._pos = 0
+        items = self._parse(final=True)
+        if self._state != "end":
+            raise ValueError(f"JSON akışı beklenmedik şekilde sona erdi (durum: {self._state}).")
+        return items
+
+    def _skip_whitespace(self) -> bool:
+        buffer = self._buffer
+        pos = self._pos
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        self._pos = pos
+        return pos < len(buffer)
+
+    def _expect(self, char: str):
+        if self._buffer[self._pos] != char:
+            raise ValueError(f"JSON akışında '{char}' bekleniyordu, '{self._buffer[self._pos]}' bulundu (konum {self._pos}).")
+        self._pos += 1
+
+    def _decode_value(self, final: bool):
+        """
+        Tampondaki bir sonraki değeri çözer; değer henüz tamamlanmadıysa None döndürür.
+        """
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise ValueError(f"JSON akışı çözümlenemedi (konum {self._pos}).")
+            return None
+        # Tamponun sonunda biten sayı/sabitler yarım gelmiş olabilir ("12" aslında "123" olabilir).
+        if end == len(self._buffer) and not final and not isinstance(value, (dict, list, str)):
+            return None
+        self._pos = end
+        return (value,)
+
+    def _parse(self, final: bool) -> list:
+        items = []
+        while self._state != "end":
+            if not self._skip_whitespace():
+                break
+            state = self._state
+            if state == "start":
+                self._expect("{")
+                self._state = "key_or_end"
+            elif state in ("key_or_end", "key"):
+                if state == "key_or_end" and self._buffer[self._pos] == "}":
+                    self._pos += 1
+                    self._state = "end"
+                    continue
+                decoded = self._decode_value(final)
+                if decoded is None:
+                    break
+                self._key = decoded[0]
+                self._state = "colon"
+            elif state == "colon":
+                self._expect(":")
+                self._state = "array_start" if self._key == self.array_key else "value"
+            elif state == "value":
+                decoded = self._decode_value(final)
+                if decoded is None:
+                    break
+                self.extras[self._key] = decoded[0]
+                self._state = "comma_or_end"
+            elif state == "array_start":
+                if self._buffer[self._pos] != "[":
+                    # Dizi beklenen anahtar başka bir tipteyse sıradan değer gibi saklanır.
+                    self._state = "value"
+                    continue
+                self._pos += 1
+                self._state = "item_or_end"
+            elif state in ("item_or_end", "item"):
+                if state == "item_or_end" and self._buffer[self._pos] == "]":
+                    self._pos += 1
+                    self._state = "comma_or_end"
+                    continue
+                decoded = self._decode_value(final)
+                if decoded is None:
+                    break
+                self.items_seen += 1
+                items.append(decoded[0])
+                self._state = "item_comma"
+            elif state == "item_comma":
+                if self._buffer[self._pos] == "]":
+                    self._pos += 1
+                    self._state = "comma_or_end"
+                else:
+                    self._expect(",")
+                    self._state = "item"
+            elif state == "comma_or_end":
+                if self._buffer[self._pos] == "}":
+                    self._pos += 1
+                    self._state = "end"
+                else:
+                    self._expect(",")
+                    self._state = "key"
+        return items
+
+
+def iter_json_items(chunks, array_key: str = "data"):
+    """
+    Bayt parçalarından oluşan bir iterable üzerinden `array_key` öğelerini üretir.
+    """
+    parser = JsonItemStream(array_key)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
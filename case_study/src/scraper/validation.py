@@ -0,0 +1,116 @@
+import atexit
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from pydantic import ValidationError
+
+from src.config import VALIDATION_CHUNK_SIZE, VALIDATION_WORKERS
+from src.db.db import campground_to_row
+from src.logger import ProcessLogForwarder, ValidationException, logger
+from src.models.campground import Campground
+from src.utils.utils import batched, sanitize_data
+
+_executor = None
+_executor_workers = 0
+_log_forwarder = None
+_executor_lock = threading.Lock()
+
+
+def validate_chunk(rows):
+    """
+    (index, raw_data, row_hash, is_new) kayıtlarını temizler, doğrular ve veritabanı satırına çevirir.
+    Süreç havuzunda çalıştırılabilmesi için modül seviyesinde tanımlıdır.
+
+    Dönüş: (accepted, rejected, stage_seconds)
+        accepted: [(index, row, is_new), ...]  -> row bulk_upsert_rows'a verilebilir
+        rejected: [{"index", "id", "name", "error_type", "error", "raw_data"}, ...]
+        stage_seconds: {"sanitize": float, "validate": float, "serialize": float}
+
+    Yalnızca doğrulama hataları kaydı reddeder; beklenmeyen hatalar (kod hatası vb.) yukarı iletilir ve işi durdurur.
+    """
+    accepted = []
+    rejected = []
+    stage_seconds = {"sanitize": 0.0, "validate": 0.0, "serialize": 0.0}
+    for index, raw_data, row_hash, is_new in rows:
+        started = time.perf_counter()
+        sanitized = sanitize_data(raw_data)
+        sanitized_at = time.perf_counter()
+        stage_seconds["sanitize"] += sanitized_at - started
+        try:
+            validated_campground = Campground.validate_api_data(sanitized)
+            validated_at = time.perf_counter()
+            stage_seconds["validate"] += validated_at - sanitized_at
+            accepted.append((index, campground_to_row(validated_campground, row_hash), is_new))
+            stage_seconds["serialize"] += time.perf_counter() - validated_at
+        except (ValidationError, ValidationException) as e:
+            rejected.append({
+                "index": index,
+                "id": raw_data.get("id"),
+                "name": sanitized.get("name", "Bilinmeyen İsim"),
+                "error_type": type(e).__name__,
+                "error": str(e),
+                "raw_data": raw_data,
+            })
+    return accepted, rejected, stage_seconds
+
+
+def get_validation_pool(workers: int):
+    """
+    Süreç genelinde paylaşılan doğrulama havuzunu döndürür; işlem başlatma maliyeti yalnızca
+    ilk kullanımda ödenir. Scraper thread'ler içinde çalıştığı için işlemler fork yerine spawn ile açılır;
+    işlemlerin logları ana işleme taşınır (ProcessLogForwarder), app.log'a yalnızca ana işlem yazar.
+    """
+    global _executor, _executor_workers, _log_forwarder
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False, cancel_futures=True)
+            if _log_forwarder is None:
+                _log_forwarder = ProcessLogForwarder().start()
+            _executor = ProcessPoolExecutor(max_workers=workers, **_log_forwarder.executor_options())
+            _executor_workers = workers
+            logger.info(f"Doğrulama havuzu {workers} işlemle başlatıldı.", extra={"component": "validation"})
+        return _executor
+
+
+def shutdown_validation_pool():
+    global _executor, _log_forwarder
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+        if _log_forwarder is not None:
+            _log_forwarder.stop()
+            _log_forwarder = None
+
+
+atexit.register(shutdown_validation_pool)
+
+
+def iter_validated(rows, workers: int = VALIDATION_WORKERS, chunk_size: int = VALIDATION_CHUNK_SIZE):
+    """
+    Kayıtları `chunk_size`'lık parçalar halinde validate_chunk'tan geçirir ve her parça için
+    (accepted, rejected, stage_seconds) üretir; sıra girdiyle aynıdır.
+
+    `workers` 0 ise parçalar bu süreçte işlenir. Aksi halde süreç havuzuna gönderilir; bellekte
+    en fazla `workers * 2` parça bekletilir, böylece üst akış (tarama) havuzdan hızlı olsa da bellek sınırlı kalır.
+    """
+    chunks = batched(rows, chunk_size)
+    if workers <= 0:
+        for chunk in chunks:
+            yield validate_chunk(chunk)
+        return
+    executor = get_validation_pool(workers)
+    pending = deque()
+    try:
+        for chunk in chunks:
+            pending.append(executor.submit(validate_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,90 @@
+"""
+Uygulama genelinde JSON serileştirme: loglar, API yanıtları, SSE olayları ve dışa aktarım bu modülü kullanır.
+
+orjson kuruluysa (varsayılan JSON_BACKEND=orjson) o, değilse standart kütüphanedeki json kullanılır.
+Her iki arka uç da aynı biçimde kompakt, ASCII'ye kaçışsız UTF-8 JSON üretir; datetime değerleri
+ISO 8601 metne, JSON'a doğrudan çevrilemeyen diğer değerler (HttpUrl, Decimal, set ...) `str`'ye çevrilir.
+"""
+import datetime
+import json
+
+from src.config import JSON_BACKEND
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson isteğe bağlı
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return str(value)
+
+
+class _StdlibBackend:
+    name = "json"
+
+    def dumps(self, value, sort_keys=False) -> str:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"), sort_keys=sort_keys, default=_default)
+
+    def dumps_bytes(self, value, sort_keys=False) -> bytes:
+        return self.dumps(value, sort_keys).encode("utf-8")
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class _OrjsonBackend:
+    name = "orjson"
+
+    def __init__(self):
+        # Sayısal anahtarlı sözlükler (ör. id -> değer) json modülündeki gibi metin anahtara çevrilir.
+        self._options = orjson.OPT_NON_STR_KEYS
+        self._sorted_options = self._options | orjson.OPT_SORT_KEYS
+
+    def dumps_bytes(self, value, sort_keys=False) -> bytes:
+        return orjson.dumps(value, default=_default, option=self._sorted_options if sort_keys else self._options)
+
+    def dumps(self, value, sort_keys=False) -> str:
+        return self.dumps_bytes(value, sort_keys).decode("utf-8")
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+_BACKENDS = {"json": _StdlibBackend}
+if orjson is not None:
+    _BACKENDS["orjson"] = _OrjsonBackend
+
+_backend = None
+
+
+def set_backend(name: str):
+    """
+    Kullanılacak arka ucu seçer ("orjson" veya "json"); orjson kurulu değilse json'a düşülür.
+    """
+    global _backend
+    _backend = _BACKENDS.get(name, _StdlibBackend)()
+    return _backend.name
+
+
+def backend_name() -> str:
+    return _backend.name
+
+
+def dumps(value, sort_keys: bool = False) -> str:
+    return _backend.dumps(value, sort_keys)
+
+
+def dumps_bytes(value, sort_keys: bool = False) -> bytes:
+    return _backend.dumps_bytes(value, sort_keys)
+
+
+def loads(data):
+    return _backend.loads(data)
+
+
+set_backend(JSON_BACKEND)
@@ -1 +1 @@
-from .utils import sanitize_data, retry_operation
+from .utils import sanitize_data, retry_operation, retry_operation_async, backoff_delay, retry_after_seconds, is_retryable, content_hash, batched
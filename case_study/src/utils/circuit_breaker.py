@@ -0,0 +1,115 @@
+import threading
+import time
+
+from src.config import CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RECOVERY_TIMEOUT
+from src.logger import logger
+from src.metrics import registry
+
+circuit_transitions_total = registry.counter("circuit_breaker_transitions_total", "Devre kesici durum geçişleri.", ("host", "state"))
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """
+    Devre açıkken yapılan çağrılar beklemeden bu hata ile reddedilir.
+    """
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"{host} için devre açık; {retry_in:.1f} sn sonra yeniden denenecek.")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Bir host için ardışık hataları sayan devre kesici.
+
+    `failure_threshold` ardışık hatadan sonra devre açılır ve `recovery_timeout` saniye boyunca
+    çağrılar hiç denenmeden CircuitOpenError ile reddedilir. Süre dolunca tek bir deneme çağrısına
+    izin verilir (half-open): başarılı olursa devre kapanır, başarısız olursa yeniden açılır.
+    Hem event loop'tan hem thread'lerden kullanılabilir.
+    """
+    def __init__(self, host: str, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD, recovery_timeout: float = CIRCUIT_RECOVERY_TIMEOUT):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def _transition(self, state: str):
+        if self.state == state:
+            return
+        self.state = state
+        circuit_transitions_total.inc(host=self.host, state=state)
+        log = logger.warning if state == CIRCUIT_OPEN else logger.info
+        log(f"Devre kesici durumu değişti: {self.host} -> {state} (ardışık hata: {self.failures})", extra={"component": "circuit_breaker", "errtype": "CIRCUIT_BREAKER"})
+
+    def retry_in(self) -> float:
+        """
+        Devre açıksa yeni çağrılara izin verilene kadar kalan süre, değilse 0.
+        """
+        with self._lock:
+            if self.state != CIRCUIT_OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self.recovery_timeout - time.monotonic())
+
+    def before_call(self):
+        """
+        Çağrıdan önce çağrılır; devre açıksa CircuitOpenError fırlatır.
+        """
+        with self._lock:
+            if self.state == CIRCUIT_CLOSED:
+                return
+            if self.state == CIRCUIT_OPEN:
+                remaining = self._opened_at + self.recovery_timeout - time.monotonic()
+                if remaining > 0:
+                    raise CircuitOpenError(self.host, remaining)
+                self._transition(CIRCUIT_HALF_OPEN)
+            if self._trial_in_flight:
+                raise CircuitOpenError(self.host, self.recovery_timeout)
+            self._trial_in_flight = True
+
+    def release(self):
+        """
+        Sonucu belirlenmeden biten (örn. iptal edilen) deneme çağrısının hakkını geri verir.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._trial_in_flight = False
+            self._transition(CIRCUIT_CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == CIRCUIT_HALF_OPEN or self.failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._transition(CIRCUIT_OPEN)
+
+
+class CircuitBreakerRegistry:
+    """
+    Host başına tek bir CircuitBreaker; tarama motoru ve requests tabanlı istemci aynı devreyi paylaşır.
+    """
+    def __init__(self):
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(host)
+            return breaker
+
+
+circuit_breakers = CircuitBreakerRegistry()
@@ -0,0 +1,57 @@
+import math
+
+# campgrounds.geo_cell için sabit ızgara. Değiştirilirse kayıtlı hücreler yeniden hesaplanmalıdır.
+GEO_CELL_SIZE = 0.5
+GEO_CELL_COLUMNS = int(360 / GEO_CELL_SIZE)
+GEO_CELL_ROWS = int(180 / GEO_CELL_SIZE)
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+
+def _cell_row(latitude: float) -> int:
+    return min(int((latitude + 90) / GEO_CELL_SIZE), GEO_CELL_ROWS - 1)
+
+
+def _cell_column(longitude: float) -> int:
+    return min(int((longitude + 180) / GEO_CELL_SIZE), GEO_CELL_COLUMNS - 1)
+
+
+def geo_cell(latitude: float, longitude: float) -> int:
+    """
+    Koordinatın GEO_CELL_SIZE derecelik ızgaradaki hücre numarası.
+    """
+    return _cell_row(latitude) * GEO_CELL_COLUMNS + _cell_column(longitude)
+
+
+def geo_cells_for_bbox(min_lon: float, min_lat: float, max_lon: float, max_lat: float, max_cells: int):
+    """
+    Bbox'ı kapsayan hücre numaralarının listesi; `max_cells`'ten fazla hücre gerekiyorsa None.
+    """
+    rows = range(_cell_row(min_lat), _cell_row(max_lat) + 1)
+    columns = range(_cell_column(min_lon), _cell_column(max_lon) + 1)
+    if len(rows) * len(columns) > max_cells:
+        return None
+    return [row * GEO_CELL_COLUMNS + column for row in rows for column in columns]
+
+
+def bbox_around(latitude: float, longitude: float, radius_km: float):
+    """
+    Merkez etrafında `radius_km` yarıçaplı daireyi kapsayan (min_lon, min_lat, max_lon, max_lat).
+    """
+    lat_delta = radius_km / KM_PER_DEGREE
+    lon_delta = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 1e-6))
+    return (
+        max(longitude - lon_delta, -180.0),
+        max(latitude - lat_delta, -90.0),
+        min(longitude + lon_delta, 180.0),
+        min(latitude + lat_delta, 90.0),
+    )
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
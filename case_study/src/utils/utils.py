@@ -1,18 +1,136 @@
 import time
 import html
-from src.logger import handle_exception
+import json
+import random
+import asyncio
+import hashlib
+import datetime
+import email.utils
+from src.config import RETRY_MAX_WAIT
+from src.logger import logger, handle_exception
 
-def retry_operation(operation, max_retries=5, initial_wait=2, backoff_factor=2, exception_types=(Exception,), context=None):
-    wait = initial_wait
+# Yeniden denemeye değer HTTP durum kodları; diğer 4xx hataları kalıcı kabul edilir.
+RETRYABLE_STATUS_CODES = frozenset({408, 425, 429, 500, 502, 503, 504})
+# Devre kesicide hata sayılmayan durum kodları: sunucu ayakta, yalnızca yavaşlamamızı istiyor.
+_THROTTLE_STATUS_CODES = frozenset({429})
+
+def _status_code(exc):
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None)
+
+def is_retryable(exc) -> bool:
+    """
+    Yanıt içeren HTTP hatalarında yalnızca geçici durum kodları (429, 5xx ...) yeniden denenir;
+    zaman aşımı, bağlantı hatası gibi yanıtsız hatalar her zaman yeniden denenir.
+    """
+    status_code = _status_code(exc)
+    return status_code is None or status_code in RETRYABLE_STATUS_CODES
+
+def retry_after_seconds(exc):
+    """
+    429/503 yanıtlarındaki Retry-After başlığını (saniye veya HTTP tarihi) saniyeye çevirir.
+    """
+    if _status_code(exc) not in (429, 503):
+        return None
+    value = exc.response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+    return max(0.0, (retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+
+def backoff_delay(attempt, initial_wait, backoff_factor, max_wait=RETRY_MAX_WAIT):
+    """
+    "Full jitter": [0, min(max_wait, initial_wait * backoff_factor^(attempt-1))] aralığında rastgele bekleme.
+    Aynı anda hata alan istemcilerin aynı anda tekrar denemesini önler.
+    """
+    return random.uniform(0, min(max_wait, initial_wait * backoff_factor ** (attempt - 1)))
+
+def _next_wait(exc, attempt, initial_wait, backoff_factor, max_wait, deadline_at):
+    """
+    Bir sonraki deneme için bekleme süresi; bütçe (deadline) aşılacaksa None.
+    """
+    retry_after = retry_after_seconds(exc)
+    if retry_after is not None and retry_after > max_wait:
+        # Sunucunun istediğinden erken denemek anlamsız; bu kadar uzun beklemek yerine vazgeçilir.
+        return None
+    wait = retry_after if retry_after is not None else backoff_delay(attempt, initial_wait, backoff_factor, max_wait)
+    if deadline_at is not None and time.monotonic() + wait > deadline_at:
+        return None
+    return wait
+
+def _record_result(circuit_breaker, exc=None):
+    if circuit_breaker is None:
+        return
+    if exc is None or not is_retryable(exc) or _status_code(exc) in _THROTTLE_STATUS_CODES:
+        # Kalıcı istemci hataları (404 vb.) ve 429 host'un ayakta olduğunu gösterir.
+        circuit_breaker.record_success()
+    else:
+        circuit_breaker.record_failure()
+
+def retry_operation(operation, max_retries=5, initial_wait=2, backoff_factor=2, exception_types=(Exception,), context=None, max_wait=RETRY_MAX_WAIT, deadline=None, circuit_breaker=None):
+    """
+    `operation`'ı geçici hatalarda jitter'lı üstel bekleme ile yeniden dener.
+
+    deadline: tüm denemeler için toplam süre bütçesi (saniye); bekleme bütçeyi aşacaksa beklenmeden vazgeçilir.
+    circuit_breaker: verilirse devre açıkken hiç denenmeden CircuitOpenError fırlatılır.
+    Kalıcı hatalar (is_retryable False) yeniden denenmez. Son hata handle_exception ile loglanıp fırlatılır.
+    """
+    deadline_at = time.monotonic() + deadline if deadline else None
     for attempt in range(1, max_retries + 1):
+        if circuit_breaker is not None:
+            circuit_breaker.before_call()
         try:
-            return operation()
+            result = operation()
         except exception_types as exc:
-            handle_exception(exc, context=f"{context}, attempt {attempt}")
-            if attempt == max_retries:
+            _record_result(circuit_breaker, exc)
+            wait = _next_wait(exc, attempt, initial_wait, backoff_factor, max_wait, deadline_at) if attempt < max_retries and is_retryable(exc) else None
+            if wait is None:
+                handle_exception(exc, context=f"{context}, attempt {attempt}")
                 raise
+            logger.warning(f"{context}, deneme {attempt} başarısız ({type(exc).__name__}: {exc}). {wait:.1f} sn sonra tekrar denenecek.", extra={"component": "retry", "errtype": "RETRY"})
             time.sleep(wait)
-            wait *= backoff_factor
+        except BaseException:
+            if circuit_breaker is not None:
+                circuit_breaker.release()
+            raise
+        else:
+            _record_result(circuit_breaker)
+            return result
+
+async def retry_operation_async(operation, max_retries=5, initial_wait=2, backoff_factor=2, exception_types=(Exception,), context=None, max_wait=RETRY_MAX_WAIT, deadline=None, circuit_breaker=None):
+    """
+    retry_operation'ın asyncio karşılığı: `operation` bir coroutine fonksiyonudur ve
+    bekleme süresi boyunca event loop bloklanmaz. Son hata loglanmadan fırlatılır.
+    """
+    deadline_at = time.monotonic() + deadline if deadline else None
+    for attempt in range(1, max_retries + 1):
+        if circuit_breaker is not None:
+            circuit_breaker.before_call()
+        try:
+            result = await operation()
+        except exception_types as exc:
+            _record_result(circuit_breaker, exc)
+            wait = _next_wait(exc, attempt, initial_wait, backoff_factor, max_wait, deadline_at) if attempt < max_retries and is_retryable(exc) else None
+            if wait is None:
+                raise
+            logger.warning(f"{context}, deneme {attempt} başarısız ({type(exc).__name__}: {exc}). {wait:.1f} sn sonra tekrar denenecek.", extra={"component": "retry", "errtype": "RETRY"})
+            await asyncio.sleep(wait)
+        except BaseException:
+            if circuit_breaker is not None:
+                circuit_breaker.release()
+            raise
+        else:
+            _record_result(circuit_breaker)
+            return result
 
 def sanitize_data(data):
     if isinstance(data, str):
@@ -22,3 +140,23 @@ def sanitize_data(data):
     elif isinstance(data, list):
         return [sanitize_data(item) for item in data]
     return data
+
+def content_hash(data):
+    """
+    Sözlüğün anahtar sırasından bağımsız, kararlı bir özetini (32 karakter hex) döndürür.
+    """
+    normalized = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+
+def batched(iterable, size):
+    """
+    Iterable'ı en fazla `size` elemanlı listeler halinde üretir.
+    """
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
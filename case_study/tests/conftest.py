@@ -0,0 +1,68 @@
+"""
+Testler yerel sahte API'ye (benchmarks/fake_upstream.py) ve geçici bir SQLite veritabanına karşı çalışır.
+
+src.config ortam değişkenlerini import sırasında okuduğundan ayarlar src'den önce yapılır. Loglar ve önbellekler
+depoya yazılmasın diye çalışma dizini geçici bir dizine alınır.
+"""
+import logging
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.fake_upstream import FakeUpstream, SyntheticCampgrounds  # noqa: E402
+
+WORK_DIR = tempfile.mkdtemp(prefix="case-study-tests-")
+DATASET_ROWS = 300
+PAGE_SIZE = 100
+
+upstream = FakeUpstream(SyntheticCampgrounds(DATASET_ROWS)).start()
+
+os.chdir(WORK_DIR)
+os.environ.update({
+    "API_URL": upstream.search_url(PAGE_SIZE),
+    "DATABASE_URL": f"sqlite:///{os.path.join(WORK_DIR, 'test.db')}",
+    "CRAWL_PAGE_SIZE": str(PAGE_SIZE),
+    "CRAWL_RATE_LIMIT_PER_HOST": "1000",
+    "CRAWL_MAX_RETRIES": "1",
+    "HTTP_CACHE_ENABLED": "true",
+    "HTTP_CACHE_DIR": os.path.join(WORK_DIR, "cache", "http"),
+    "DEAD_LETTER_ENABLED": "true",
+    "PHOTO_FETCH_ENABLED": "false",
+    "VALIDATION_WORKERS": "0",
+    "LOG_ASYNC": "false",
+})
+
+from src.logger import console_handler  # noqa: E402
+
+console_handler.setLevel(logging.WARNING)
+
+
+@pytest.fixture
+def fake_upstream():
+    return upstream
+
+
+@pytest.fixture
+def db_session():
+    """
+    Boş tablolarla bir veritabanı oturumu; HTTP önbelleği de temizlenir.
+    """
+    from src.db.base import get_session, remove_session
+    from src.db.db import init_db
+    from src.db.models import Base
+
+    init_db()
+    session = get_session()
+    for table in reversed(Base.metadata.sorted_tables):
+        session.execute(table.delete())
+    session.commit()
+    shutil.rmtree(os.environ["HTTP_CACHE_DIR"], ignore_errors=True)
+    yield session
+    session.close()
+    remove_session()
@@ -0,0 +1,87 @@
+"""
+Koordinatör ve koordinatör dışında çalışan işler (CLI zamanlayıcısı) aynı kilit kurallarına uyar: kilidi başka
+bir kopya tutuyorsa veya kilit alınamıyorsa iş çalıştırılmaz.
+"""
+import asyncio
+import threading
+
+from src.jobs import JOB_STATUS_SKIPPED
+from src.jobs.coordinator import JobCoordinator, run_exclusive
+
+
+class _HeldLock:
+    def __init__(self, key):
+        self.key = key
+
+    def try_acquire(self):
+        return False
+
+    def release(self):
+        pass
+
+
+class _BrokenLock(_HeldLock):
+    def try_acquire(self):
+        raise ConnectionError("veritabanına bağlanılamadı")
+
+
+def _run_in_coordinator(lock_factory):
+    ran, saved = [], {}
+
+    async def runner(job_id, job_name):
+        ran.append(job_id)
+
+    async def save_job(job_id, **fields):
+        saved.update(fields)
+
+    async def scenario():
+        coordinator = JobCoordinator(lock_factory=lock_factory)
+        coordinator.start(runner, save_job)
+        await coordinator.submit("test_job", "test")
+        while coordinator.snapshot()["queued"] or coordinator.snapshot()["running"]:
+            await asyncio.sleep(0.01)
+        await coordinator.stop()
+
+    asyncio.run(scenario())
+    return ran, saved
+
+
+def test_same_key_runs_once_at_a_time():
+    started, finish = threading.Event(), threading.Event()
+    calls = []
+
+    def job():
+        calls.append("run")
+        started.set()
+        finish.wait(5)
+        return "done"
+
+    results = []
+    runner = threading.Thread(target=lambda: results.append(run_exclusive("test-key", job)))
+    runner.start()
+    assert started.wait(5)
+    assert run_exclusive("test-key", job) == (False, None)
+    finish.set()
+    runner.join()
+    assert results == [(True, "done")]
+    assert calls == ["run"]
+    # Kilit bırakıldıktan sonra aynı anahtar yeniden çalışabilir.
+    assert run_exclusive("test-key", lambda: 1) == (True, 1)
+
+
+def test_job_is_skipped_when_another_instance_holds_the_lock():
+    assert run_exclusive("test-key", lambda: 1, lock_factory=_HeldLock) == (False, None)
+
+
+def test_job_is_not_run_without_the_lock():
+    assert run_exclusive("test-key", lambda: 1, lock_factory=_BrokenLock) == (False, None)
+
+
+def test_coordinator_marks_skipped_jobs():
+    for lock_factory, error in ((_HeldLock, None), (_BrokenLock, "veritabanına bağlanılamadı")):
+        ran, saved = _run_in_coordinator(lock_factory)
+        assert ran == []
+        assert saved["status"] == JOB_STATUS_SKIPPED
+        assert saved["finished_at"] is not None
+        assert saved["details"]["skipped"]
+        assert saved["error"] == error
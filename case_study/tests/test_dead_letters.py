@@ -0,0 +1,40 @@
+"""
+Dead-letter kayıtlarının yazma hatalarında korunması.
+"""
+from sqlalchemy.exc import OperationalError
+
+import src.scraper.scraper as scraper
+from src.db.db import bulk_upsert_rows
+from src.db.dead_letters import DEAD_LETTER_STAGE_VALIDATE, dead_letter_row, get_dead_letter, save_dead_letters
+from src.scraper.scraper import run_scraper_job
+
+
+def _failing_commit_upsert(session, rows, *args, **kwargs):
+    original_commit = session.commit
+
+    def commit():
+        raise OperationalError("COMMIT", {}, Exception("disk I/O error"))
+
+    session.commit = commit
+    try:
+        return bulk_upsert_rows(session, rows, *args, **kwargs)
+    finally:
+        session.commit = original_commit
+
+
+def test_dead_letter_survives_commit_failure(db_session, fake_upstream, monkeypatch):
+    monkeypatch.setattr(scraper, "CRAWL_INCREMENTAL", False)
+    record = fake_upstream.dataset.records[0]
+    save_dead_letters(db_session, [dead_letter_row({"id": record["id"], **record["attributes"]}, DEAD_LETTER_STAGE_VALIDATE, "ValidationException", "eski hata")])
+
+    monkeypatch.setattr(scraper, "bulk_upsert_rows", _failing_commit_upsert)
+    progress = {}
+    run_scraper_job(progress.update, full_reconcile=False)
+    assert progress["failed"] == len(fake_upstream.dataset.records)
+    assert progress["inserted"] == 0
+
+    # Parti yazılamadığı için eski kayıt çözülmüş sayılmaz; yazma hatasıyla güncellenir.
+    dead_letter = get_dead_letter(db_session, record["id"])
+    assert dead_letter is not None
+    assert dead_letter["stage"] == "write"
+    assert dead_letter["error_type"] == "OperationalError"
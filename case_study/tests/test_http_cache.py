@@ -0,0 +1,76 @@
+"""
+ETag/304 yeniden doğrulaması: değişmeyen sayfalar işlenmeden atlanır, yazılamayan kayıtların sayfaları
+ise önbelleğe alınmadığı için sonraki çalışmada yeniden indirilir.
+"""
+import pytest
+
+import src.scraper.scraper as scraper
+from src.db.db import bulk_upsert_rows
+from src.scraper.scraper import run_scraper_job
+
+
+@pytest.fixture(autouse=True)
+def full_scan(monkeypatch):
+    # Her sayfanın önbellekle doğrulandığı tam tarama; artımlı taramada ilk sayfadan sonra durulur.
+    monkeypatch.setattr(scraper, "CRAWL_INCREMENTAL", False)
+
+
+def _run(upstream):
+    before = dict(upstream.stats)
+    progress = {}
+    run_scraper_job(progress.update, full_reconcile=False)
+    return progress, {key: upstream.stats[key] - before[key] for key in upstream.stats}
+
+
+def test_unchanged_pages_are_revalidated_and_skipped(db_session, fake_upstream):
+    rows = len(fake_upstream.dataset.records)
+    first, first_requests = _run(fake_upstream)
+    assert first["inserted"] == rows
+    assert first_requests["not_modified"] == 0
+
+    second, second_requests = _run(fake_upstream)
+    assert second_requests["not_modified"] == second_requests["requests"]
+    assert second_requests["bytes"] == 0
+    assert second["unchanged"] == rows
+    assert second["inserted"] == second["updated"] == 0
+
+
+def test_pages_with_failed_writes_are_not_cached(db_session, fake_upstream, monkeypatch):
+    rows = len(fake_upstream.dataset.records)
+
+    def failing_upsert(session, batch, *args, **kwargs):
+        ids = [row["id"] for row in batch]
+        return {"written": 0, "failed": len(ids), "failed_ids": ids, "errors": {}}
+
+    monkeypatch.setattr(scraper, "bulk_upsert_rows", failing_upsert)
+    first, _ = _run(fake_upstream)
+    assert first["failed"] == rows
+
+    monkeypatch.setattr(scraper, "bulk_upsert_rows", bulk_upsert_rows)
+    second, second_requests = _run(fake_upstream)
+    assert second_requests["not_modified"] == 0
+    assert second["inserted"] == rows
+
+
+def test_incremental_scan_refetches_rows_after_failed_writes(db_session, fake_upstream, monkeypatch):
+    monkeypatch.setattr(scraper, "CRAWL_INCREMENTAL", True)
+    _run(fake_upstream)
+    mutated = fake_upstream.dataset.mutate(0.05)
+
+    def failing_upsert(session, batch, *args, **kwargs):
+        ids = [row["id"] for row in batch]
+        return {"written": 0, "failed": len(ids), "failed_ids": ids, "errors": {}}
+
+    monkeypatch.setattr(scraper, "bulk_upsert_rows", failing_upsert)
+    failed, _ = _run(fake_upstream)
+    assert failed["failed"] == mutated
+
+    # Önbellek ve watermark ilerlemediği için sıralamanın başı 304 dönmez; değişen kayıtlar yeniden görülür.
+    monkeypatch.setattr(scraper, "bulk_upsert_rows", bulk_upsert_rows)
+    retried, requests = _run(fake_upstream)
+    assert requests["not_modified"] == 0
+    assert retried["updated"] == mutated
+
+    settled, requests = _run(fake_upstream)
+    assert requests["not_modified"] > 0
+    assert settled["updated"] == 0
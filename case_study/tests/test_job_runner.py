@@ -0,0 +1,55 @@
+"""
+API iş çalıştırıcısı: run_scraper_job hatayı yutup özet döndürse de yarım kalan veya kayıt yazamayan iş başarısız sayılır.
+"""
+import asyncio
+import importlib
+import uuid
+
+import pytest
+
+import src.scraper.scraper as scraper
+from src.jobs import JOB_STATUS_COMPLETED, JOB_STATUS_FAILED, job_store, run_failure
+from src.metrics import scrape_jobs_total
+from tests.conftest import PROJECT_ROOT
+from tests.test_dead_letters import _failing_commit_upsert
+
+
+@pytest.fixture
+def main(monkeypatch):
+    # Uygulama static dizinini çalışma dizinine göre bağlar; testler geçici dizinde çalışır.
+    monkeypatch.chdir(PROJECT_ROOT)
+    module = importlib.import_module("src.main")
+    monkeypatch.undo()
+    return module
+
+
+def _failed_jobs():
+    return scrape_jobs_total._values.get((JOB_STATUS_FAILED,), 0)
+
+
+def _run_job(main):
+    job_id = f"test_job_runner_{uuid.uuid4().hex}"
+    asyncio.run(main._execute_job(job_id, "Test Scraper"))
+    return job_store.get(job_id, refresh=True)
+
+
+def test_run_without_final_report_is_failed():
+    # run_scraper_job hatayı yutup yarım sayaçlarla dönerse son rapor (completed) gelmez.
+    assert run_failure({"pages": 2, "inserted": 10}) is not None
+    assert run_failure({"pages": 2, "inserted": 10, "completed": True}) is None
+    assert run_failure({"pages": 2, "failed": 3, "completed": True}) == "3 kayıt yazılamadı."
+
+
+def test_job_with_failed_rows_is_marked_failed(db_session, main, monkeypatch):
+    failed_before = _failed_jobs()
+    monkeypatch.setattr(scraper, "bulk_upsert_rows", _failing_commit_upsert)
+    job = _run_job(main)
+    assert job["status"] == JOB_STATUS_FAILED
+    assert job["finished_at"] is not None
+    assert "kayıt yazılamadı" in job["error"]
+    assert _failed_jobs() == failed_before + 1
+
+    monkeypatch.undo()
+    job = _run_job(main)
+    assert job["status"] == JOB_STATUS_COMPLETED
+    assert job.get("error") is None
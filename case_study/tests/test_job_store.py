@@ -0,0 +1,49 @@
+"""
+İş listesi: artımlı sorgulama değeri (latest_updated_at) sayfadan bağımsızdır, sayfalama cursor'ı opaktır.
+"""
+import datetime
+
+import pytest
+
+from src.jobs import JOB_STATUS_COMPLETED, JobStore
+
+
+def test_latest_updated_at_covers_jobs_beyond_the_page(db_session):
+    store = JobStore()
+    start = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+    for index in range(3):
+        created_at = start + datetime.timedelta(minutes=index)
+        store.save(f"job_{index}", job_name="test", status=JOB_STATUS_COMPLETED, created_at=created_at, updated_at=created_at)
+    # En eski iş en son güncellenen; ilk sayfada (en yeni iş) görünmez.
+    latest = start + datetime.timedelta(hours=1)
+    store.save("job_0", updated_at=latest)
+
+    page = store.list_jobs(limit=1)
+    assert [job["job_id"] for job in page["items"]] == ["job_2"]
+    assert page["latest_updated_at"] == store.get("job_0", refresh=True)["updated_at"]
+
+    # since'tan sonra güncellenen iş yoksa since değeri geri döner; istemci aynı noktadan sorgulamaya devam eder.
+    empty = store.list_jobs(since=page["latest_updated_at"])
+    assert empty["items"] == []
+    assert empty["latest_updated_at"] is not None
+
+
+def test_cursor_is_opaque_and_pages_from_cache_too(db_session):
+    store = JobStore()
+    start = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+    for index in range(3):
+        created_at = start + datetime.timedelta(minutes=index)
+        store.save(f"cursor_job_{index}", job_name="test", status=JOB_STATUS_COMPLETED, created_at=created_at, updated_at=created_at)
+
+    first = store.list_jobs(limit=2)
+    cursor = first["next_cursor"]
+    # Zaman dilimi "+00:00" sorgu dizgesinde boşluğa dönüşmesin diye cursor URL güvenlidir.
+    assert cursor.replace("-", "").replace("_", "").isalnum()
+    assert [job["job_id"] for job in store.list_jobs(limit=2, cursor=cursor)["items"]] == ["cursor_job_0"]
+
+    # Veritabanı okunamadığında aynı cursor süreç içi ön bellekte de çalışır.
+    cached, _ = store._list_cached(None, None, cursor, 2)
+    assert [job["job_id"] for job in cached] == ["cursor_job_0"]
+
+    with pytest.raises(ValueError):
+        store.list_jobs(cursor="bozuk|cursor")
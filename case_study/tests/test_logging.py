@@ -0,0 +1,46 @@
+"""
+Loglama: app.log'a yalnızca ana işlem yazar, işin satırları canlı dosyadan okunabilir ve kayıt başına loglar bir kez örneklenir.
+"""
+import logging
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from src.logger import ProcessLogForwarder, log_archive, logger
+
+
+def _log_in_child(job_id):
+    logger.info("alt işlem kaydı", extra={"component": "test_logging", "job_id": job_id})
+    return [type(handler).__name__ for handler in logger.handlers]
+
+
+def test_child_process_logs_are_written_by_parent():
+    job_id = f"test_logging_{uuid.uuid4().hex}"
+    with ProcessLogForwarder() as log_forwarder:
+        with ProcessPoolExecutor(max_workers=2, **log_forwarder.executor_options()) as executor:
+            handlers = list(executor.map(_log_in_child, [job_id] * 2))
+
+    # Alt işlemlerde dosya/konsol handler'ı kalmaz; kayıtlar kuyrukla ana işleme gelir.
+    assert handlers == [["StructuredQueueHandler"]] * 2
+    lines = list(log_archive.iter_job_lines(job_id))
+    assert len(lines) == 2
+    assert all("alt işlem kaydı" in line for line in lines)
+
+
+def test_row_sampling_applies_once_per_record(monkeypatch):
+    # Testler LOG_ASYNC=false ile çalışır: kayıtlar dosya ve konsol handler'larına doğrudan gider.
+    from src.logger import app_log_handler, console_handler, row_log_sampler
+
+    written = {"app": [], "console": []}
+    monkeypatch.setattr(app_log_handler, "emit", written["app"].append)
+    monkeypatch.setattr(console_handler, "emit", written["console"].append)
+    monkeypatch.setattr(console_handler, "level", logging.DEBUG)
+    monkeypatch.setattr(row_log_sampler, "sample_rate", 2)
+    monkeypatch.setattr(row_log_sampler, "max_per_second", 0)
+
+    component = f"test_sampling_{uuid.uuid4().hex}"
+    for index in range(6):
+        logger.info(f"kayıt {index}", extra={"component": component, "per_row": True})
+
+    assert [record.getMessage() for record in written["app"]] == ["kayıt 0", "kayıt 2", "kayıt 4"]
+    assert [record.getMessage() for record in written["console"]] == ["kayıt 0", "kayıt 2", "kayıt 4"]
+    assert row_log_sampler.pop_dropped().get(component) == 3
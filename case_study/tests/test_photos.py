@@ -0,0 +1,90 @@
+"""
+Fotoğraflar: aynı URL'yi paylaşan kamp alanlarının her biri fotoğrafı tutar, indirilemeyen URL'ler
+sınırlı ve aralıklı denenir, depodan silinen dosyalar listelenmez.
+"""
+import datetime
+
+from sqlalchemy import create_engine, inspect, text
+
+import src.api.endpoints as endpoints
+from src.api.endpoints import get_campground_photos
+from src.db.db import _migrate_photo_primary_key
+from src.db.photos import PHOTO_STATUS_FAILED, PHOTO_STATUS_FETCHED, campground_photos, load_photo_index, save_photos
+from src.scraper.photos import PhotoFetcher, PhotoStore, retry_due
+
+
+def _fetch(session, store, submissions):
+    fetcher = PhotoFetcher(store=store, known=load_photo_index(session), rate_limit_per_host=0, max_retries=1).start()
+    for campground_id, urls in submissions:
+        fetcher.submit(campground_id, urls)
+    save_photos(session, fetcher.close())
+    return fetcher.stats
+
+
+def test_shared_photo_url_is_kept_for_every_campground(db_session, fake_upstream, tmp_path):
+    store = PhotoStore(str(tmp_path), max_bytes=0)
+    url = f"http://127.0.0.1:{fake_upstream.port}/images/1/0.jpg"
+
+    stats = _fetch(db_session, store, [("a", [url]), ("b", [url])])
+    assert stats["submitted"] == 1
+    # Sonraki çalışmada URL indirilmeden yeni kamp alanına bağlanır.
+    images_before = fake_upstream.stats["images"]
+    stats = _fetch(db_session, store, [("c", ["http://other.invalid/x.jpg", url])])
+    assert fake_upstream.stats["images"] == images_before
+
+    for campground_id in ("a", "b", "c"):
+        photos = campground_photos(db_session, campground_id)
+        assert [photo["url"] for photo in photos] == [url]
+        assert photos[0]["status"] == PHOTO_STATUS_FETCHED
+    assert campground_photos(db_session, "c")[0]["position"] == 1
+
+
+def test_permanent_failures_are_not_refetched(db_session, fake_upstream, tmp_path):
+    store = PhotoStore(str(tmp_path), max_bytes=0)
+    url = f"http://127.0.0.1:{fake_upstream.port}/images/missing.jpg"
+
+    _fetch(db_session, store, [("a", [url])])
+    photo = load_photo_index(db_session)[url]
+    assert (photo["status"], photo["http_status"], photo["attempts"]) == (PHOTO_STATUS_FAILED, 404, 1)
+    stats = _fetch(db_session, store, [("a", [url])])
+    assert stats["submitted"] == 0
+
+
+def test_transient_failures_back_off():
+    now = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+    failed = {"http_status": 503, "attempts": 2, "fetched_at": now - datetime.timedelta(hours=1)}
+    assert not retry_due(failed, now, max_attempts=5, retry_seconds=3600)
+    assert retry_due(failed, now + datetime.timedelta(hours=1), max_attempts=5, retry_seconds=3600)
+    assert not retry_due(dict(failed, attempts=5), now + datetime.timedelta(days=30), max_attempts=5, retry_seconds=3600)
+
+
+def test_evicted_photos_are_not_listed(db_session, fake_upstream, tmp_path, monkeypatch):
+    store = PhotoStore(str(tmp_path), max_bytes=0)
+    urls = [f"http://127.0.0.1:{fake_upstream.port}/images/2/{photo}.jpg" for photo in range(2)]
+    _fetch(db_session, store, [("a", urls)])
+    monkeypatch.setattr(endpoints, "photo_store", store)
+    photos = get_campground_photos("a", session=db_session)["items"]
+    assert len(photos) == 2
+
+    (tmp_path / "originals" / photos[0]["file_name"][:2] / photos[0]["file_name"]).unlink()
+    assert [photo["url"] for photo in get_campground_photos("a", session=db_session)["items"]] == [urls[1]]
+
+
+def test_url_keyed_photo_table_is_migrated(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'photos.db'}")
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE campground_photos (url VARCHAR PRIMARY KEY, campground_id VARCHAR NOT NULL, position INTEGER NOT NULL,"
+            " status VARCHAR NOT NULL, content_hash VARCHAR(64), file_name VARCHAR, content_type VARCHAR, size_bytes INTEGER,"
+            " has_thumbnail BOOLEAN NOT NULL, error TEXT, fetched_at DATETIME NOT NULL)"
+        ))
+        connection.execute(text("CREATE INDEX ix_campground_photos_campground_id ON campground_photos (campground_id)"))
+        connection.execute(text(
+            "INSERT INTO campground_photos VALUES ('http://x/1.jpg', 'a', 0, 'FETCHED', NULL, NULL, NULL, NULL, 0, NULL, '2026-01-01 00:00:00')"
+        ))
+
+    _migrate_photo_primary_key(engine, inspect(engine), [])
+    inspector = inspect(engine)
+    assert inspector.get_pk_constraint("campground_photos")["constrained_columns"] == ["campground_id", "url"]
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT campground_id, url, attempts FROM campground_photos")).all() == [("a", "http://x/1.jpg", 0)]
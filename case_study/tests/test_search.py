@@ -0,0 +1,27 @@
+"""
+Kamp alanı araması: SQLite'ta camper_type filtresi LIKE ile yapılır; değerdeki joker karakterler düz metin eşleşir.
+"""
+from sqlalchemy import update
+
+from src.api.endpoints import search_campgrounds
+from src.db.models import CampgroundORM
+from src.scraper.scraper import run_scraper_job
+
+
+def _ids(session, camper_type):
+    return [item["id"] for item in search_campgrounds(session, camper_types=[camper_type], limit=500)["items"]]
+
+
+def test_camper_type_wildcards_are_literal(db_session, fake_upstream):
+    run_scraper_job()
+    assert _ids(db_session, "tent")
+    # Kaçırılmasaydı "_ent" "tent"i, "%" her kaydı eşlerdi.
+    assert _ids(db_session, "_ent") == []
+    assert _ids(db_session, "%") == []
+
+    campground_id = _ids(db_session, "tent")[0]
+    db_session.execute(update(CampgroundORM).where(CampgroundORM.id == campground_id).values(camper_types=["50%_off", 'back\\slash"quote']))
+    db_session.commit()
+    assert _ids(db_session, "50%_off") == [campground_id]
+    assert _ids(db_session, 'back\\slash"quote') == [campground_id]
+    assert _ids(db_session, "50%") == []
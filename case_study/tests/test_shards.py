@@ -0,0 +1,81 @@
+"""
+Parçalı işler: tam uzlaştırmada silme kararı tüm parçalar bittikten sonra verilir ve iş kaydını tek bir
+sonuçlandırıcı yazar.
+"""
+from sqlalchemy import func, insert, select
+
+from src.db.db import load_crawl_state
+from src.db.models import CampgroundORM
+from src.jobs import JOB_STATUS_COMPLETED, JOB_STATUS_FAILED, JOB_STATUS_RUNNING, ShardWorker, finalize_job, job_store, plan_shards, shard_queue
+from src.jobs.store import utcnow
+from src.scraper.scraper import FULL_RECONCILE_KEY, full_reconcile_due, run_scraper_job
+
+
+def _start_job(job_id):
+    now = utcnow()
+    job_store.save(job_id, job_name="test", status=JOB_STATUS_RUNNING, created_at=now, started_at=now, finished_at=None)
+
+
+def test_sharded_reconcile_deletes_missing_rows_once(db_session, fake_upstream):
+    run_scraper_job(full_reconcile=False)
+    stale = dict(db_session.execute(select(CampgroundORM.__table__)).mappings().first(), id="stale")
+    db_session.execute(insert(CampgroundORM.__table__), [stale])
+    db_session.commit()
+    assert full_reconcile_due()
+
+    job_id = "test_sharded_reconcile"
+    _start_job(job_id)
+    shard_queue.enqueue(job_id, plan_shards(3), full_reconcile=True)
+    worker = ShardWorker(worker_id="test-worker")
+    while worker.run_once():
+        pass
+
+    job = job_store.get(job_id, refresh=True)
+    assert job["status"] == JOB_STATUS_COMPLETED
+    assert job["details"]["counts"]["deleted"] == 1
+    assert db_session.get(CampgroundORM, "stale") is None
+    assert db_session.scalar(select(CampgroundORM.id).limit(1)) is not None
+    assert FULL_RECONCILE_KEY in load_crawl_state(db_session)
+    assert not full_reconcile_due()
+    # API süreci de sonuçlandırmayı denediğinde iş kaydı ikinci kez yazılmaz.
+    assert finalize_job(job_id) is None
+
+
+def test_incremental_sharded_job_does_not_reconcile(db_session, fake_upstream):
+    run_scraper_job(full_reconcile=False)
+    stale = dict(db_session.execute(select(CampgroundORM.__table__)).mappings().first(), id="stale")
+    db_session.execute(insert(CampgroundORM.__table__), [stale])
+    db_session.commit()
+
+    job_id = "test_sharded_incremental"
+    _start_job(job_id)
+    shard_queue.enqueue(job_id, plan_shards(2))
+    worker = ShardWorker(worker_id="test-worker")
+    while worker.run_once():
+        pass
+
+    assert job_store.get(job_id, refresh=True)["status"] == JOB_STATUS_COMPLETED
+    assert db_session.get(CampgroundORM, "stale") is not None
+
+
+def test_interrupted_shard_is_not_used_for_reconcile(db_session, fake_upstream, monkeypatch):
+    import src.scraper.scraper as scraper
+
+    run_scraper_job(full_reconcile=False)
+
+    def interrupted_run(progress_callback=None, *args, seen_ids=None, **kwargs):
+        # run_scraper_job hatayı loglayıp özet döndürdüğünde son rapor gelmez ve seen_ids doldurulmaz.
+        progress_callback({"pages": 1, "inserted": 0, "updated": 0, "failed": 0})
+        return "Tarama yarıda kesildi."
+
+    monkeypatch.setattr(scraper, "run_scraper_job", interrupted_run)
+    job_id = "test_sharded_interrupted"
+    _start_job(job_id)
+    shard_queue.enqueue(job_id, plan_shards(2), full_reconcile=True)
+    worker = ShardWorker(worker_id="test-worker")
+    while worker.run_once():
+        pass
+
+    assert job_store.get(job_id, refresh=True)["status"] == JOB_STATUS_FAILED
+    assert db_session.scalar(select(func.count()).select_from(CampgroundORM)) == len(fake_upstream.dataset.records)
+    assert full_reconcile_due()
@@ -0,0 +1,30 @@
+"""
+Doğrulama aşamasında yalnızca doğrulama hatalarının kaydı reddetmesi.
+"""
+import pytest
+
+import src.scraper.validation as validation
+from src.scraper.validation import validate_chunk
+
+
+def _chunk(fake_upstream, **overrides):
+    record = fake_upstream.dataset.records[0]
+    raw_data = {"id": record["id"], "type": record["type"], "links": dict(record["links"]), **record["attributes"], **overrides}
+    return [(0, raw_data, "hash", True)]
+
+
+def test_invalid_row_is_rejected(fake_upstream):
+    accepted, rejected, _ = validate_chunk(_chunk(fake_upstream))
+    assert len(accepted) == 1 and rejected == []
+    accepted, rejected, _ = validate_chunk(_chunk(fake_upstream, latitude="kuzey"))
+    assert accepted == []
+    assert rejected[0]["error_type"] == "ValidationError"
+
+
+def test_unexpected_error_is_not_reported_as_rejected_row(fake_upstream, monkeypatch):
+    def broken_conversion(*args, **kwargs):
+        raise KeyError("geo_cell")
+
+    monkeypatch.setattr(validation, "campground_to_row", broken_conversion)
+    with pytest.raises(KeyError):
+        validate_chunk(_chunk(fake_upstream))